@@ -0,0 +1,5 @@
+#!/bin/sh
+# arguments are handed to the benchmark suite, e.g. ./benchmark.sh --output results.json or ./benchmark.sh --quick --baseline results.json
+cd src
+python3 -m benchmarks.engine_benchmark
+python3 -m benchmarks.benchmark_suite "$@"
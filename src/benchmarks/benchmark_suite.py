@@ -0,0 +1,367 @@
+# throughput of the hot paths at a range of sizes, written as JSON and optionally compared to a saved baseline
+#	python3 -m benchmarks.benchmark_suite --output results.json
+#	python3 -m benchmarks.benchmark_suite --baseline results.json
+# every case runs whole steps (a game tick, a generation...) until min_duration is spent, and reports operations per second
+# the best of several repeats is kept, as slower runs mostly measure noise from the rest of the machine
+
+import argparse
+import json
+import platform
+import sys
+from random import Random
+from time import perf_counter
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from engine.engine import iterate
+from games.snake.snake_agents import generate_spiral_agent
+from games.snake.snake_game_engine import snake_iteration, generate_snake_game_state
+from games.snake.snake_game_state import generate_snake_game_state_object, double_buffered_snake_game_generator
+from games.snake.growing_snake_game_engine import growing_snake_iteration, generate_growing_snake_game_state
+from games.snake.snake_instructions import generate_snake_instruction_set, generate_snake_instruction_costs
+from metaheuristics.genetic_algorithm.genetic_algorithm import apply_genetic_algorithm_iteration, PopulationReplacementStrategy
+from metaheuristics.genetic_algorithm.genome_matrix import apply_matrix_genetic_algorithm_iteration, one_point_crossover
+from benchmarks.engine_benchmark import static_game_iterate
+
+RESULTS_VERSION = 1
+
+ENGINE_AGENT_COUNTS = [1, 10, 100, 1000]
+ENGINE_GENOME_LENGTHS = [40, 400, 4000]
+SNAKE_GRID_SIDES = [10, 100, 1000]
+SNAKE_AGENT_COUNTS = [1, 100, 1000]
+GROWING_SNAKE_LENGTHS = [1, 10, 100, 250]
+GROWING_SNAKE_AGENT_COUNTS = [100]
+GA_POPULATION_SIZES = [100, 1000, 10000]
+GA_GENOME_LENGTHS = [40, 400]
+
+QUICK_ENGINE_AGENT_COUNTS = [1, 10]
+QUICK_ENGINE_GENOME_LENGTHS = [40, 400]
+QUICK_SNAKE_GRID_SIDES = [10, 100]
+QUICK_SNAKE_AGENT_COUNTS = [1, 100]
+QUICK_GROWING_SNAKE_LENGTHS = [1, 100]
+QUICK_GA_POPULATION_SIZES = [100]
+QUICK_GA_GENOME_LENGTHS = [40]
+
+
+def measure_throughput(
+	step: Callable[[], int], # performs one step, returns the number of operations it did
+	min_duration: float
+) -> Tuple[int, float]:
+	''' returns (operations, elapsed seconds), running at least one step '''
+	nb_operations = 0
+	elapsed = 0.0
+	while elapsed < min_duration or nb_operations == 0:
+		start = perf_counter()
+		nb_operations += step()
+		elapsed += perf_counter() - start
+	return nb_operations, elapsed
+
+
+def generate_padded_spiral_agent(genome_length: int) -> List[int]:
+	''' spiral agent followed by data cells, so that the genome length changes the cost of copying agents but not the code executed '''
+	agent = generate_spiral_agent()
+	return agent + [0 for _ in range(genome_length - len(agent))]
+
+
+def engine_iterate_step(
+	nb_agents: int,
+	genome_length: int,
+	instruction_ticks_per_game_ticks: int = 100
+) -> Callable[[], int]:
+	''' one game tick of engine.iterate on a game that never changes, counting executed instructions '''
+	grid_column_length = 10
+	grid_row_length = 10
+	instruction_set = generate_snake_instruction_set()
+	instruction_costs = generate_snake_instruction_costs()
+	current = dict()
+	current['agents'] = [generate_padded_spiral_agent(genome_length) for _ in range(nb_agents)]
+	current['game_state'] = generate_snake_game_state(grid_column_length, grid_row_length, [i % (grid_column_length * grid_row_length) for i in range(nb_agents)])
+	current['pointers'] = [0 for _ in range(nb_agents)]
+	current['agents_freeze_values'] = [0 for _ in range(nb_agents)]
+
+	def step() -> int:
+		result = iterate(
+			game_iterate=static_game_iterate,
+			instruction_set=instruction_set,
+			instruction_costs=instruction_costs,
+			instruction_ticks_per_game_ticks=instruction_ticks_per_game_ticks,
+			agents=current['agents'],
+			game_state=current['game_state'],
+			pointers=current['pointers'],
+			agents_freeze_values=current['agents_freeze_values'],
+		)
+		current.update(result)
+		return nb_agents * instruction_ticks_per_game_ticks # every instruction of the spiral agent costs a single tick
+
+	return step
+
+
+def snake_iteration_step(
+	grid_side: int,
+	nb_agents: int,
+	seed: int = 0
+) -> Callable[[], int]:
+	''' one snake_iteration on a grid_side x grid_side grid, agents going back and forth on the first columns, counting game ticks '''
+	random = Random(seed)
+	grid_size = grid_side * grid_side
+	agent_positions = [(i * grid_side) % grid_size for i in range(nb_agents)]
+	current = dict()
+	current['state'] = generate_snake_game_state(grid_side, grid_side, agent_positions)
+	moves = [[ord('→') for _ in range(nb_agents)], [ord('←') for _ in range(nb_agents)]]
+	food_generator_per_tick = lambda turn_count: [random.randrange(grid_size)]
+
+	def step() -> int:
+		state = current['state']
+		current['state'] = snake_iteration(moves[state['turn_count'] % 2], state, food_generator_per_tick)
+		return 1
+
+	return step
+
+
+def double_buffered_snake_iteration_step(
+	grid_side: int,
+	nb_agents: int,
+	seed: int = 0
+) -> Callable[[], int]:
+	''' the game of snake_iteration_step on a SnakeGameState, ticks swapping two buffers '''
+	random = Random(seed)
+	grid_size = grid_side * grid_side
+	agent_positions = [(i * grid_side) % grid_size for i in range(nb_agents)]
+	current = dict()
+	current['state'] = generate_snake_game_state_object(grid_side, grid_side, agent_positions)
+	moves = [[ord('→') for _ in range(nb_agents)], [ord('←') for _ in range(nb_agents)]]
+	game_iterate = double_buffered_snake_game_generator(lambda turn_count: [random.randrange(grid_size)])
+
+	def step() -> int:
+		state = current['state']
+		current['state'] = game_iterate(moves[state.turn_count % 2], state)
+		return 1
+
+	return step
+
+
+def growing_snake_iteration_step(
+	nb_agents: int,
+	snake_length: int,
+	grid_side: int = 256
+) -> Callable[[], int]:
+	''' one growing_snake_iteration on a torus, every snake going right along its own row forever, counting game ticks '''
+	agent_bodies = [[row * grid_side + column for column in range(snake_length)] for row in range(nb_agents)]
+	current = dict()
+	current['state'] = generate_growing_snake_game_state(grid_side, grid_side, [body[-1] for body in agent_bodies], True, agent_bodies)
+	actions = [ord('→') for _ in range(nb_agents)]
+	food_generator_per_tick = lambda turn_count: []
+
+	def step() -> int:
+		current['state'] = growing_snake_iteration(actions, current['state'], food_generator_per_tick)
+		return 1
+
+	return step
+
+
+def genetic_algorithm_step(
+	population_size: int,
+	genome_length: int,
+	seed: int = 0
+) -> Callable[[], int]:
+	''' one apply_genetic_algorithm_iteration with a trivial fitness, so that only the genetic algorithm itself is measured '''
+	random = Random(seed)
+	current = dict()
+	current['population'] = [[random.randrange(256) for _ in range(genome_length)] for _ in range(population_size)]
+
+	def crossover(parents: List[List[int]]) -> List[List[int]]:
+		split_point = random.randint(0, genome_length)
+		return [
+			parents[0][:split_point] + parents[1][split_point:],
+			parents[1][:split_point] + parents[0][split_point:],
+		]
+
+	def mutate(genome: List[int]) -> List[int]:
+		mutated = list(genome)
+		mutated[random.randrange(genome_length)] = random.randrange(256)
+		return mutated
+
+	def step() -> int:
+		current['population'] = apply_genetic_algorithm_iteration(
+			population=current['population'],
+			compute_fitness=lambda population: [sum(genome) for genome in population],
+			selection_rate=0.5,
+			population_replacement_strategy=PopulationReplacementStrategy.ELITIST,
+			random_generator=lambda n: [random.random() for _ in range(n)],
+			no_repeat_int_random_generator=lambda n, min_val, max_val: random.sample(range(min_val, max_val), n),
+			crossover=crossover,
+			nb_parents_for_crossover=2,
+			mutation_rate=0.05,
+			mutate=mutate,
+		)
+		return 1
+
+	return step
+
+
+def matrix_genetic_algorithm_step(
+	population_size: int,
+	genome_length: int,
+	seed: int = 0
+) -> Callable[[], int]:
+	''' one apply_matrix_genetic_algorithm_iteration with the same settings, crossing over the whole population '''
+	rng = np.random.default_rng(seed)
+	current = dict()
+	current['population'] = rng.integers(0, 256, size=(population_size, genome_length))
+	gene_values = np.arange(256)
+
+	def step() -> int:
+		current['population'] = apply_matrix_genetic_algorithm_iteration(
+			population=current['population'],
+			compute_fitness=lambda population: population.sum(axis=1),
+			selection_rate=0.5,
+			population_replacement_strategy=PopulationReplacementStrategy.ELITIST,
+			rng=rng,
+			crossover=one_point_crossover,
+			nb_crossovers=population_size // 2,
+			gene_mutation_rate=0.05 / genome_length, # as many mutated genes as the list genetic algorithm
+			gene_values=gene_values,
+		)
+		return 1
+
+	return step
+
+
+def generate_cases(is_quick: bool = False) -> List[Tuple[str, Dict, str, Callable[[], Callable[[], int]]]]:
+	''' (name, parameters, unit, step factory) of every case '''
+	cases = []
+	for nb_agents in (QUICK_ENGINE_AGENT_COUNTS if is_quick else ENGINE_AGENT_COUNTS):
+		for genome_length in (QUICK_ENGINE_GENOME_LENGTHS if is_quick else ENGINE_GENOME_LENGTHS):
+			cases.append((
+				f"engine.iterate/agents={nb_agents}/genome_length={genome_length}",
+				{'agents': nb_agents, 'genome_length': genome_length},
+				'instructions/s',
+				lambda nb_agents=nb_agents, genome_length=genome_length: engine_iterate_step(nb_agents, genome_length)
+			))
+	for grid_side in (QUICK_SNAKE_GRID_SIDES if is_quick else SNAKE_GRID_SIDES):
+		for nb_agents in (QUICK_SNAKE_AGENT_COUNTS if is_quick else SNAKE_AGENT_COUNTS):
+			cases.append((
+				f"snake_iteration/grid={grid_side}x{grid_side}/agents={nb_agents}",
+				{'grid_column_length': grid_side, 'grid_row_length': grid_side, 'agents': nb_agents},
+				'ticks/s',
+				lambda grid_side=grid_side, nb_agents=nb_agents: snake_iteration_step(grid_side, nb_agents)
+			))
+			cases.append((
+				f"snake_iteration_into/grid={grid_side}x{grid_side}/agents={nb_agents}",
+				{'grid_column_length': grid_side, 'grid_row_length': grid_side, 'agents': nb_agents},
+				'ticks/s',
+				lambda grid_side=grid_side, nb_agents=nb_agents: double_buffered_snake_iteration_step(grid_side, nb_agents)
+			))
+	for nb_agents in GROWING_SNAKE_AGENT_COUNTS:
+		for snake_length in (QUICK_GROWING_SNAKE_LENGTHS if is_quick else GROWING_SNAKE_LENGTHS):
+			cases.append((
+				f"growing_snake_iteration/agents={nb_agents}/length={snake_length}",
+				{'agents': nb_agents, 'snake_length': snake_length, 'grid_column_length': 256, 'grid_row_length': 256},
+				'ticks/s',
+				lambda nb_agents=nb_agents, snake_length=snake_length: growing_snake_iteration_step(nb_agents, snake_length)
+			))
+	for population_size in (QUICK_GA_POPULATION_SIZES if is_quick else GA_POPULATION_SIZES):
+		for genome_length in (QUICK_GA_GENOME_LENGTHS if is_quick else GA_GENOME_LENGTHS):
+			cases.append((
+				f"apply_genetic_algorithm_iteration/population={population_size}/genome_length={genome_length}",
+				{'population': population_size, 'genome_length': genome_length},
+				'generations/s',
+				lambda population_size=population_size, genome_length=genome_length: genetic_algorithm_step(population_size, genome_length)
+			))
+			cases.append((
+				f"apply_matrix_genetic_algorithm_iteration/population={population_size}/genome_length={genome_length}",
+				{'population': population_size, 'genome_length': genome_length, 'crossovers_per_generation': population_size // 2},
+				'generations/s',
+				lambda population_size=population_size, genome_length=genome_length: matrix_genetic_algorithm_step(population_size, genome_length)
+			))
+	return cases
+
+
+def run_benchmarks(
+	is_quick: bool = False,
+	min_duration: float = 0.5,
+	repeats: int = 3,
+	name_filter: str = '',
+	verbose: bool = False
+) -> Dict:
+	results = dict()
+	for name, parameters, unit, step_factory in generate_cases(is_quick):
+		if name_filter not in name:
+			continue
+		step = step_factory()
+		nb_operations, elapsed = max(
+			(measure_throughput(step, min_duration) for _ in range(repeats)),
+			key=lambda measure: measure[0] / measure[1]
+		)
+		result = dict()
+		result['parameters'] = parameters
+		result['unit'] = unit
+		result['operations'] = nb_operations
+		result['seconds'] = elapsed
+		result['throughput'] = nb_operations / elapsed
+		results[name] = result
+		if verbose:
+			print(f"{name}\t{result['throughput']:.1f} {unit}")
+
+	output = dict()
+	output['version'] = RESULTS_VERSION
+	output['python'] = platform.python_version()
+	output['machine'] = platform.machine()
+	output['results'] = results
+	return output
+
+
+def compare_results(
+	results: Dict,
+	baseline: Dict,
+	tolerance: float = 0.1
+) -> List[Tuple[str, float, float, bool]]:
+	'''
+		(name, baseline throughput, throughput, is regression) of every case present in both
+		a case regresses when its throughput falls below (1 - tolerance) times the baseline
+	'''
+	comparison = []
+	for name, result in results['results'].items():
+		if name not in baseline['results']:
+			continue
+		baseline_throughput = baseline['results'][name]['throughput']
+		throughput = result['throughput']
+		comparison.append((name, baseline_throughput, throughput, throughput < (1 - tolerance) * baseline_throughput))
+	return comparison
+
+
+def comparison_to_str(comparison: List[Tuple[str, float, float, bool]]) -> str:
+	lines = []
+	for name, baseline_throughput, throughput, is_regression in comparison:
+		lines.append(f"{'REGRESSION' if is_regression else 'ok':<10}\t{name}\t{baseline_throughput:.1f} -> {throughput:.1f}\tx{throughput / baseline_throughput:.2f}")
+	return "\n".join(lines)
+
+
+def main():
+	parser = argparse.ArgumentParser(description="throughput of the engine, the snake game and the genetic algorithm")
+	parser.add_argument('--output', help="where to write the results as JSON")
+	parser.add_argument('--baseline', help="JSON results to compare with, exits with status 1 on regressions")
+	parser.add_argument('--tolerance', type=float, default=0.1, help="relative throughput loss tolerated before reporting a regression")
+	parser.add_argument('--min-duration', type=float, default=0.5, help="seconds spent on each case")
+	parser.add_argument('--repeats', type=int, default=3, help="measures of each case, the best one is kept")
+	parser.add_argument('--filter', default='', help="only run cases whose name contains this")
+	parser.add_argument('--quick', action='store_true', help="only run the smallest sizes")
+	arguments = parser.parse_args()
+
+	results = run_benchmarks(arguments.quick, arguments.min_duration, arguments.repeats, arguments.filter, verbose=True)
+
+	if arguments.output is not None:
+		with open(arguments.output, 'w') as output_file:
+			json.dump(results, output_file, indent='\t', sort_keys=True)
+
+	if arguments.baseline is not None:
+		with open(arguments.baseline) as baseline_file:
+			baseline = json.load(baseline_file)
+		comparison = compare_results(results, baseline, arguments.tolerance)
+		print(comparison_to_str(comparison))
+		if any(is_regression for (_, _, _, is_regression) in comparison):
+			sys.exit(1)
+
+if __name__ == '__main__':
+	main()
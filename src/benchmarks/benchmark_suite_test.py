@@ -0,0 +1,18 @@
+from .benchmark_suite import run_benchmarks, compare_results
+
+def test_quick_run_measures_every_workload():
+	results = run_benchmarks(is_quick=True, min_duration=0.0)
+	names = list(results['results'])
+	assert any(name.startswith('engine.iterate/') for name in names)
+	assert any(name.startswith('snake_iteration/') for name in names)
+	assert any(name.startswith('apply_genetic_algorithm_iteration/') for name in names)
+	assert all(result['throughput'] > 0 for result in results['results'].values())
+
+def test_compare_flags_slower_cases_only():
+	def results(throughputs):
+		return {'results': {name: {'throughput': throughput} for name, throughput in throughputs.items()}}
+
+	baseline = results({'a': 100.0, 'b': 100.0, 'c': 100.0})
+	current = results({'a': 95.0, 'b': 50.0, 'd': 1.0})
+
+	assert compare_results(current, baseline, tolerance=0.1) == [('a', 100.0, 95.0, False), ('b', 100.0, 50.0, True)]
@@ -0,0 +1,64 @@
+from time import perf_counter
+from typing import Callable, Dict
+
+from engine.engine import iterate
+from engine.compiled_engine import iterate_compiled
+from games.snake.snake_agents import generate_spiral_agent
+from games.snake.snake_game_engine import generate_snake_game_state
+from games.snake.snake_instructions import generate_snake_instruction_set, generate_snake_instruction_costs
+
+def static_game_iterate(actions, state):
+	''' leaves the game untouched so that only the engine is measured '''
+	return state
+
+def time_game_ticks(
+	iterate_function: Callable[..., Dict],
+	nb_agents: int,
+	nb_game_ticks: int,
+	instruction_ticks_per_game_ticks: int
+) -> float:
+	grid_column_length = 10
+	grid_row_length = 10
+	agents = [generate_spiral_agent() for _ in range(nb_agents)]
+	game_state = generate_snake_game_state(grid_column_length, grid_row_length, [i % (grid_column_length * grid_row_length) for i in range(nb_agents)])
+	pointers = [0 for _ in agents]
+	agents_freeze_values = [0 for _ in agents]
+	extra_arguments = dict()
+
+	start = perf_counter()
+	for _ in range(nb_game_ticks):
+		result = iterate_function(
+			game_iterate=static_game_iterate,
+			instruction_set=generate_snake_instruction_set(),
+			instruction_costs=generate_snake_instruction_costs(),
+			instruction_ticks_per_game_ticks=instruction_ticks_per_game_ticks,
+			agents=agents,
+			game_state=game_state,
+			pointers=pointers,
+			agents_freeze_values=agents_freeze_values,
+			**extra_arguments
+		)
+		agents = result['agents']
+		game_state = result['game_state']
+		pointers = result['pointers']
+		agents_freeze_values = result['agents_freeze_values']
+		if 'programs' in result:
+			extra_arguments['programs'] = result['programs']
+	return perf_counter() - start
+
+def main():
+	instruction_ticks_per_game_ticks = 100
+	nb_game_ticks = 20
+	for nb_agents in [1, 10, 100]:
+		interpreted_time = time_game_ticks(iterate, nb_agents, nb_game_ticks, instruction_ticks_per_game_ticks)
+		compiled_time = time_game_ticks(iterate_compiled, nb_agents, nb_game_ticks, instruction_ticks_per_game_ticks)
+		nb_instructions = nb_agents * nb_game_ticks * instruction_ticks_per_game_ticks
+		print(
+			f"{nb_agents} agents, {instruction_ticks_per_game_ticks} instruction ticks per game tick:"
+			f"\tengine.iterate {nb_instructions / interpreted_time:.0f} instructions/s"
+			f"\titerate_compiled {nb_instructions / compiled_time:.0f} instructions/s"
+			f"\tspeedup x{interpreted_time / compiled_time:.1f}"
+		)
+
+if __name__ == '__main__':
+	main()
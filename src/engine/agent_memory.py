@@ -0,0 +1,70 @@
+from array import array
+from typing import Iterable, List
+
+
+class AgentMemory(object):
+	"""
+		mutable agent memory backed by an array('i'), usable wherever an agent list is expected
+
+		writes happen in place in O(1), so instructions given an AgentMemory modify it instead of building a new agent
+		snapshot() is O(1) too: the snapshot shares the buffer, and whichever side writes first copies it
+	"""
+	def __init__(
+		self,
+		values: Iterable[int] = (),
+		typecode: str = 'i'
+	):
+		self.buffer = array(typecode, values)
+		self.is_shared = False
+		self.version = 0 # incremented by every write changing a value
+
+	def snapshot(self) -> 'AgentMemory':
+		other = AgentMemory.__new__(AgentMemory)
+		other.buffer = self.buffer
+		other.is_shared = True
+		other.version = 0
+		self.is_shared = True
+		return other
+
+	def __len__(self) -> int:
+		return len(self.buffer)
+
+	def __getitem__(self, index):
+		return self.buffer[index]
+
+	def __setitem__(self, index: int, value: int):
+		if self.buffer[index] == value:
+			return
+		if self.is_shared:
+			self.buffer = array(self.buffer.typecode, self.buffer)
+			self.is_shared = False
+		self.buffer[index] = value
+		self.version += 1
+
+	def __iter__(self):
+		return iter(self.buffer)
+
+	def __eq__(self, other) -> bool:
+		if isinstance(other, AgentMemory):
+			return self.buffer == other.buffer
+		if not isinstance(other, (list, tuple, array)):
+			return NotImplemented
+		return self.buffer.tolist() == list(other)
+
+	__hash__ = None
+
+	def __repr__(self) -> str:
+		return f"AgentMemory({self.buffer.tolist()})"
+
+	def tolist(self) -> List[int]:
+		return self.buffer.tolist()
+
+
+def to_agent_memories(agents: List[Iterable[int]]) -> List[AgentMemory]:
+	''' copies every agent into its own AgentMemory, so that the engine never writes into the given agents '''
+	return [AgentMemory(agent) for agent in agents]
+
+
+def snapshot_agents(agents: List[any]) -> List[any]:
+	''' stable copies of agents, for callbacks or the genetic algorithm, while the engine keeps writing into the originals '''
+	return [agent.snapshot() if isinstance(agent, AgentMemory) else agent for agent in agents]
@@ -0,0 +1,56 @@
+from array import array
+
+from .agent_memory import AgentMemory, to_agent_memories, snapshot_agents
+from .engine import iterate
+from .compiled_engine import iterate_compiled
+from games.snake.snake_agents import generate_spiral_agent
+from games.snake.snake_game_engine import snake_game_generator, generate_snake_game_state
+from games.snake.snake_instructions import generate_snake_instruction_set, generate_snake_instruction_costs
+
+def test_copy_on_write():
+	memory = AgentMemory([1, 2, 3])
+	snapshot = memory.snapshot()
+	memory[0] = 7
+	assert memory == [7, 2, 3]
+	assert snapshot == [1, 2, 3]
+	snapshot[1] = 8
+	assert memory == [7, 2, 3]
+	assert snapshot == [1, 8, 3]
+
+def test_equality_with_other_types():
+	memory = AgentMemory([1, 2, 3])
+	assert memory == (1, 2, 3) and memory == array('i', [1, 2, 3]) and [1, 2, 3] == memory
+	assert memory != AgentMemory([1, 2])
+	assert not (memory == None) and memory != None
+	assert not (memory == 5) and memory != 5
+	assert memory != "abc"
+
+def play(iterate_function, agents):
+	game_iterate = snake_game_generator(lambda turn_count: [turn_count % 30])
+	game_state = generate_snake_game_state(6, 5, [0, 7, 29])
+	pointers = [0 for _ in agents]
+	agents_freeze_values = [0 for _ in agents]
+	history = []
+	for _ in range(25):
+		result = iterate_function(
+			game_iterate=game_iterate,
+			instruction_set=generate_snake_instruction_set(),
+			instruction_costs=generate_snake_instruction_costs(),
+			instruction_ticks_per_game_ticks=17,
+			agents=agents,
+			game_state=game_state,
+			pointers=pointers,
+			agents_freeze_values=agents_freeze_values,
+		)
+		agents, game_state, pointers = result['agents'], result['game_state'], result['pointers']
+		history.append(([list(a) for a in agents], list(pointers), list(game_state['agent_positions']), list(game_state['dead_agents'])))
+	return history
+
+def test_engines_behave_the_same_with_agent_memories():
+	agents = [generate_spiral_agent() for _ in range(3)]
+	expected = play(iterate, agents)
+	for iterate_function in [iterate, iterate_compiled]:
+		memories = to_agent_memories(agents)
+		snapshots = snapshot_agents(memories)
+		assert play(iterate_function, memories) == expected
+		assert snapshots == agents
@@ -0,0 +1,273 @@
+# alternative to engine.iterate for the snake instruction set
+# each agent memory is decoded once into a table holding, for every pointer position, an opcode and its already checked operands
+# the inner loop then runs on plain tuples: no instruction call, no result dict, no instruction_set lookup
+# only L can modify memory, so only the (at most 3) cells whose decoding depends on the written cell are decoded again
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+from engine.agent_memory import AgentMemory
+from engine.engine import iterate
+from utils.grid_topology import DIRECTION_OFFSETS, OFF_GRID, get_state_topology
+from games.snake.snake_instructions import conditionally_jumps_to_position_if_next_is_0, load_state_at_position, submit_instruction_up, submit_instruction_right, submit_instruction_down, submit_instruction_left
+
+OPCODE_FATAL = 0 # executing the cell kills the agent
+OPCODE_KEY_ERROR = 1 # executing the cell raises a KeyError, as engine.iterate would
+OPCODE_JUMP = 2
+OPCODE_LOAD = 3
+OPCODE_SUBMIT = 4
+
+INSTRUCTION_OPCODES = dict()
+INSTRUCTION_OPCODES[conditionally_jumps_to_position_if_next_is_0] = OPCODE_JUMP
+INSTRUCTION_OPCODES[load_state_at_position] = OPCODE_LOAD
+INSTRUCTION_OPCODES[submit_instruction_up] = OPCODE_SUBMIT
+INSTRUCTION_OPCODES[submit_instruction_right] = OPCODE_SUBMIT
+INSTRUCTION_OPCODES[submit_instruction_down] = OPCODE_SUBMIT
+INSTRUCTION_OPCODES[submit_instruction_left] = OPCODE_SUBMIT
+
+FATAL_ENTRY = (OPCODE_FATAL, 0, 0, 0, 0, 0)
+
+# (opcode, cost, operand, operand, operand, operand)
+ProgramEntry = Tuple[int, int, int, int, int, int]
+
+
+def is_compilable(instruction_set, instruction_costs) -> bool:
+	''' whether every instruction of the set has a known opcode and a cost '''
+	return all(
+		instruction_set[symbol] in INSTRUCTION_OPCODES and symbol in instruction_costs
+		for symbol in instruction_set
+	)
+
+
+def decode_cell(
+	agent: List[int],
+	position: int,
+	instruction_set,
+	instruction_costs
+) -> ProgramEntry:
+	'''
+		decodes the instruction starting at position of agent memory, with the same checks as the instruction functions
+
+		JUMP entries hold (target if 0 or -1 if illegal, fallthrough or -1 if illegal)
+		LOAD entries hold (direction symbol, unused, write position, next pointer)
+		SUBMIT entries hold (order, next pointer)
+	'''
+	symbol = agent[position]
+	if symbol not in instruction_set:
+		return (OPCODE_KEY_ERROR, 0, symbol, 0, 0, 0)
+
+	opcode = INSTRUCTION_OPCODES[instruction_set[symbol]]
+	cost = instruction_costs[symbol]
+	length = len(agent)
+
+	if opcode == OPCODE_JUMP:
+		if not ( (position + 3) <= length ):
+			return FATAL_ENTRY
+		target = agent[position + 2]
+		target = target if (0 <= target and target < length) else -1
+		fallthrough = (position + 3) if (position + 3) < length else -1
+		return (OPCODE_JUMP, cost, target, fallthrough, 0, 0)
+
+	if opcode == OPCODE_LOAD:
+		next_pointer = position + 3
+		if not (next_pointer < length):
+			return FATAL_ENTRY
+		direction_symbol = agent[position + 1]
+		if direction_symbol not in DIRECTION_OFFSETS:
+			return (OPCODE_KEY_ERROR, 0, direction_symbol, 0, 0, 0)
+		write_position = agent[position + 2]
+		if not (0 <= write_position and write_position < length):
+			return FATAL_ENTRY
+		return (OPCODE_LOAD, cost, direction_symbol, 0, write_position, next_pointer)
+
+	# OPCODE_SUBMIT
+	if not ( (position + 1) < length ):
+		return FATAL_ENTRY
+	return (OPCODE_SUBMIT, cost, symbol, position + 1, 0, 0)
+
+
+def decode_agent(
+	agent: List[int],
+	instruction_set,
+	instruction_costs
+) -> List[ProgramEntry]:
+	return [decode_cell(agent, position, instruction_set, instruction_costs) for position in range(len(agent))]
+
+
+def iterate_compiled(
+	# immutable between iterations
+	game_iterate,
+	instruction_set,
+	instruction_costs,
+	instruction_ticks_per_game_ticks,
+
+	# mutable between iterations
+	agents,
+	game_state,
+	pointers,
+	agents_freeze_values,
+	programs=None, # as returned in the output of the previous call, decoded from agents if None
+	program_cache=None # engine.genome_compiler.CompiledGenomeCache, to run agents as compiled Python functions when possible
+) -> Dict:
+	'''
+		same contract and results as engine.iterate, plus a 'programs' output to pass to the next call
+		a program is either the decoded table of an agent, or its CompiledGenome if program_cache could compile it
+
+		agents never interact during instruction ticks (the game state only changes in game_iterate),
+		so each agent runs its whole game tick at once and frozen stretches are skipped in one subtraction
+		instruction sets containing unknown instructions fall back to engine.iterate
+	'''
+	if not is_compilable(instruction_set, instruction_costs):
+		output = iterate(
+			game_iterate=game_iterate,
+			instruction_set=instruction_set,
+			instruction_costs=instruction_costs,
+			instruction_ticks_per_game_ticks=instruction_ticks_per_game_ticks,
+			agents=agents,
+			game_state=game_state,
+			pointers=pointers,
+			agents_freeze_values=agents_freeze_values,
+		)
+		output['programs'] = None
+		return output
+
+	if programs is None and program_cache is not None:
+		programs = [
+			program_cache.get(agent, instruction_set, instruction_costs, pointer) or decode_agent(agent, instruction_set, instruction_costs)
+			for agent, pointer in zip(agents, pointers)
+		]
+	elif programs is None:
+		programs = [decode_agent(agent, instruction_set, instruction_costs) for agent in agents]
+
+	actions = [None for _ in agents]
+	new_agents = [a for a in agents]
+	new_pointers = [p for p in pointers]
+
+	dead_agents = game_state['dead_agents']
+	agent_positions = game_state['agent_positions']
+	neighbors = get_state_topology(game_state).neighbors
+	ticks = instruction_ticks_per_game_ticks
+
+	for agent_id in range(len(agents)):
+		if dead_agents[agent_id]:
+			continue
+
+		program = programs[agent_id]
+		agent = new_agents[agent_id]
+		pointer = new_pointers[agent_id]
+		freeze = agents_freeze_values[agent_id]
+		action = None
+		is_agent_copied = False
+
+		if not isinstance(program, list): # CompiledGenome
+			agent, pointer, freeze, action, is_dead = program.run(agent, pointer, freeze, ticks, agent_positions[agent_id], neighbors, isinstance(agent, AgentMemory))
+			dead_agents[agent_id] = dead_agents[agent_id] or is_dead
+			actions[agent_id] = action
+			new_agents[agent_id] = agent
+			new_pointers[agent_id] = pointer
+			agents_freeze_values[agent_id] = freeze
+			continue
+
+		tick = 0
+		while tick < ticks:
+			if freeze >= 1:
+				skipped_ticks = min(freeze, ticks - tick)
+				freeze -= skipped_ticks
+				tick += skipped_ticks
+				continue
+
+			freeze -= 1
+			tick += 1
+			opcode, cost, first, second, third, fourth = program[pointer]
+
+			if opcode == OPCODE_SUBMIT:
+				action = first
+				pointer = second
+			elif opcode == OPCODE_JUMP:
+				new_pointer = first if agent[pointer + 1] == 0 else second
+				if new_pointer < 0:
+					dead_agents[agent_id] = True
+					break
+				pointer = new_pointer
+			elif opcode == OPCODE_LOAD:
+				value_symbol = int(neighbors[first][agent_positions[agent_id]] != OFF_GRID)
+				if agent[third] != value_symbol:
+					if not is_agent_copied and not isinstance(agent, AgentMemory): # input list agents are never modified, as in engine.iterate
+						agent = [a for a in agent]
+						is_agent_copied = True
+					agent[third] = value_symbol
+					for position in range(max(third - 2, 0), third + 1):
+						program[position] = decode_cell(agent, position, instruction_set, instruction_costs)
+				pointer = fourth
+			elif opcode == OPCODE_FATAL:
+				dead_agents[agent_id] = True
+				break
+			else: # OPCODE_KEY_ERROR
+				raise KeyError(first)
+
+			freeze += cost
+
+		actions[agent_id] = action
+		new_agents[agent_id] = agent
+		new_pointers[agent_id] = pointer
+		agents_freeze_values[agent_id] = freeze
+
+	game_state = game_iterate(
+		actions=actions,
+		state=game_state,
+	)
+
+	output = dict()
+	output['agents'] = new_agents
+	output['game_state'] = game_state
+	output['pointers'] = new_pointers
+	output['agents_freeze_values'] = agents_freeze_values
+	output['programs'] = programs
+
+	return output
+
+
+def perform_n_iterations_compiled(
+	n: int,
+	post_iteration_callback: Callable[[Dict], None],
+
+	# immutable between iterations
+	game_iterate,
+	instruction_set,
+	instruction_costs,
+	instruction_ticks_per_game_ticks,
+
+	# mutable between iterations
+	agents,
+	game_state,
+	pointers,
+	agents_freeze_values,
+
+	stop_condition: Optional[Callable[[Dict], bool]] = None, # e.g. engine.all_agents_dead, checked after every game tick
+	program_cache=None
+):
+	programs = None
+	for _ in range(n):
+		result = iterate_compiled(
+			game_iterate=game_iterate,
+			instruction_set=instruction_set,
+			instruction_costs=instruction_costs,
+			instruction_ticks_per_game_ticks=instruction_ticks_per_game_ticks,
+
+			agents=agents,
+			game_state=game_state,
+			pointers=pointers,
+			agents_freeze_values=agents_freeze_values,
+			programs=programs,
+			program_cache=program_cache,
+		)
+
+		post_iteration_callback(result)
+
+		agents = result['agents']
+		game_state = result['game_state']
+		pointers = result['pointers']
+		agents_freeze_values = result['agents_freeze_values']
+		programs = result['programs']
+
+		if stop_condition is not None and stop_condition(result):
+			break
@@ -0,0 +1,72 @@
+from random import Random
+
+from .engine import iterate
+from .compiled_engine import iterate_compiled
+from games.snake.snake_agents import generate_spiral_agent
+from games.snake.snake_game_engine import snake_game_generator, generate_snake_game_state
+from games.snake.snake_instructions import generate_snake_instruction_set
+
+SYMBOLS = [ord(s) for s in 'JL↑→↓←']
+
+def generate_random_agent(rng: Random, length: int):
+	return [rng.choice(SYMBOLS) if rng.random() < 0.6 else rng.randint(0, length - 1) for _ in range(length)]
+
+def run(iterate_function, agents, instruction_costs, seed, n, is_torus=False):
+	rng = Random(seed)
+	grid_column_length, grid_row_length = 7, 5
+	game_iterate = snake_game_generator(lambda turn_count: [rng.randint(0, 34)] if turn_count % 3 == 0 else [])
+	game_state = generate_snake_game_state(grid_column_length, grid_row_length, [(3 * i) % 35 for i in range(len(agents))], is_torus)
+	pointers = [0 for _ in agents]
+	agents_freeze_values = [0 for _ in agents]
+	programs = None
+
+	history = []
+	for _ in range(n):
+		kwargs = dict(
+			game_iterate=game_iterate,
+			instruction_set=generate_snake_instruction_set(),
+			instruction_costs=instruction_costs,
+			instruction_ticks_per_game_ticks=13,
+			agents=agents,
+			game_state=game_state,
+			pointers=pointers,
+			agents_freeze_values=agents_freeze_values,
+		)
+		if iterate_function is iterate_compiled:
+			kwargs['programs'] = programs
+		try:
+			result = iterate_function(**kwargs)
+		except KeyError: # which agent raises first may differ, only the failure matters
+			history.append('KeyError')
+			break
+		agents = result['agents']
+		game_state = result['game_state']
+		pointers = result['pointers']
+		agents_freeze_values = result['agents_freeze_values']
+		programs = result.get('programs')
+		history.append((
+			[list(a) for a in agents],
+			dict(game_state),
+			list(pointers),
+			list(agents_freeze_values),
+		))
+	return history
+
+def test_spiral_agent_is_identical():
+	agents = [generate_spiral_agent() for _ in range(3)]
+	instruction_costs = {s: 1 + i % 3 for i, s in enumerate(SYMBOLS)}
+	assert run(iterate, agents, instruction_costs, 0, 30) == run(iterate_compiled, agents, instruction_costs, 0, 30)
+
+def test_random_agents_are_identical():
+	for seed in range(200):
+		rng = Random(seed)
+		agents = [generate_random_agent(rng, rng.randint(1, 30)) for _ in range(rng.randint(1, 4))]
+		instruction_costs = {s: rng.randint(0, 4) for s in SYMBOLS}
+		assert run(iterate, agents, instruction_costs, seed, 10) == run(iterate_compiled, agents, instruction_costs, seed, 10)
+
+def test_random_agents_are_identical_on_torus():
+	for seed in range(50):
+		rng = Random(seed)
+		agents = [generate_random_agent(rng, rng.randint(1, 30)) for _ in range(rng.randint(1, 4))]
+		instruction_costs = {s: rng.randint(0, 4) for s in SYMBOLS}
+		assert run(iterate, agents, instruction_costs, seed, 10, True) == run(iterate_compiled, agents, instruction_costs, seed, 10, True)
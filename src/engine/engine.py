@@ -2,8 +2,39 @@
 # each action requires↲ a cost in resources, and a cost in tick. an agent is frozen during tick cost
 # an agent is defined by a memory space that contains both instructions and data. It executes instructions incrementally following a pointer. There may be jump instructions. instructions are sent as a (possibly useless) action to the game, or modify the internal state of the agent.
 # if an agent pointer reaches an illegal position, the agent dies
+# the game state only changes between game ticks, so an agent that comes back to the same (pointer, memory, freeze value) during a game tick loops until its end
+
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.instrumentation import Instrumentation, NULL_INSTRUMENTATION, LEVEL_INFO
+
+def fast_forward_loop(
+	execution_log: List[Tuple[int, Optional[int], int, int]],
+	cycle_start: int,
+	tick: int,
+	ticks: int
+) -> Tuple[int, int, Optional[int]]:
+	'''
+		execution_log holds (tick, order, new pointer, new freeze value) for every instruction executed by an agent during the game tick
+		the agent is about to execute, at tick, from the same state as before execution_log[cycle_start]
+
+		returns (pointer, freeze value, last order or None) of the agent at the end of the game tick
+	'''
+	cycle = execution_log[cycle_start:]
+	period = tick - cycle[0][0]
+	last_ticks = [t + ((ticks - 1 - t) // period) * period for (t, _, _, _) in cycle]
+	last_index = max(range(len(cycle)), key=lambda i: last_ticks[i])
+	_, _, pointer, freeze_value = cycle[last_index]
+
+	order = None
+	for i in range(last_index, last_index - len(cycle), -1): # the previous turn of the cycle wraps around
+		if cycle[i][1] is not None:
+			order = cycle[i][1]
+			break
+
+	return pointer, freeze_value - (ticks - 1 - last_ticks[last_index]), order
 
-from typing import Callable, Dict
 
 def iterate(
 	# immutable between iterations
@@ -16,35 +47,97 @@ def iterate(
 	agents,
 	game_state,
 	pointers,
-	agents_freeze_values
+	agents_freeze_values,
+
+	fast_forward_loops: bool = False, # assumes instructions only depend on the agent and the game state
+	instrumentation: Instrumentation = NULL_INSTRUMENTATION # counts 'engine.instructions' and 'engine.deaths', emits 'engine.death' info events
 ) -> Dict:
+	'''
+		with a profiler attached to instrumentation, times every instruction per opcode, counts agent ticks per kind and
+		times the 'engine.instructions' and 'engine.game_iterate' phases
+	'''
+	is_death_logged = instrumentation.is_enabled('engine.death', LEVEL_INFO)
+	nb_instructions = 0
+	nb_deaths = 0
+	nb_frozen = 0
+
+	profiler = instrumentation.profiler
+	if profiler is not None:
+		opcode_counts = dict()
+		opcode_seconds = dict()
+		instructions_start = perf_counter()
+
 	actions = [None for _ in agents]
 	new_agents = [a for a in agents]
 	new_pointers = [p for p in pointers]
 
+	if fast_forward_loops:
+		execution_logs = [[] for _ in agents]
+		seen_states = [dict() for _ in agents] # (pointer, freeze value, memory version) -> index in execution log
+		memory_versions = [0 for _ in agents]
+		is_fast_forwarded = [False for _ in agents]
+		idle_agents = [] # fast forwarded agents that produced no order during the game tick
+
 	for instruction_ticks_counter in range(instruction_ticks_per_game_ticks):
 		for agent_id in range(len(agents)):
 			if game_state['dead_agents'][agent_id]:
 				continue
 
+			if fast_forward_loops and is_fast_forwarded[agent_id]:
+				continue
+
 			agents_freeze_values[agent_id] -= 1
 			if agents_freeze_values[agent_id] >= 0:
+				nb_frozen += 1
 				continue
 
 			current_agent = new_agents[agent_id]
 			current_pointer = new_pointers[agent_id]
+
+			if fast_forward_loops:
+				state = (current_pointer, agents_freeze_values[agent_id], memory_versions[agent_id])
+				if state in seen_states[agent_id]:
+					new_pointers[agent_id], agents_freeze_values[agent_id], order = fast_forward_loop(
+						execution_log=execution_logs[agent_id],
+						cycle_start=seen_states[agent_id][state],
+						tick=instruction_ticks_counter,
+						ticks=instruction_ticks_per_game_ticks
+					)
+					actions[agent_id] = order if order is not None else actions[agent_id]
+					is_fast_forwarded[agent_id] = True
+					if actions[agent_id] is None: # an order submitted before the loop still counts
+						idle_agents.append(agent_id)
+					continue
+				seen_states[agent_id][state] = len(execution_logs[agent_id])
+				memory_version_before = getattr(current_agent, 'version', None) # AgentMemory is written in place
+
 			current_instruction_symbol = current_agent[current_pointer]
 			current_instruction_operation = instruction_set[current_instruction_symbol]
 
-			instruction_result = current_instruction_operation(
-				agent_id=agent_id,
-				agent=current_agent,
-				game_state=game_state,
-				pointer=current_pointer
-			)
+			if profiler is None:
+				instruction_result = current_instruction_operation(
+					agent_id=agent_id,
+					agent=current_agent,
+					game_state=game_state,
+					pointer=current_pointer
+				)
+			else:
+				instruction_start = perf_counter()
+				instruction_result = current_instruction_operation(
+					agent_id=agent_id,
+					agent=current_agent,
+					game_state=game_state,
+					pointer=current_pointer
+				)
+				opcode_seconds[current_instruction_symbol] = opcode_seconds.get(current_instruction_symbol, 0.0) + perf_counter() - instruction_start
+				opcode_counts[current_instruction_symbol] = opcode_counts.get(current_instruction_symbol, 0) + 1
+			nb_instructions += 1
 
 			if instruction_result is None:
 				game_state['dead_agents'][agent_id] = True
+				nb_deaths += 1
+				if is_death_logged:
+					instrumentation.emit('engine.death', LEVEL_INFO, f"agent #{agent_id} died executing <{chr(current_instruction_symbol)}> at {current_pointer}")
 				continue
 
 			actions[agent_id] = instruction_result['order'] if instruction_result['order'] is not None else actions[agent_id]
@@ -52,20 +145,71 @@ def iterate(
 			new_pointers[agent_id] = instruction_result['new_agent_pointer']
 			agents_freeze_values[agent_id] += instruction_costs[current_instruction_symbol]
 
-	game_state = game_iterate(
-		actions=actions,
-		state=game_state,
-	)
+			if fast_forward_loops:
+				new_agent = new_agents[agent_id]
+				if new_agent is not current_agent:
+					is_memory_modified = new_agent != current_agent
+				else:
+					is_memory_modified = getattr(new_agent, 'version', None) != memory_version_before
+				if is_memory_modified:
+					memory_versions[agent_id] += 1
+				execution_logs[agent_id].append((
+					instruction_ticks_counter,
+					instruction_result['order'],
+					new_pointers[agent_id],
+					agents_freeze_values[agent_id]
+				))
+
+	instrumentation.count('engine.instructions', nb_instructions)
+	instrumentation.count('engine.deaths', nb_deaths)
+
+	if profiler is None:
+		game_state = game_iterate(
+			actions=actions,
+			state=game_state,
+		)
+	else:
+		profiler.record_instructions(
+			'engine.instructions',
+			perf_counter() - instructions_start,
+			opcode_counts,
+			opcode_seconds,
+			nb_active=nb_instructions,
+			nb_frozen=nb_frozen,
+			nb_inactive=len(agents) * instruction_ticks_per_game_ticks - nb_instructions - nb_frozen
+		)
+		with profiler.phase('engine.game_iterate'):
+			game_state = game_iterate(
+				actions=actions,
+				state=game_state,
+			)
 
 	output = dict()
 	output['agents'] = new_agents
 	output['game_state'] = game_state
 	output['pointers'] = new_pointers
 	output['agents_freeze_values'] = agents_freeze_values
+	if fast_forward_loops:
+		output['idle_agents'] = idle_agents
 
 	return output
 
 
+def all_agents_dead(result: Dict) -> bool:
+	return all(result['game_state']['dead_agents'])
+
+
+def all_agents_dead_or_idle(result: Dict) -> bool:
+	'''
+		whether every agent is dead or produced no order during its last game tick, ending in a loop (needs fast_forward_loops)
+		this is not a steady state: the game still moves idle agents, the snake game with their previous action, so food,
+		growth and deaths keep changing, and an idle agent leaves its loop once its observations change
+	'''
+	idle_agents = set(result.get('idle_agents', []))
+	dead_agents = result['game_state']['dead_agents']
+	return all(dead_agents[agent_id] or agent_id in idle_agents for agent_id in range(len(dead_agents)))
+
+
 def perform_n_iterations(
 	n: int,
 	post_iteration_callback: Callable[[Dict], None],
@@ -80,7 +224,11 @@ def perform_n_iterations(
 	agents,
 	game_state,
 	pointers,
-	agents_freeze_values
+	agents_freeze_values,
+
+	fast_forward_loops: bool = False,
+	stop_condition: Optional[Callable[[Dict], bool]] = None, # e.g. all_agents_dead, checked after every game tick
+	instrumentation: Instrumentation = NULL_INSTRUMENTATION
 ):
 	for _ in range(n):
 		result = iterate(
@@ -93,6 +241,8 @@ def perform_n_iterations(
 			game_state=game_state,
 			pointers=pointers,
 			agents_freeze_values=agents_freeze_values,
+			fast_forward_loops=fast_forward_loops,
+			instrumentation=instrumentation,
 		)
 
 		post_iteration_callback(result)
@@ -101,3 +251,6 @@ def perform_n_iterations(
 		game_state = result['game_state']
 		pointers = result['pointers']
 		agents_freeze_values = result['agents_freeze_values']
+
+		if stop_condition is not None and stop_condition(result):
+			break
@@ -0,0 +1,89 @@
+from random import Random
+
+from .engine import iterate, perform_n_iterations, all_agents_dead, all_agents_dead_or_idle
+from .agent_memory import to_agent_memories
+from games.snake.snake_agents import generate_spiral_agent
+from games.snake.snake_game_engine import snake_game_generator, generate_snake_game_state
+from games.snake.snake_instructions import generate_snake_instruction_set
+
+SYMBOLS = [ord(s) for s in 'JL↑→↓←']
+
+def play(agents, instruction_costs, seed, fast_forward_loops):
+	rng = Random(seed)
+	game_iterate = snake_game_generator(lambda turn_count: [rng.randint(0, 47)])
+	game_state = generate_snake_game_state(8, 6, [(5 * i) % 48 for i in range(len(agents))])
+	pointers = [0 for _ in agents]
+	agents_freeze_values = [0 for _ in agents]
+	history = []
+	for _ in range(10):
+		try:
+			result = iterate(
+				game_iterate=game_iterate,
+				instruction_set=generate_snake_instruction_set(),
+				instruction_costs=instruction_costs,
+				instruction_ticks_per_game_ticks=50,
+				agents=agents,
+				game_state=game_state,
+				pointers=pointers,
+				agents_freeze_values=agents_freeze_values,
+				fast_forward_loops=fast_forward_loops,
+			)
+		except KeyError:
+			history.append('KeyError')
+			break
+		agents, game_state, pointers = result['agents'], result['game_state'], result['pointers']
+		history.append(([list(a) for a in agents], dict(game_state), list(pointers), list(result['agents_freeze_values'])))
+	return history
+
+def test_fast_forwarded_loops_give_same_results():
+	for seed in range(200):
+		rng = Random(seed)
+		agents = [
+			[rng.choice(SYMBOLS) if rng.random() < 0.6 else rng.choice([0, 1, rng.randint(0, 15)]) for _ in range(rng.randint(1, 16))]
+			for _ in range(rng.randint(1, 4))
+		]
+		if seed % 4 == 0:
+			agents.append(generate_spiral_agent())
+		instruction_costs = {s: rng.randint(1, 4) for s in SYMBOLS}
+		expected = play(agents, instruction_costs, seed, False)
+		assert play(agents, instruction_costs, seed, True) == expected
+		assert play(to_agent_memories(agents), instruction_costs, seed, True) == expected
+
+def test_idle_loop_and_early_exit():
+	# J 0 0 loops forever without submitting any order
+	agents = [[ord('J'), 0, 0], [ord('L'), ord('↑'), 0]]
+	results = []
+	perform_n_iterations(
+		n=100,
+		post_iteration_callback=results.append,
+		game_iterate=snake_game_generator(lambda turn_count: []),
+		instruction_set=generate_snake_instruction_set(),
+		instruction_costs={s: 1 for s in SYMBOLS},
+		instruction_ticks_per_game_ticks=100,
+		agents=agents,
+		game_state=generate_snake_game_state(4, 1, [0, 0]),
+		pointers=[0, 0],
+		agents_freeze_values=[0, 0],
+		fast_forward_loops=True,
+		stop_condition=all_agents_dead,
+	)
+	assert results[0]['idle_agents'] == [0]
+	assert results[0]['game_state']['dead_agents'] == [False, True]
+	assert len(results) == 4 # agent 0 walks right by default until it leaves the grid
+
+def test_agents_submitting_an_order_before_their_loop_are_not_idle():
+	# ↑ then J 0 1 loops on J after an order, J 0 0 loops without any
+	for agents, is_idle in [([[ord('↑'), ord('J'), 0, 1]], False), ([[ord('J'), 0, 0]], True)]:
+		result = iterate(
+			game_iterate=snake_game_generator(lambda turn_count: []),
+			instruction_set=generate_snake_instruction_set(),
+			instruction_costs={s: 1 for s in SYMBOLS},
+			instruction_ticks_per_game_ticks=20,
+			agents=agents,
+			game_state=generate_snake_game_state(4, 4, [12]),
+			pointers=[0],
+			agents_freeze_values=[0],
+			fast_forward_loops=True,
+		)
+		assert result['idle_agents'] == ([0] if is_idle else [])
+		assert all_agents_dead_or_idle(result) == is_idle
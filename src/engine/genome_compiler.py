@@ -0,0 +1,175 @@
+# compiles the code a genome can reach into a Python function running the agent for a whole game tick
+# J, L and submit are inlined, J whose condition no reachable L writes become plain assignments, and straight runs of
+# instructions follow each other without going back to the dispatch, which is a binary tree of comparisons on the pointer
+# genomes whose reachable L may write code cells (self-modifying code) are not compiled, the decoded program of
+# compiled_engine runs them instead
+# compiled programs are cached by a hash of the genome, so genomes surviving across generations are compiled once
+
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from engine.compiled_engine import OPCODE_FATAL, OPCODE_KEY_ERROR, OPCODE_JUMP, OPCODE_LOAD, OPCODE_SUBMIT, INSTRUCTION_OPCODES, is_compilable, decode_agent
+from engine.genome_verifier import reachable_code, is_self_modifying
+from utils.grid_topology import OFF_GRID
+
+MAX_RUN_LENGTH = 16 # instructions following each other in a run before going back to the dispatch
+
+# takes (agent, pointer, freeze value, ticks, agent cell, neighbor tables, is agent writable in place)
+# returns (agent, pointer, freeze value, last order or None, is dead)
+AgentRunner = Callable[[any, int, int, int, int, Dict[int, List[int]], bool], Tuple[any, int, int, Optional[int], bool]]
+
+
+class CompiledGenome(object):
+	"""compiled code of a genome for an agent starting at entry, its source kept for inspection"""
+	def __init__(self, entry: int, reachable: Set[int], source: str, run: AgentRunner):
+		self.entry = entry
+		self.reachable = reachable
+		self.source = source
+		self.run = run
+
+
+def generate_instruction_source(program, genome: List[int], position: int, written_cells: Set[int]) -> Tuple[List[str], Optional[int]]:
+	''' lines executing the instruction at position, and the pointer statically following it, None if it ends the run '''
+	opcode, cost, first, second, third, fourth = program[position]
+	dead = f"return agent, {position}, freeze, action, True"
+	if opcode == OPCODE_FATAL:
+		return [dead], None
+	if opcode == OPCODE_KEY_ERROR:
+		return [f"raise KeyError({first})"], None
+	if opcode == OPCODE_SUBMIT:
+		return [f"action = {first}", f"freeze += {cost}"], second
+	if opcode == OPCODE_LOAD:
+		return [
+			f"value = 1 if neighbors_{first}[cell] != {OFF_GRID} else 0",
+			f"if agent[{third}] != value:",
+			"	if not is_writable:",
+			"		agent = [a for a in agent]",
+			"		is_writable = True",
+			f"	agent[{third}] = value",
+			f"freeze += {cost}",
+		], fourth
+
+	# OPCODE_JUMP
+	if (position + 1) not in written_cells:
+		target = first if genome[position + 1] == 0 else second
+		if target < 0:
+			return [dead], None
+		return [f"freeze += {cost}"], target
+	lines = [f"if agent[{position + 1}] == 0:"]
+	lines += [f"	{dead}"] if first < 0 else [f"	pointer = {first}"]
+	lines += ["else:"]
+	lines += [f"	{dead}"] if second < 0 else [f"	pointer = {second}"]
+	lines += [f"freeze += {cost}", "continue"]
+	return lines, None
+
+
+def generate_run_source(program, genome: List[int], position: int, written_cells: Set[int]) -> List[str]:
+	''' lines executing instructions from position on, as long as the next one is known and the game tick goes on '''
+	lines = []
+	run = set()
+	while True:
+		run.add(position)
+		instruction_lines, next_position = generate_instruction_source(program, genome, position, written_cells)
+		lines += instruction_lines
+		if next_position is None:
+			return lines
+		if next_position in run or len(run) >= MAX_RUN_LENGTH:
+			return lines + [f"pointer = {next_position}", "continue"]
+		lines += [
+			"if freeze >= 1 or tick >= ticks:",
+			f"	pointer = {next_position}",
+			"	continue",
+			"freeze -= 1",
+			"tick += 1",
+		]
+		position = next_position
+
+
+def generate_dispatch_source(positions: List[int], runs: Dict[int, List[str]]) -> List[str]:
+	''' binary tree of comparisons on pointer, ending in the run of every position '''
+	if len(positions) == 1:
+		return runs[positions[0]]
+	middle = len(positions) // 2
+	return (
+		[f"if pointer < {positions[middle]}:"]
+		+ ["	" + line for line in generate_dispatch_source(positions[:middle], runs)]
+		+ ["else:"]
+		+ ["	" + line for line in generate_dispatch_source(positions[middle:], runs)]
+	)
+
+
+def compile_genome(
+	genome: List[int],
+	instruction_set,
+	instruction_costs,
+	entry: int = 0
+) -> Optional[CompiledGenome]:
+	''' None if the instruction set is not the snake one or the reachable code modifies itself '''
+	if not (0 <= entry < len(genome)) or not is_compilable(instruction_set, instruction_costs):
+		return None
+	genome = list(genome)
+	program = decode_agent(genome, instruction_set, instruction_costs)
+	reachable, written_cells = reachable_code(genome, program, entry)
+	if is_self_modifying(program, reachable, written_cells):
+		return None
+
+	positions = sorted(reachable)
+	runs = {position: generate_run_source(program, genome, position, written_cells) for position in positions}
+	directions = sorted({program[position][2] for position in positions if program[position][0] == OPCODE_LOAD})
+	lines = (
+		["def run_agent(agent, pointer, freeze, ticks, cell, neighbors, is_writable):"]
+		+ [f"	neighbors_{direction} = neighbors[{direction}]" for direction in directions]
+		+ [
+			"	action = None",
+			"	tick = 0",
+			"	while tick < ticks:",
+			"		if freeze >= 1:",
+			"			skipped_ticks = freeze if freeze < ticks - tick else ticks - tick",
+			"			freeze -= skipped_ticks",
+			"			tick += skipped_ticks",
+			"			continue",
+			"		freeze -= 1",
+			"		tick += 1",
+		]
+		+ ["		" + line for line in generate_dispatch_source(positions, runs)]
+		+ ["	return agent, pointer, freeze, action, False"]
+	)
+	source = "\n".join(lines) + "\n"
+	namespace = dict()
+	exec(compile(source, f"<genome compiled from {entry}>", 'exec'), namespace)
+	return CompiledGenome(entry, reachable, source, namespace['run_agent'])
+
+
+class CompiledGenomeCache(object):
+	"""
+		compiled genomes keyed by a hash of the genome, the entry pointer and the opcodes and costs of the instruction set
+		genomes that cannot be compiled are remembered too, at most max_size entries are kept, least recently used first out
+	"""
+	def __init__(self, max_size: int = 10 * 1000):
+		self.max_size = max_size
+		self.memory = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+
+	def genome_key(self, genome: List[int], instruction_set, instruction_costs, entry: int) -> str:
+		instructions = sorted((symbol, INSTRUCTION_OPCODES.get(function), instruction_costs.get(symbol)) for symbol, function in instruction_set.items())
+		return blake2b(repr((list(genome), entry, instructions)).encode(), digest_size=16).hexdigest()
+
+	def get(self, genome: List[int], instruction_set, instruction_costs, entry: int = 0) -> Optional[CompiledGenome]:
+		key = self.genome_key(genome, instruction_set, instruction_costs, entry)
+		if key in self.memory:
+			self.memory.move_to_end(key)
+			self.hits += 1
+			return self.memory[key]
+
+		self.misses += 1
+		compiled = compile_genome(genome, instruction_set, instruction_costs, entry)
+		self.memory[key] = compiled
+		if len(self.memory) > self.max_size:
+			self.memory.popitem(last=False)
+		return compiled
+
+	def hit_rate(self) -> float:
+		total = self.hits + self.misses
+		return self.hits / total if total > 0 else 0.0
@@ -0,0 +1,42 @@
+from random import Random
+
+from .compiled_engine import iterate_compiled
+from .compiled_engine_test import SYMBOLS, generate_random_agent, run
+from .engine import iterate
+from .genome_compiler import CompiledGenomeCache, compile_genome
+from games.snake.snake_agents import generate_spiral_agent
+from games.snake.snake_instructions import generate_snake_instruction_set, generate_snake_instruction_costs
+
+def generate_cached_iterate(program_cache: CompiledGenomeCache):
+	state = dict()
+	state['programs'] = None
+	def iterate_cached(**kwargs):
+		result = iterate_compiled(programs=state['programs'], program_cache=program_cache, **kwargs)
+		state['programs'] = result['programs']
+		return result
+	return iterate_cached
+
+def test_compiled_genomes_are_identical():
+	program_cache = CompiledGenomeCache()
+	agents = [generate_spiral_agent() for _ in range(3)]
+	instruction_costs = {s: 1 + i % 3 for i, s in enumerate(SYMBOLS)}
+	assert run(iterate, agents, instruction_costs, 0, 30) == run(generate_cached_iterate(program_cache), agents, instruction_costs, 0, 30)
+	assert (program_cache.hits, program_cache.misses) == (2, 1)
+
+	nb_compiled = 0
+	for seed in range(300):
+		rng = Random(seed)
+		agents = [generate_random_agent(rng, rng.randint(1, 30)) for _ in range(rng.randint(1, 4))]
+		instruction_costs = {s: rng.randint(0, 4) for s in SYMBOLS}
+		nb_compiled += sum(compile_genome(agent, generate_snake_instruction_set(), instruction_costs) is not None for agent in agents)
+		for is_torus in [False, True]:
+			assert run(iterate, agents, instruction_costs, seed, 10, is_torus) == run(generate_cached_iterate(program_cache), agents, instruction_costs, seed, 10, is_torus)
+	assert nb_compiled > 300
+
+def test_self_modifying_genomes_are_not_compiled():
+	instruction_set, instruction_costs = generate_snake_instruction_set(), generate_snake_instruction_costs()
+	# L writes into its own direction operand
+	assert compile_genome([ord('L'), ord('↑'), 1, ord('→'), 0], instruction_set, instruction_costs) is None
+	# L writes the condition of the following J, which stays a runtime test
+	compiled = compile_genome([ord('L'), ord('↑'), 4, ord('J'), 0, 0, ord('→'), 0], instruction_set, instruction_costs)
+	assert compiled is not None and 'agent[4] == 0' in compiled.source
@@ -0,0 +1,55 @@
+# one byte per gene instead of a boxed int: genes are either instruction symbols (unicode code points such as ord('↑'))
+# or small numbers (jump targets, conditions, directions), so both fit in a byte once symbols get codes of their own
+# numbers below first_symbol_code are their own code, as are symbols among them (ord('J') is the number 74),
+# symbols above take the last codes, in the order of the instruction set
+
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+NB_CODES = 256
+
+
+class GenomeEncoding(object):
+	"""
+		translation table between genes and byte codes, for one instruction set
+
+		a gene that is neither a symbol nor a number below first_symbol_code (252 for the snake instruction set) cannot be encoded and raises a ValueError,
+		which genomes drawn from instruction symbols and memory positions of short agents never do
+	"""
+	def __init__(self, symbols: Iterable[int]):
+		self.symbols = list(symbols)
+		wide_symbols = [symbol for symbol in self.symbols if not (0 <= symbol < NB_CODES)]
+		assert len(set(wide_symbols)) == len(wide_symbols) and len(wide_symbols) < NB_CODES
+		self.first_symbol_code = NB_CODES - len(wide_symbols)
+		assert all(symbol < self.first_symbol_code for symbol in self.symbols if symbol not in wide_symbols), 'a symbol collides with a wide symbol code'
+
+		self.symbol_codes = {symbol: self.first_symbol_code + i for i, symbol in enumerate(wide_symbols)}
+		self.code_genes = np.arange(NB_CODES, dtype=np.int64) # code -> gene
+		self.code_genes[self.first_symbol_code:] = wide_symbols
+
+	def encode_gene(self, gene: int) -> int:
+		code = self.symbol_codes.get(gene)
+		if code is not None:
+			return code
+		if not (0 <= gene < self.first_symbol_code):
+			raise ValueError(f"gene <{gene}> has no byte code")
+		return gene
+
+	def encode(self, genome: Iterable[int]) -> bytes:
+		return bytes(self.encode_gene(gene) for gene in genome)
+
+	def decode(self, data) -> List[int]:
+		return self.code_genes[np.frombuffer(data, dtype=np.uint8)].tolist()
+
+	def __eq__(self, other) -> bool:
+		return isinstance(other, GenomeEncoding) and self.symbols == other.symbols
+
+	__hash__ = None
+
+	def __reduce__(self):
+		return (GenomeEncoding, (self.symbols,))
+
+
+def generate_genome_encoding(instruction_set: Dict[int, any]) -> GenomeEncoding:
+	return GenomeEncoding(instruction_set.keys())
@@ -0,0 +1,20 @@
+import pickle
+
+import pytest
+
+from .genome_encoding import generate_genome_encoding
+from games.snake.snake_agents import generate_spiral_agent
+from games.snake.snake_instructions import generate_snake_instruction_set
+
+def test_genome_encoding_round_trip():
+	encoding = generate_genome_encoding(generate_snake_instruction_set())
+	agent = generate_spiral_agent()
+	data = encoding.encode(agent)
+	assert len(data) == len(agent)
+	assert encoding.decode(data) == agent
+	assert encoding.encode([ord('J'), 0, 251, ord('↑')]) == bytes([74, 0, 251, 252])
+	assert pickle.loads(pickle.dumps(encoding)) == encoding
+
+	for gene in [-1, 252, 1000]:
+		with pytest.raises(ValueError):
+			encoding.encode([gene])
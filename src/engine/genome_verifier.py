@@ -0,0 +1,142 @@
+# static pass over a genome, following the code reachable from pointer 0 without running the game
+# it tells apart genomes that always die or never act, so that their fitness can be given without simulation
+# cells written by reachable L are considered unknown (0 or 1) when they are J conditions; if an L may write into
+# reachable code, the program modifies itself and its verdict is left unknown
+
+from typing import Dict, List, Optional, Set, Tuple
+
+from engine.compiled_engine import OPCODE_FATAL, OPCODE_KEY_ERROR, OPCODE_JUMP, OPCODE_LOAD, OPCODE_SUBMIT, is_compilable, decode_agent
+
+VERDICT_DEAD_ON_ARRIVAL = 'dead_on_arrival' # always dies, before the end of the first game tick: no order ever reaches the game
+VERDICT_DOOMED = 'doomed' # always dies, maybe after submitting orders
+VERDICT_NON_ACTING = 'non_acting' # may loop forever, and never submits any order
+VERDICT_UNKNOWN = 'unknown' # has to be simulated
+
+DEATH = -1 # successor of an instruction killing the agent
+
+
+def reachable_successors(
+	genome: List[int],
+	program,
+	position: int,
+	written_cells: Set[int]
+) -> List[int]:
+	''' positions the instruction at position may lead to, DEATH if it may kill the agent '''
+	opcode, _, first, second, _, fourth = program[position]
+	if opcode == OPCODE_SUBMIT:
+		return [second]
+	if opcode == OPCODE_LOAD:
+		return [fourth]
+	if opcode == OPCODE_JUMP:
+		if (position + 1) in written_cells:
+			successors = [first, second]
+		else:
+			successors = [first if genome[position + 1] == 0 else second]
+		return [DEATH if successor < 0 else successor for successor in successors]
+	return [DEATH] # OPCODE_FATAL and OPCODE_KEY_ERROR, which the fitness functions count as a death
+
+
+def code_cells(program, position: int, length: int) -> Set[int]:
+	''' cells whose value the decoding of position depends on, except J conditions that are read at execution '''
+	opcode = program[position][0]
+	if opcode == OPCODE_SUBMIT:
+		cells = [position]
+	elif opcode == OPCODE_JUMP:
+		cells = [position, position + 2]
+	else: # OPCODE_LOAD, OPCODE_FATAL and OPCODE_KEY_ERROR, which may come from an L operand
+		cells = [position, position + 1, position + 2]
+	return {cell for cell in cells if cell < length}
+
+
+def longest_delay_before_death(
+	genome: List[int],
+	program,
+	written_cells: Set[int]
+) -> Optional[int]:
+	''' upper bound of the tick at which an agent starting at pointer 0 dies, None if a cycle is reachable (iterative depth first search) '''
+	delays = dict()
+	on_path = set()
+	stack = [(0, False)]
+	while len(stack) > 0:
+		position, is_expanded = stack.pop()
+		opcode, cost = program[position][0], program[position][1]
+		is_terminal = opcode == OPCODE_FATAL or opcode == OPCODE_KEY_ERROR
+		successors = [] if is_terminal else [s for s in reachable_successors(genome, program, position, written_cells) if s != DEATH]
+
+		if not is_expanded:
+			if position in delays:
+				continue
+			on_path.add(position)
+			stack.append((position, True))
+			for successor in successors:
+				if successor in on_path:
+					return None
+				if successor not in delays:
+					stack.append((successor, False))
+			continue
+
+		on_path.discard(position)
+		delays[position] = max([max(cost, 1) + delays[successor] for successor in successors], default=0)
+	return delays[0]
+
+
+def reachable_code(
+	genome: List[int],
+	program,
+	entry: int = 0
+) -> Tuple[Set[int], Set[int]]:
+	''' positions reachable from entry, and the cells their L may write, computed together until both are stable '''
+	written_cells = set()
+	while True:
+		reachable = set()
+		to_visit = [entry]
+		while len(to_visit) > 0:
+			position = to_visit.pop()
+			if position in reachable:
+				continue
+			reachable.add(position)
+			to_visit += [s for s in reachable_successors(genome, program, position, written_cells) if s != DEATH]
+		new_written_cells = {program[p][4] for p in reachable if program[p][0] == OPCODE_LOAD}
+		if new_written_cells == written_cells:
+			return reachable, written_cells
+		written_cells = new_written_cells
+
+
+def is_self_modifying(program, reachable: Set[int], written_cells: Set[int]) -> bool:
+	''' whether a reachable L may write a cell the decoding of reachable code depends on '''
+	return any(len(code_cells(program, position, len(program)) & written_cells) > 0 for position in reachable)
+
+
+def analyze_genome(
+	genome: List[int],
+	instruction_set,
+	instruction_costs,
+	instruction_ticks_per_game_ticks: int
+) -> Dict:
+	'''
+		returns the 'verdict' of genome as an agent starting at pointer 0 with a freeze value of 0,
+		and the 'reachable' positions of its code
+
+		a genome dies on arrival when every path from pointer 0 ends in a death, and the slowest of them dies by
+		tick instruction_ticks_per_game_ticks - 1: an instruction of cost c delays the next one by at most max(c, 1) ticks
+	'''
+	output = dict()
+	output['verdict'] = VERDICT_UNKNOWN
+	output['reachable'] = []
+	if len(genome) == 0 or not is_compilable(instruction_set, instruction_costs):
+		return output
+
+	program = decode_agent(genome, instruction_set, instruction_costs)
+
+	reachable, written_cells = reachable_code(genome, program)
+	output['reachable'] = sorted(reachable)
+
+	if is_self_modifying(program, reachable, written_cells):
+		return output
+
+	death_delay = longest_delay_before_death(genome, program, written_cells)
+	if death_delay is not None:
+		output['verdict'] = VERDICT_DEAD_ON_ARRIVAL if death_delay <= instruction_ticks_per_game_ticks - 1 else VERDICT_DOOMED
+	elif all(program[position][0] != OPCODE_SUBMIT for position in reachable):
+		output['verdict'] = VERDICT_NON_ACTING
+	return output
@@ -0,0 +1,74 @@
+from random import Random
+
+from .engine import iterate
+from .genome_verifier import analyze_genome, VERDICT_DEAD_ON_ARRIVAL, VERDICT_DOOMED, VERDICT_NON_ACTING, VERDICT_UNKNOWN
+from games.snake.snake_agents import generate_spiral_agent
+from games.snake.snake_game_engine import generate_snake_game_state
+from games.snake.snake_instructions import generate_snake_instruction_set
+
+SYMBOLS = [ord(s) for s in 'JL↑→↓←'] + [ord('?')]
+
+def static_game_iterate(actions, state):
+	state['actions'] = actions
+	return state
+
+def play(genome, instruction_costs, instruction_ticks_per_game_ticks, n):
+	''' (game tick of the death or None, whether an order was ever submitted) '''
+	game_state = generate_snake_game_state(5, 5, [12])
+	agents, pointers, agents_freeze_values = [genome], [0], [0]
+	has_acted = False
+	for game_tick in range(n):
+		try:
+			result = iterate(
+				game_iterate=static_game_iterate,
+				instruction_set=generate_snake_instruction_set(),
+				instruction_costs=instruction_costs,
+				instruction_ticks_per_game_ticks=instruction_ticks_per_game_ticks,
+				agents=agents,
+				game_state=game_state,
+				pointers=pointers,
+				agents_freeze_values=agents_freeze_values,
+			)
+		except KeyError:
+			return game_tick, has_acted
+		agents, game_state, pointers = result['agents'], result['game_state'], result['pointers']
+		has_acted = has_acted or game_state['actions'][0] is not None
+		if game_state['dead_agents'][0]:
+			return game_tick, has_acted
+	return None, has_acted
+
+def test_verdicts_hold_in_simulation():
+	rng = Random(0)
+	verdicts = set()
+	for _ in range(2000):
+		length = rng.randint(1, 12)
+		genome = [rng.choice(SYMBOLS) if rng.random() < 0.6 else rng.randint(-1, length) for _ in range(length)]
+		instruction_costs = {s: rng.randint(0, 3) for s in generate_snake_instruction_set()}
+		instruction_ticks_per_game_ticks = rng.randint(1, 10)
+		verdict = analyze_genome(genome, generate_snake_instruction_set(), instruction_costs, instruction_ticks_per_game_ticks)['verdict']
+		verdicts.add(verdict)
+
+		death_tick, has_acted = play(genome, instruction_costs, instruction_ticks_per_game_ticks, 40)
+		if verdict == VERDICT_DEAD_ON_ARRIVAL:
+			assert death_tick == 0, genome
+		elif verdict == VERDICT_DOOMED:
+			assert death_tick is not None, genome
+		elif verdict == VERDICT_NON_ACTING:
+			assert not has_acted, genome
+	assert verdicts == {VERDICT_DEAD_ON_ARRIVAL, VERDICT_DOOMED, VERDICT_NON_ACTING, VERDICT_UNKNOWN}
+
+def test_spiral_agent_has_to_be_simulated():
+	instruction_costs = {s: 1 for s in generate_snake_instruction_set()}
+	assert analyze_genome(generate_spiral_agent(), generate_snake_instruction_set(), instruction_costs, 100)['verdict'] == VERDICT_UNKNOWN
+
+def test_dead_on_arrival_snake_genomes_score_zero():
+	from games.snake.snake_fitness import compute_snake_genome_fitness, snake_genome_verdict, SNAKE_VERDICT_FITNESS
+	rng = Random(1)
+	nb_dead_on_arrival = 0
+	for _ in range(300):
+		genome = [rng.choice(SYMBOLS) if rng.random() < 0.6 else rng.randint(-1, 8) for _ in range(8)]
+		verdict = snake_genome_verdict(genome)
+		if verdict in SNAKE_VERDICT_FITNESS:
+			nb_dead_on_arrival += 1
+			assert compute_snake_genome_fitness(genome, n=5) == SNAKE_VERDICT_FITNESS[verdict], genome
+	assert nb_dead_on_arrival > 0
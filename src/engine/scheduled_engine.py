@@ -0,0 +1,133 @@
+# alternative to engine.iterate that only visits agents when they are due
+# an agent with freeze value f at instruction tick t next executes at tick t + max(f, 0): until then every visit of
+# engine.iterate would only decrement its freeze value, so these visits are replaced by one subtraction
+# due agents wait in a priority queue ordered by (tick, agent_id), which is the order in which engine.iterate runs them
+
+from heapq import heapify, heappop, heappush
+from typing import Callable, Dict
+
+def iterate_scheduled(
+	# immutable between iterations
+	game_iterate,
+	instruction_set,
+	instruction_costs,
+	instruction_ticks_per_game_ticks,
+
+	# mutable between iterations
+	agents,
+	game_state,
+	pointers,
+	agents_freeze_values
+) -> Dict:
+	'''
+		same contract and results as engine.iterate, provided that instructions only ever kill their own agent
+
+		dead agents never enter the queue, so the cost of a game tick grows with the instructions actually
+		executed rather than with agents × instruction ticks
+	'''
+	actions = [None for _ in agents]
+	new_agents = [a for a in agents]
+	new_pointers = [p for p in pointers]
+	dead_agents = game_state['dead_agents']
+	ticks = instruction_ticks_per_game_ticks
+
+	# freeze value of every agent at the start of its synced tick
+	synced_ticks = [0 for _ in agents]
+	synced_freeze_values = [f for f in agents_freeze_values]
+
+	queue = [
+		(max(agents_freeze_values[agent_id], 0), agent_id)
+		for agent_id in range(len(agents))
+		if not dead_agents[agent_id] and agents_freeze_values[agent_id] < ticks
+	]
+	heapify(queue)
+
+	while len(queue) > 0:
+		tick, agent_id = heappop(queue)
+
+		freeze_value = synced_freeze_values[agent_id] - (tick - synced_ticks[agent_id]) - 1
+		synced_ticks[agent_id] = tick + 1
+		synced_freeze_values[agent_id] = freeze_value
+
+		current_agent = new_agents[agent_id]
+		current_pointer = new_pointers[agent_id]
+		current_instruction_symbol = current_agent[current_pointer]
+		current_instruction_operation = instruction_set[current_instruction_symbol]
+
+		instruction_result = current_instruction_operation(
+			agent_id=agent_id,
+			agent=current_agent,
+			game_state=game_state,
+			pointer=current_pointer
+		)
+
+		if instruction_result is None:
+			dead_agents[agent_id] = True
+			continue
+
+		actions[agent_id] = instruction_result['order'] if instruction_result['order'] is not None else actions[agent_id]
+		new_agents[agent_id] = instruction_result['new_agent']
+		new_pointers[agent_id] = instruction_result['new_agent_pointer']
+		freeze_value += instruction_costs[current_instruction_symbol]
+		synced_freeze_values[agent_id] = freeze_value
+
+		next_tick = tick + 1 + max(freeze_value, 0)
+		if next_tick < ticks:
+			heappush(queue, (next_tick, agent_id))
+
+	# frozen visits left until the end of the game tick
+	for agent_id in range(len(agents)):
+		if dead_agents[agent_id]:
+			agents_freeze_values[agent_id] = synced_freeze_values[agent_id] # dead before or during this game tick
+		else:
+			agents_freeze_values[agent_id] = synced_freeze_values[agent_id] - (ticks - synced_ticks[agent_id])
+
+	game_state = game_iterate(
+		actions=actions,
+		state=game_state,
+	)
+
+	output = dict()
+	output['agents'] = new_agents
+	output['game_state'] = game_state
+	output['pointers'] = new_pointers
+	output['agents_freeze_values'] = agents_freeze_values
+
+	return output
+
+
+def perform_n_iterations_scheduled(
+	n: int,
+	post_iteration_callback: Callable[[Dict], None],
+
+	# immutable between iterations
+	game_iterate,
+	instruction_set,
+	instruction_costs,
+	instruction_ticks_per_game_ticks,
+
+	# mutable between iterations
+	agents,
+	game_state,
+	pointers,
+	agents_freeze_values
+):
+	for _ in range(n):
+		result = iterate_scheduled(
+			game_iterate=game_iterate,
+			instruction_set=instruction_set,
+			instruction_costs=instruction_costs,
+			instruction_ticks_per_game_ticks=instruction_ticks_per_game_ticks,
+
+			agents=agents,
+			game_state=game_state,
+			pointers=pointers,
+			agents_freeze_values=agents_freeze_values,
+		)
+
+		post_iteration_callback(result)
+
+		agents = result['agents']
+		game_state = result['game_state']
+		pointers = result['pointers']
+		agents_freeze_values = result['agents_freeze_values']
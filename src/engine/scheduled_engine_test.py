@@ -0,0 +1,48 @@
+from random import Random
+
+from .engine import iterate
+from .scheduled_engine import iterate_scheduled
+from games.snake.snake_game_engine import snake_game_generator, generate_snake_game_state
+from games.snake.snake_instructions import generate_snake_instruction_set
+
+SYMBOLS = [ord(s) for s in 'JL↑→↓←']
+
+def play(iterate_function, agents, instruction_costs, agents_freeze_values, seed):
+	rng = Random(seed)
+	game_iterate = snake_game_generator(lambda turn_count: [rng.randint(0, 47)])
+	game_state = generate_snake_game_state(8, 6, [(5 * i) % 48 for i in range(len(agents))])
+	pointers = [0 for _ in agents]
+	history = []
+	for _ in range(10):
+		try:
+			result = iterate_function(
+				game_iterate=game_iterate,
+				instruction_set=generate_snake_instruction_set(),
+				instruction_costs=instruction_costs,
+				instruction_ticks_per_game_ticks=11,
+				agents=agents,
+				game_state=game_state,
+				pointers=pointers,
+				agents_freeze_values=agents_freeze_values,
+			)
+		except KeyError:
+			history.append('KeyError')
+			break
+		agents, game_state, pointers = result['agents'], result['game_state'], result['pointers']
+		history.append((agents, dict(game_state), list(pointers), list(result['agents_freeze_values'])))
+	return history
+
+def test_same_results_as_engine_with_heterogeneous_costs():
+	for seed in range(200):
+		rng = Random(seed)
+		agents = [
+			[rng.choice(SYMBOLS) if rng.random() < 0.7 else rng.randint(0, 15) for _ in range(rng.randint(1, 16))]
+			for _ in range(rng.randint(1, 6))
+		]
+		instruction_costs = {s: rng.choice([0, 1, 2, 5, 13, 30]) for s in SYMBOLS}
+		agents_freeze_values = [rng.randint(-3, 20) for _ in agents]
+		assert (
+			play(iterate, agents, instruction_costs, list(agents_freeze_values), seed)
+			==
+			play(iterate_scheduled, agents, instruction_costs, list(agents_freeze_values), seed)
+		)
@@ -0,0 +1,239 @@
+# snake rules with bodies: a snake grows by one cell when it eats, and dies when its head leaves the grid,
+# enters a cell held by a body (its own or another one) or meets another head, on a cell or by swapping cells with it
+# every snake body is a ring buffer of its cells, and a shared occupancy bitmap tells which cells bodies hold,
+# so moving, growing and checking collisions are O(1) per snake per tick whatever the length of the snakes
+# bodies, occupancy and food cells are updated in place: the state returned by a tick shares them with the state it was given,
+# only a dead snake costs the length of its body, once, to free its cells, whether the game or the engine killed it
+
+from array import array
+from typing import Callable, Dict, List, Optional
+
+from games.snake.snake_game_engine import ACTION_SET
+from utils.free_cell_index import FreeCellIndex
+from utils.grid_topology import OFF_GRID, get_grid_topology, get_state_topology
+from utils.instrumentation import Instrumentation, NULL_INSTRUMENTATION, LEVEL_INFO
+
+
+class SnakeBody(object):
+	"""
+		cells of a snake from its tail to its head, in a ring buffer of capacity cells
+		a snake never holds more cells than the grid, so a capacity of the grid size never overflows
+	"""
+	def __init__(self, cells: List[int], capacity: int):
+		assert 0 < len(cells) <= capacity
+		self.cells = array('i', cells + [OFF_GRID for _ in range(capacity - len(cells))])
+		self.head_index = len(cells) - 1
+		self.length = len(cells)
+
+	def head(self) -> int:
+		return self.cells[self.head_index]
+
+	def tail(self) -> int:
+		return self.cells[(self.head_index - self.length + 1) % len(self.cells)]
+
+	def push_head(self, cell: int):
+		self.head_index = (self.head_index + 1) % len(self.cells)
+		self.cells[self.head_index] = cell
+		self.length += 1
+
+	def pop_tail(self) -> int:
+		cell = self.tail()
+		self.length -= 1
+		return cell
+
+	def to_list(self) -> List[int]:
+		''' cells from the tail to the head '''
+		return [self.cells[(self.head_index - i) % len(self.cells)] for i in range(self.length - 1, -1, -1)]
+
+
+def generate_growing_snake_game_state(
+	grid_column_length: int,
+	grid_row_length: int,
+	agent_positions: List[int],
+	is_torus: bool = False,
+	agent_bodies: Optional[List[List[int]]] = None, # cells of every snake from its tail to its head, one cell per snake by default
+	has_free_cells: bool = False
+) -> Dict:
+	'''
+		keys of generate_snake_game_state, plus 'bodies' (a SnakeBody per snake) and 'occupancy' (a bytearray, 1 where a body is)
+		with has_free_cells, 'free_cells' indexes the cells holding neither food nor a body, as in snake_iteration
+	'''
+	grid_size = grid_column_length * grid_row_length
+	if agent_bodies is None:
+		agent_bodies = [[position] for position in agent_positions]
+	assert [body[-1] for body in agent_bodies] == list(agent_positions)
+
+	occupancy = bytearray(grid_size)
+	for body in agent_bodies:
+		for cell in body:
+			assert occupancy[cell] == 0, f"cell {cell} is held by two bodies"
+			occupancy[cell] = 1
+
+	game_state = dict()
+	game_state['dead_agents'] = [False for _ in agent_positions]
+	game_state['grid_column_length'] = grid_column_length
+	game_state['grid_row_length'] = grid_row_length
+	game_state['topology'] = get_grid_topology(grid_column_length, grid_row_length, is_torus)
+	game_state['agent_positions'] = list(agent_positions)
+	game_state['previous_actions'] = [None for _ in agent_positions]
+	game_state['turn_count'] = 0
+	game_state['food_cells'] = set()
+	game_state['resources'] = [{'food': 0} for _ in agent_positions]
+	game_state['bodies'] = [SnakeBody(body, grid_size) for body in agent_bodies]
+	game_state['occupancy'] = occupancy
+	if has_free_cells:
+		game_state['free_cells'] = FreeCellIndex(grid_size, [cell for body in agent_bodies for cell in body])
+	return game_state
+
+
+def growing_snake_iteration(
+	actions: List[int],
+	state: Dict,
+	food_generator_per_tick: Callable[int, [List[int]]], # takes turn count returns list of new food positions
+	instrumentation: Instrumentation = NULL_INSTRUMENTATION
+) -> Dict:
+	'''
+		moves every living snake one cell, in the chosen direction or the previous one, as snake_iteration does
+
+		snakes move at once: a snake that does not eat frees its tail first, so a head may enter the cell a tail leaves,
+		then heads entering a body cell or sharing a cell with another head die, and surviving heads eat the food of their cell
+		food spawned on a body cell stays there until a head reaches it
+
+		emits 'snake.death' and 'snake.meal' info events, counts 'snake.moves', 'snake.deaths' and 'snake.meals'
+	'''
+	is_death_logged = instrumentation.is_enabled('snake.death', LEVEL_INFO)
+	is_meal_logged = instrumentation.is_enabled('snake.meal', LEVEL_INFO)
+	nb_moves = 0
+	nb_meals = 0
+
+	agent_positions = state['agent_positions']
+	dead_agents = state['dead_agents']
+	previous_actions = state['previous_actions']
+	resources = state['resources']
+	bodies = state['bodies']
+	occupancy = state['occupancy']
+	neighbors = get_state_topology(state).neighbors
+	assert len(actions) == len(agent_positions)
+
+	new_dead_agents = [da for da in dead_agents]
+	new_agent_positions = [ap for ap in agent_positions]
+	new_resources = [dict(r) for r in resources]
+	food_cells = state['food_cells'] # updated in place, as in snake_iteration
+	free_cells = state.get('free_cells')
+	for cell in food_generator_per_tick(state['turn_count']): # cells spawned twice are counted once, as in snake_iteration
+		if cell not in food_cells:
+			food_cells.add(cell)
+			if free_cells is not None:
+				free_cells.occupy(cell)
+
+	def kill(agent_id: int, reason: str):
+		new_dead_agents[agent_id] = True
+		if is_death_logged:
+			instrumentation.emit('snake.death', LEVEL_INFO, f"snake #{agent_id} {reason}")
+
+	def free_body(agent_id: int):
+		body = bodies[agent_id]
+		while body.length > 0:
+			cell = body.pop_tail()
+			occupancy[cell] = 0
+			if free_cells is not None:
+				free_cells.release(cell)
+
+	# bodies of the snakes the engine killed since the last tick (e.g. on a fatal instruction) leave the grid first
+	for agent_id in range(len(agent_positions)):
+		if dead_agents[agent_id] and bodies[agent_id].length > 0:
+			free_body(agent_id)
+
+	# heads, and tails of snakes that do not eat
+	new_heads = dict() # agent id -> cell its head enters
+	for agent_id in range(len(agent_positions)):
+		if dead_agents[agent_id]:
+			continue
+		chosen_action = actions[agent_id]
+		if chosen_action not in ACTION_SET:
+			chosen_action = previous_actions[agent_id] if previous_actions[agent_id] in ACTION_SET else ord("→")
+
+		new_head = neighbors[chosen_action][agent_positions[agent_id]]
+		if new_head == OFF_GRID:
+			kill(agent_id, "left the grid")
+			continue
+		new_heads[agent_id] = new_head
+		if new_head not in food_cells:
+			tail = bodies[agent_id].pop_tail()
+			occupancy[tail] = 0
+			if free_cells is not None:
+				free_cells.release(tail)
+
+	# collisions, against bodies then between heads, entering the same cell or swapping cells
+	# (two snakes of length 1 swapping cells both freed their tail, the occupancy misses them)
+	head_counts = dict()
+	old_heads = dict() # cell -> agent id of the moving snake whose head was there
+	for agent_id, new_head in new_heads.items():
+		head_counts[new_head] = head_counts.get(new_head, 0) + 1
+		old_heads[agent_positions[agent_id]] = agent_id
+	for agent_id, new_head in new_heads.items():
+		other_id = old_heads.get(new_head)
+		if occupancy[new_head]:
+			kill(agent_id, "hit a body")
+		elif head_counts[new_head] > 1:
+			kill(agent_id, "hit another head")
+		elif other_id is not None and other_id != agent_id and new_heads[other_id] == agent_positions[agent_id]:
+			kill(agent_id, "swapped cells with another head")
+
+	# moves and meals of the survivors
+	for agent_id, new_head in new_heads.items():
+		if new_dead_agents[agent_id]:
+			continue
+		bodies[agent_id].push_head(new_head)
+		occupancy[new_head] = 1
+		if free_cells is not None:
+			free_cells.occupy(new_head)
+		new_agent_positions[agent_id] = new_head
+		nb_moves += 1
+		if new_head in food_cells:
+			food_cells.discard(new_head)
+			if free_cells is not None:
+				free_cells.release(new_head)
+			new_resources[agent_id]['food'] += 1
+			nb_meals += 1
+			if is_meal_logged:
+				instrumentation.emit('snake.meal', LEVEL_INFO, f"snake #{agent_id} has just eaten, its length is {bodies[agent_id].length}")
+
+	# bodies of the snakes that died this tick leave the grid
+	nb_deaths = 0
+	for agent_id in range(len(agent_positions)):
+		if new_dead_agents[agent_id] and not dead_agents[agent_id]:
+			nb_deaths += 1
+			free_body(agent_id)
+
+	instrumentation.count('snake.moves', nb_moves)
+	instrumentation.count('snake.deaths', nb_deaths)
+	instrumentation.count('snake.meals', nb_meals)
+
+	new_state = dict(state)
+	new_state['agent_positions'] = new_agent_positions
+	new_state['dead_agents'] = new_dead_agents
+	new_state['turn_count'] = state['turn_count'] + 1
+	new_state['previous_actions'] = [
+		actions[agent_id] if actions[agent_id] not in ACTION_SET else previous_actions[agent_id]
+		for agent_id in range(len(actions))
+	]
+	new_state['food_cells'] = food_cells
+	new_state['resources'] = new_resources
+	return new_state
+
+
+def growing_snake_game_generator(
+	food_generator_per_tick: Callable[int, [List[int]]],
+	instrumentation: Instrumentation = NULL_INSTRUMENTATION
+):
+	return lambda actions, state, food_generator_per_tick=food_generator_per_tick, instrumentation=instrumentation: growing_snake_iteration(actions, state, food_generator_per_tick, instrumentation)
+
+
+def build_growing_snake_grid(state: Dict) -> List[int]:
+	''' dense view of the grid as build_snake_grid makes it, 1 on every body cell '''
+	grid = [2 if cell in state['food_cells'] else 0 for cell in range(len(state['occupancy']))]
+	for cell, is_occupied in enumerate(state['occupancy']):
+		if is_occupied:
+			grid[cell] = 1
+	return grid
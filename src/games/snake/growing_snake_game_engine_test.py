@@ -0,0 +1,94 @@
+from random import Random
+
+from .growing_snake_game_engine import SnakeBody, growing_snake_iteration, growing_snake_game_generator, generate_growing_snake_game_state, build_growing_snake_grid
+from .snake_instructions import generate_snake_instruction_set, generate_snake_instruction_costs
+from engine.engine import iterate
+
+UP, RIGHT, DOWN, LEFT = ord('↑'), ord('→'), ord('↓'), ord('←')
+
+def no_food(turn_count):
+	return []
+
+def bodies_of(state):
+	return [body.to_list() for body in state['bodies']]
+
+def test_snake_body_ring_buffer():
+	body = SnakeBody([1, 2], 3)
+	for cell in [3, 4, 5]:
+		assert body.pop_tail() == cell - 2
+		body.push_head(cell)
+	assert body.to_list() == [4, 5] and body.head() == 5
+	body.push_head(6)
+	assert body.to_list() == [4, 5, 6]
+
+def test_snakes_grow_when_eating_and_follow_their_head():
+	state = generate_growing_snake_game_state(5, 5, [0])
+	state['food_cells'] = {1, 2}
+	for _ in range(3):
+		state = growing_snake_iteration([RIGHT], state, no_food)
+	assert bodies_of(state) == [[1, 2, 3]]
+	assert state['resources'][0]['food'] == 2
+	assert state['agent_positions'] == [3]
+	assert build_growing_snake_grid(state)[:5] == [0, 1, 1, 1, 0]
+
+def test_collisions():
+	# a snake turning back into its own body
+	state = generate_growing_snake_game_state(5, 5, [2], agent_bodies=[[0, 1, 2]])
+	state = growing_snake_iteration([LEFT], state, no_food)
+	assert state['dead_agents'] == [True]
+	assert sum(state['occupancy']) == 0
+
+	# a head may enter the cell a tail leaves in the same tick
+	state = generate_growing_snake_game_state(2, 2, [1], agent_bodies=[[0, 2, 3, 1]])
+	state = growing_snake_iteration([LEFT], state, no_food)
+	assert state['dead_agents'] == [False] and bodies_of(state) == [[2, 3, 1, 0]]
+
+	# heads entering the same cell, and a head entering the body of another snake
+	state = generate_growing_snake_game_state(5, 5, [0, 2, 10], agent_bodies=[[0], [2], [6, 11, 10]])
+	state = growing_snake_iteration([RIGHT, LEFT, UP], state, no_food)
+	assert state['dead_agents'] == [True, True, False]
+	state = generate_growing_snake_game_state(5, 5, [1, 7], agent_bodies=[[0, 1], [5, 6, 7]])
+	state = growing_snake_iteration([DOWN, UP], state, no_food)
+	assert state['dead_agents'] == [True, False]
+
+	# heads swapping cells
+	state = generate_growing_snake_game_state(5, 5, [0, 1, 3])
+	state = growing_snake_iteration([RIGHT, LEFT, DOWN], state, no_food)
+	assert state['dead_agents'] == [True, True, False]
+	assert [cell for cell in range(25) if state['occupancy'][cell]] == [8]
+
+def test_occupancy_matches_bodies():
+	rng = Random(0)
+	state = generate_growing_snake_game_state(12, 12, list(range(0, 144, 9)), is_torus=True)
+	max_length = 0
+	for _ in range(200):
+		actions = [rng.choice([UP, RIGHT, DOWN, LEFT]) if rng.random() < 0.2 else None for _ in state['agent_positions']]
+		state = growing_snake_iteration(actions, state, lambda turn_count: [rng.randrange(144)])
+		cells = [cell for agent_id, body in enumerate(bodies_of(state)) if not state['dead_agents'][agent_id] for cell in body]
+		assert len(cells) == len(set(cells))
+		assert [cell for cell in range(144) if state['occupancy'][cell]] == sorted(cells)
+		max_length = max([max_length] + [body.length for body in state['bodies']])
+	assert max_length > 2
+
+def test_bodies_of_snakes_killed_by_the_engine_leave_the_grid():
+	# J 0 99 jumps out of the agent and dies before the game tick, the other snake loops on ↑ into its former body
+	agents = [[ord('J'), 0, 99], [UP, ord('J'), 0, 0]]
+	state = generate_growing_snake_game_state(5, 5, [8, 17], agent_bodies=[[6, 7, 8], [17]], has_free_cells=True)
+	pointers, agents_freeze_values = [0, 0], [0, 0]
+	for _ in range(2):
+		result = iterate(
+			game_iterate=growing_snake_game_generator(no_food),
+			instruction_set=generate_snake_instruction_set(),
+			instruction_costs=generate_snake_instruction_costs(),
+			instruction_ticks_per_game_ticks=4,
+			agents=agents,
+			game_state=state,
+			pointers=pointers,
+			agents_freeze_values=agents_freeze_values,
+		)
+		agents, state, pointers = result['agents'], result['game_state'], result['pointers']
+	assert state['dead_agents'] == [True, False]
+	assert bodies_of(state) == [[], [7]]
+	assert [cell for cell in range(25) if state['occupancy'][cell]] == [7]
+	assert [cell for cell, value in enumerate(build_growing_snake_grid(state)) if value != 0] == [7]
+	assert state['free_cells'].to_set() == set(range(25)) - {7}
@@ -0,0 +1,31 @@
+from typing import List
+
+
+def generate_spiral_agent() -> List[int]:
+	return [
+		# apply same principle as the following pseudo assembly:
+		# UP:
+		# 	LOAD STATE UP TO NEXT DATA
+		# 	IF 0 GOTO RIGHT 
+		# 	UP
+		# 	GOTO UP
+		# RIGHT:
+		# 	LOAD STATE RIGHT TO NEXT DATA
+		# 	IF 0 GOTO DOWN
+		# 	RIGHT
+		# 	GOTO RIGHT
+		# DOWN:
+		# 	LOAD STATE DOWN TO NEXT DATA
+		# 	IF 0 GOTO LEFT 
+		# 	DOWN
+		# 	GOTO DOWN
+		# LEFT:
+		# 	LOAD STATE LEFT TO NEXT DATA
+		# 	IF 0 GOTO UP 
+		# 	LEFT
+		# 	GOTO LEFT
+		ord('L'), ord('↑'),  4, ord('J'), ord('-'), 10, ord('↑'), ord('J'), 0,  0,
+		ord('L'), ord('→'), 14, ord('J'), ord('-'), 20, ord('→'), ord('J'), 0, 10,
+		ord('L'), ord('↓'), 24, ord('J'), ord('-'), 30, ord('↓'), ord('J'), 0, 20,
+		ord('L'), ord('←'), 34, ord('J'), ord('-'), 00, ord('←'), ord('J'), 0, 30
+	]
@@ -0,0 +1,233 @@
+# runs N independent snake worlds, each holding a single agent, in lockstep
+# every world is a row of a structure of arrays, so that one instruction tick or one game tick is a handful of array operations for the whole batch
+# the rules are the ones of engine.iterate with the snake instruction set and snake_iteration, except that executing
+# a symbol missing from the instruction set (or an L with an unknown direction) kills the agent instead of raising a KeyError
+
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from games.snake.snake_numpy_game_engine import NO_ACTION, FIRST_MOVE_SYMBOL, MOVE_SYMBOLS
+from utils.grid_topology import OFF_GRID, get_grid_topology
+
+KIND_UNKNOWN = 0
+KIND_JUMP = 1
+KIND_LOAD = 2
+KIND_SUBMIT = 3
+
+# sorted, to be searched with np.searchsorted
+INSTRUCTION_SYMBOLS = np.array([ord('J'), ord('L'), ord('←'), ord('↑'), ord('→'), ord('↓')], dtype=np.int64)
+INSTRUCTION_KINDS = np.array([KIND_JUMP, KIND_LOAD, KIND_SUBMIT, KIND_SUBMIT, KIND_SUBMIT, KIND_SUBMIT], dtype=np.int64)
+
+# sorted, to be searched with np.searchsorted
+# starts with the moves, so that a move index (symbol - FIRST_MOVE_SYMBOL) is also a row of the neighbor table
+NEIGHBOR_SYMBOLS = np.array([ord(s) for s in '←↑→↓↰↱↲↳'], dtype=np.int64)
+
+GENOME_PADDING = 3 # operands are read up to pointer + 2 before checking bounds
+
+
+def lookup_symbols(sorted_symbols: np.ndarray, symbols: np.ndarray) -> np.ndarray:
+	''' returns the index of every symbol in sorted_symbols, or -1 if it is absent '''
+	indices = np.minimum(np.searchsorted(sorted_symbols, symbols), len(sorted_symbols) - 1)
+	return np.where(sorted_symbols[indices] == symbols, indices, -1)
+
+
+def generate_snake_worlds(
+	genomes: List[List[int]],
+	grid_column_length: int,
+	grid_row_length: int,
+	agent_positions: List[int], # one starting position per world
+	is_torus: bool = False
+) -> Dict:
+	nb_worlds = len(genomes)
+	lengths = np.array([len(g) for g in genomes], dtype=np.int64)
+	genome_matrix = np.zeros((nb_worlds, int(lengths.max(initial=0)) + GENOME_PADDING), dtype=np.int64)
+	for world_id, genome in enumerate(genomes):
+		genome_matrix[world_id, :len(genome)] = genome
+
+	worlds = dict()
+	worlds['genomes'] = genome_matrix
+	worlds['genome_lengths'] = lengths
+	worlds['pointers'] = np.zeros(nb_worlds, dtype=np.int64)
+	worlds['agents_freeze_values'] = np.zeros(nb_worlds, dtype=np.int64)
+	worlds['dead_agents'] = lengths == 0
+	worlds['agent_positions'] = np.array(agent_positions, dtype=np.int64)
+	worlds['previous_actions'] = np.full(nb_worlds, NO_ACTION, dtype=np.int64)
+	worlds['food_positions'] = np.zeros((nb_worlds, grid_column_length * grid_row_length), dtype=bool)
+	worlds['food'] = np.zeros(nb_worlds, dtype=np.int64)
+	worlds['survival_ticks'] = np.zeros(nb_worlds, dtype=np.int64)
+	worlds['grid_column_length'] = grid_column_length
+	worlds['grid_row_length'] = grid_row_length
+	topology = get_grid_topology(grid_column_length, grid_row_length, is_torus)
+	worlds['neighbor_table'] = np.array([topology.neighbors[symbol] for symbol in NEIGHBOR_SYMBOLS.tolist()], dtype=np.int64).reshape(len(NEIGHBOR_SYMBOLS), topology.grid_size)
+	worlds['turn_count'] = 0
+	return worlds
+
+
+def execute_instruction_tick(
+	worlds: Dict,
+	instruction_costs_array: np.ndarray, # aligned with INSTRUCTION_SYMBOLS
+	actions: np.ndarray
+):
+	dead_agents = worlds['dead_agents']
+	agents_freeze_values = worlds['agents_freeze_values']
+
+	alive_worlds = ~dead_agents
+	agents_freeze_values -= alive_worlds
+	executing = np.flatnonzero(alive_worlds & (agents_freeze_values < 0))
+	if len(executing) == 0:
+		return
+
+	# genomes are read through flat indices, cheaper than 2d fancy indexing
+	genomes = worlds['genomes'].reshape(-1)
+	lengths = worlds['genome_lengths'][executing]
+	pointers = worlds['pointers'][executing]
+	cells = executing * worlds['genomes'].shape[1] + pointers
+	symbols = genomes.take(cells)
+	first_operands = genomes.take(cells + 1)
+	second_operands = genomes.take(cells + 2)
+	instruction_indices = lookup_symbols(INSTRUCTION_SYMBOLS, symbols)
+	kinds = np.where(instruction_indices >= 0, INSTRUCTION_KINDS[instruction_indices], KIND_UNKNOWN)
+	new_pointers = np.full(len(executing), -1, dtype=np.int64)
+
+	# ↑→↓← advance pointer by 1 and submit themselves as an order
+	succeeded = (kinds == KIND_SUBMIT) & (pointers + 1 < lengths)
+	new_pointers[succeeded] = pointers[succeeded] + 1
+	actions[executing[succeeded]] = symbols[succeeded]
+
+	# JXP sets pointer to P if X equals 0, else advances pointer by 3
+	jump_pointers = np.where(first_operands == 0, second_operands, pointers + 3)
+	succeeded = (
+		(kinds == KIND_JUMP) & (pointers + 3 <= lengths)
+		& (0 <= jump_pointers) & (jump_pointers < lengths)
+	)
+	new_pointers[succeeded] = jump_pointers[succeeded]
+
+	# LXP writes whether neighbor X of the agent is on the grid to position P, and advances pointer by 3
+	directions = lookup_symbols(NEIGHBOR_SYMBOLS, first_operands)
+	succeeded = (
+		(kinds == KIND_LOAD) & (pointers + 3 < lengths) & (directions >= 0)
+		& (0 <= second_operands) & (second_operands < lengths)
+	)
+	if succeeded.any():
+		loading = executing[succeeded]
+		positions = worlds['agent_positions'][loading]
+		genomes[cells[succeeded] - pointers[succeeded] + second_operands[succeeded]] = (
+			worlds['neighbor_table'][directions[succeeded], positions] != OFF_GRID
+		)
+		new_pointers[succeeded] = pointers[succeeded] + 3
+
+	# failed instructions kill their agent, others cost freeze ticks
+	died = new_pointers < 0
+	dead_agents[executing[died]] = True
+	survived = ~died
+	surviving = executing[survived]
+	worlds['pointers'][surviving] = new_pointers[survived]
+	agents_freeze_values[surviving] += instruction_costs_array[instruction_indices[survived]]
+
+
+def execute_game_tick(
+	worlds: Dict,
+	actions: np.ndarray,
+	food_generator_per_tick: Callable[[int, int], np.ndarray] # takes turn count and number of worlds, returns new food positions per world, -1 for none
+):
+	dead_agents = worlds['dead_agents']
+	agent_positions = worlds['agent_positions']
+	food_positions = worlds['food_positions']
+	previous_actions = worlds['previous_actions']
+	nb_worlds = len(dead_agents)
+
+	# generate new food
+	generated_food = np.asarray(food_generator_per_tick(worlds['turn_count'], nb_worlds), dtype=np.int64).reshape(nb_worlds, -1)
+	spawning_worlds, spawn_indices = np.nonzero(generated_food >= 0)
+	food_positions[spawning_worlds, generated_food[spawning_worlds, spawn_indices]] = True
+
+	# apply every agent's move if it is still alive, defaulting to its previous move then to →
+	is_move = np.isin(actions, MOVE_SYMBOLS)
+	chosen_moves = np.where(
+		is_move,
+		actions,
+		np.where(np.isin(previous_actions, MOVE_SYMBOLS), previous_actions, ord('→'))
+	) - FIRST_MOVE_SYMBOL
+	new_positions = worlds['neighbor_table'][chosen_moves, agent_positions]
+	is_valid_move = new_positions != OFF_GRID
+	alive_worlds = ~dead_agents
+	dead_agents |= alive_worlds & ~is_valid_move
+	alive_worlds &= is_valid_move
+	agent_positions[alive_worlds] = new_positions[alive_worlds]
+	worlds['previous_actions'] = np.where(is_move, previous_actions, actions)
+
+	# feed agents
+	eating_worlds = np.flatnonzero(alive_worlds & food_positions[np.arange(nb_worlds), agent_positions])
+	worlds['food'][eating_worlds] += 1
+	food_positions[eating_worlds, agent_positions[eating_worlds]] = False
+
+	worlds['survival_ticks'] += alive_worlds
+	worlds['turn_count'] += 1
+
+
+def snake_worlds_iteration(
+	worlds: Dict,
+	instruction_costs: Dict[int, int],
+	instruction_ticks_per_game_ticks: int,
+	food_generator_per_tick: Callable[[int, int], np.ndarray]
+):
+	''' advances every world by one game tick, in place '''
+	instruction_costs_array = np.array([instruction_costs[s] for s in INSTRUCTION_SYMBOLS.tolist()], dtype=np.int64)
+	actions = np.full(len(worlds['dead_agents']), NO_ACTION, dtype=np.int64)
+	for _ in range(instruction_ticks_per_game_ticks):
+		execute_instruction_tick(worlds, instruction_costs_array, actions)
+	execute_game_tick(worlds, actions, food_generator_per_tick)
+
+
+def evaluate_snake_genomes(
+	genomes: List[List[int]],
+	n: int,
+	instruction_costs: Dict[int, int],
+	instruction_ticks_per_game_ticks: int,
+	grid_column_length: int,
+	grid_row_length: int,
+	agent_positions: List[int],
+	food_generator_per_tick: Callable[[int, int], np.ndarray],
+	is_torus: bool = False
+) -> Dict[str, np.ndarray]:
+	'''
+		plays n game ticks with every genome in its own world
+
+		returns the food eaten and the number of game ticks survived by every genome
+	'''
+	worlds = generate_snake_worlds(genomes, grid_column_length, grid_row_length, agent_positions, is_torus)
+	for _ in range(n):
+		if worlds['dead_agents'].all():
+			break
+		snake_worlds_iteration(worlds, instruction_costs, instruction_ticks_per_game_ticks, food_generator_per_tick)
+
+	output = dict()
+	output['food'] = worlds['food']
+	output['survival_ticks'] = worlds['survival_ticks']
+	return output
+
+
+def generate_batched_snake_fitness(
+	n: int,
+	instruction_costs: Dict[int, int],
+	instruction_ticks_per_game_ticks: int,
+	grid_column_length: int,
+	grid_row_length: int,
+	agent_position: int,
+	food_generator_per_tick: Callable[[int, int], np.ndarray]
+) -> Callable[[List[List[int]]], List[float]]:
+	''' compute_fitness for apply_genetic_algorithm_iteration: food eaten, ties broken by survival '''
+	def compute_fitness(population: List[List[int]]) -> List[float]:
+		result = evaluate_snake_genomes(
+			genomes=population,
+			n=n,
+			instruction_costs=instruction_costs,
+			instruction_ticks_per_game_ticks=instruction_ticks_per_game_ticks,
+			grid_column_length=grid_column_length,
+			grid_row_length=grid_row_length,
+			agent_positions=[agent_position for _ in population],
+			food_generator_per_tick=food_generator_per_tick,
+		)
+		return (result['food'] + result['survival_ticks'] / (n + 1)).tolist()
+	return compute_fitness
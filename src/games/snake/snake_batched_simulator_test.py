@@ -0,0 +1,77 @@
+from random import Random
+
+import numpy as np
+
+from .snake_batched_simulator import evaluate_snake_genomes
+from .snake_agents import generate_spiral_agent
+from .snake_game_engine import snake_game_generator, generate_snake_game_state
+from .snake_instructions import generate_snake_instruction_set
+from engine.engine import iterate
+
+SYMBOLS = [ord(s) for s in 'JL↑→↓←']
+
+def play_alone(genome, n, instruction_costs, grid_column_length, grid_row_length, agent_position, spawns, is_torus):
+	game_state = generate_snake_game_state(grid_column_length, grid_row_length, [agent_position], is_torus)
+	game_iterate = snake_game_generator(lambda turn_count: [spawns[turn_count]] if spawns[turn_count] >= 0 else [])
+	agents, pointers, agents_freeze_values = [genome], [0], [0]
+	survival_ticks = 0
+	for _ in range(n):
+		try:
+			result = iterate(
+				game_iterate=game_iterate,
+				instruction_set=generate_snake_instruction_set(),
+				instruction_costs=instruction_costs,
+				instruction_ticks_per_game_ticks=7,
+				agents=agents,
+				game_state=game_state,
+				pointers=pointers,
+				agents_freeze_values=agents_freeze_values,
+			)
+		except KeyError: # the batched simulator kills the agent instead
+			break
+		agents, game_state, pointers = result['agents'], result['game_state'], result['pointers']
+		survival_ticks += not game_state['dead_agents'][0]
+	return game_state['resources'][0]['food'], survival_ticks
+
+def check_same_outcome_as_engine(is_torus):
+	rng = Random(0)
+	n, grid_column_length, grid_row_length = 15, 4, 6
+	grid_size = grid_column_length * grid_row_length
+	instruction_costs = {s: rng.randint(1, 3) for s in SYMBOLS}
+
+	genomes = [generate_spiral_agent()]
+	while len(genomes) < 100:
+		length = rng.randint(1, 20)
+		genome = [rng.choice(SYMBOLS) for _ in range(length)]
+		for i in range(length):
+			if genome[i] == ord('L') and i + 2 < length:
+				genome[i + 1] = rng.choice([ord(s) for s in '↑→↓←↱↲↳↰'])
+				genome[i + 2] = rng.randint(0, length)
+			if genome[i] == ord('J') and i + 2 < length:
+				genome[i + 1] = rng.choice([0, 1])
+				genome[i + 2] = rng.randint(0, length)
+		genomes.append(genome)
+	agent_positions = [rng.randint(0, grid_size - 1) for _ in genomes]
+	spawns = np.array([[rng.randint(-grid_size, grid_size - 1) for _ in genomes] for _ in range(n)])
+
+	result = evaluate_snake_genomes(
+		genomes=genomes,
+		n=n,
+		instruction_costs=instruction_costs,
+		instruction_ticks_per_game_ticks=7,
+		grid_column_length=grid_column_length,
+		grid_row_length=grid_row_length,
+		agent_positions=agent_positions,
+		food_generator_per_tick=lambda turn_count, nb_worlds: spawns[turn_count],
+		is_torus=is_torus,
+	)
+
+	for world_id, genome in enumerate(genomes):
+		expected = play_alone(list(genome), n, instruction_costs, grid_column_length, grid_row_length, agent_positions[world_id], spawns[:, world_id].tolist(), is_torus)
+		assert (result['food'][world_id], result['survival_ticks'][world_id]) == expected
+
+def test_same_outcome_as_engine():
+	check_same_outcome_as_engine(is_torus=False)
+
+def test_same_outcome_as_engine_on_torus():
+	check_same_outcome_as_engine(is_torus=True)
@@ -0,0 +1,71 @@
+from random import randint
+from typing import Dict, List, Optional
+
+from engine.compiled_engine import perform_n_iterations_compiled
+from engine.engine import all_agents_dead
+from engine.genome_compiler import CompiledGenomeCache
+from engine.genome_verifier import analyze_genome, VERDICT_DEAD_ON_ARRIVAL
+from games.snake.snake_game_engine import snake_game_generator, generate_snake_game_state, generate_food_spawner
+from games.snake.snake_instructions import generate_snake_instruction_set, generate_snake_instruction_costs
+from utils.random_streams import RandomStreams
+
+def compute_snake_genome_fitness(
+	genome: List[int],
+	n: int = 100,
+	instruction_ticks_per_game_ticks: int = 100,
+	grid_column_length: int = 10,
+	grid_row_length: int = 10,
+	food_every_nth: int = 10,
+	seed: Optional[int] = None,
+	program_cache: Optional[CompiledGenomeCache] = None
+) -> float:
+	'''
+		plays n game ticks with genome alone on the grid, food appearing at random every food_every_nth tick
+
+		fitness is the food eaten, ties broken by the number of game ticks survived
+		an agent executing a symbol outside of the instruction set is considered dead
+		food comes from the random module, or from the food stream of world 0 of RandomStreams(seed) if seed is given
+		with a program_cache, the genome runs as a compiled Python function, compiled once for all the calls sharing the cache
+	'''
+	grid_size = grid_column_length * grid_row_length
+	outcome = dict()
+	outcome['food'] = 0
+	outcome['survival_ticks'] = 0
+
+	if seed is None:
+		spawn_food = lambda turn_count: [randint(0, grid_size - 1)] if turn_count % food_every_nth == 0 else []
+	else:
+		spawn_food = generate_food_spawner(RandomStreams(seed).world(0, 'food'), grid_size, food_every_nth)
+
+	def record_outcome(result: Dict):
+		outcome['food'] = result['game_state']['resources'][0]['food']
+		outcome['survival_ticks'] += not result['game_state']['dead_agents'][0]
+
+	try:
+		perform_n_iterations_compiled(
+			n=n,
+			post_iteration_callback=record_outcome,
+			game_iterate=snake_game_generator(spawn_food),
+			instruction_set=generate_snake_instruction_set(),
+			instruction_costs=generate_snake_instruction_costs(),
+			instruction_ticks_per_game_ticks=instruction_ticks_per_game_ticks,
+			agents=[genome],
+			game_state=generate_snake_game_state(grid_column_length, grid_row_length, [0]),
+			pointers=[0],
+			agents_freeze_values=[0],
+			stop_condition=all_agents_dead,
+			program_cache=program_cache,
+		)
+	except KeyError:
+		pass
+
+	return outcome['food'] + outcome['survival_ticks'] / (n + 1)
+
+
+# fitness compute_snake_genome_fitness gives without simulation, per verdict of snake_genome_verdict
+# a genome dead on arrival neither eats nor survives a game tick
+SNAKE_VERDICT_FITNESS = {VERDICT_DEAD_ON_ARRIVAL: 0.0}
+
+def snake_genome_verdict(genome: List[int], instruction_ticks_per_game_ticks: int = 100) -> str:
+	''' verdict of engine.genome_verifier for genome alone in a snake game, as compute_snake_genome_fitness plays it '''
+	return analyze_genome(genome, generate_snake_instruction_set(), generate_snake_instruction_costs(), instruction_ticks_per_game_ticks)['verdict']
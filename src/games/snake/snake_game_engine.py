@@ -1,125 +1,93 @@
-from typing import Callable, Dict, Optional, List
-from utils.grid_utils import convert_1d_position_to_2d, convert_2d_position_to_1d
-
-def is_valid_position(col, row, column_length, row_length):
-	return (
-		0 <= col and col < column_length
-		and
-		0 <= row and row < row_length
-	)
-
-
-def cmp_generic_move_to_safe_position(
-	grid_length,
-	position,
-	column_length,
-	row_length,
-	offset_col,
-	offset_row
-) -> Optional[int]:
-	col, row = convert_1d_position_to_2d(position, column_length)
-
-	new_col = col + offset_col
-	new_row = row + offset_row
-
-	if is_valid_position(
-		col=new_col,
-		row=new_row,
-		column_length=column_length,
-		row_length=row_length
-	):
-		return convert_2d_position_to_1d(new_col, new_row, column_length)
-	return None
-
-def cmp_safe_position_on_move_up(agent_pos, grid_length, column_length, row_length) -> Optional[int]:
-	return cmp_generic_move_to_safe_position(
-		grid_length=grid_length,
-		position=agent_pos,
-		column_length=column_length,
-		row_length=row_length,
-		offset_col=(0),
-		offset_row=(-1),
-	)
-
-def cmp_safe_position_on_move_down(agent_pos, grid_length, column_length, row_length) -> Optional[int]:
-	return cmp_generic_move_to_safe_position(
-		grid_length=grid_length,
-		position=agent_pos,
-		column_length=column_length,
-		row_length=row_length,
-		offset_col=(0),
-		offset_row=(1),
-	)
-
-def cmp_safe_position_on_move_right(agent_pos, grid_length, column_length, row_length) -> Optional[int]:
-	return cmp_generic_move_to_safe_position(
-		grid_length=grid_length,
-		position=agent_pos,
-		column_length=column_length,
-		row_length=row_length,
-		offset_col=(1),
-		offset_row=(0),
-	)
-
-def cmp_safe_position_on_move_left(agent_pos, grid_length, column_length, row_length) -> Optional[int]:
-	return cmp_generic_move_to_safe_position(
-		grid_length=grid_length,
-		position=agent_pos,
-		column_length=column_length,
-		row_length=row_length,
-		offset_col=(-1),
-		offset_row=(0),
-	)
+from time import perf_counter
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from utils.grid_topology import OFF_GRID, get_grid_topology, get_state_topology
+from utils.instrumentation import Instrumentation, NULL_INSTRUMENTATION, LEVEL_DEBUG, LEVEL_INFO
+from utils.random_streams import RandomStream
+from utils.free_cell_index import FreeCellIndex
+
+# moves a snake can submit, their neighbor tables are in the state topology
+ACTION_SET = {ord('↑'), ord('→'), ord('↓'), ord('←')}
 
 def snake_iteration(
 	actions: List[int],
 	state: Dict,
-	food_generator_per_tick: Callable[int, [List[int]]] # takes turn count returns list of new food positions
+	food_generator_per_tick: Callable[int, [List[int]]], # takes turn count returns list of new food positions
+	instrumentation: Instrumentation = NULL_INSTRUMENTATION
 ) -> Dict:
 	'''
 		For the first version, snakes do not get bigger and do not die if they hit another snake
+
+		the state holds food as the set of cells 'food_cells', updated in place and shared by successive states like 'free_cells',
+		so a tick only touches the cells of moving snakes and spawned or eaten food; callbacks keeping states should copy it
+		the dense grid is not part of the state, build_snake_grid makes it on demand
+		a state made with has_free_cells keeps the cells holding neither food nor a living snake in 'free_cells', a
+		FreeCellIndex shared by successive states and updated in place, for generate_free_cell_food_spawner;
+		'cell_holders' (a bytearray, shared the same way) tells which snakes still hold their cell in it, so that the cell
+		of a snake the engine killed before the tick is released too
+		moves follow the neighbor tables of the state 'topology', a bounded grid by default (see utils.grid_topology)
+
+		emits 'snake.action' and 'snake.resources' debug events, 'snake.meal' and 'snake.death' info events
+		counts 'snake.moves', 'snake.deaths' and 'snake.meals'
+		with a profiler attached to instrumentation, times the 'snake.spawn', 'snake.move', 'snake.feed' and 'snake.state' phases
 	'''
-	# todo: put ACTION_SET in a nicer place within the module to avoid recreating a dict at each call
-	ACTION_SET = dict()
-	ACTION_SET[ord('↑')] = cmp_safe_position_on_move_up
-	ACTION_SET[ord('→')] = cmp_safe_position_on_move_right
-	ACTION_SET[ord('↓')] = cmp_safe_position_on_move_down
-	ACTION_SET[ord('←')] = cmp_safe_position_on_move_left
+	profiler = instrumentation.profiler
+	if profiler is not None:
+		phase_start = perf_counter()
+	is_action_logged = instrumentation.is_enabled('snake.action', LEVEL_DEBUG)
+	is_death_logged = instrumentation.is_enabled('snake.death', LEVEL_INFO)
+	is_meal_logged = instrumentation.is_enabled('snake.meal', LEVEL_INFO)
+	nb_moves = 0
+	nb_deaths = 0
+	nb_meals = 0
 
 	# destructuration of the state
 	agent_positions = state['agent_positions']
 	dead_agents = state['dead_agents']
-	grid = state['grid']
 	grid_column_length = state['grid_column_length']
 	grid_row_length = state['grid_row_length']
 	previous_actions = state['previous_actions']
 	turn_count = state['turn_count']
-	food_positions = state['food_positions']
+	food_cells = state['food_cells']
 	resources = state['resources']
+	topology = get_state_topology(state)
+	neighbors = topology.neighbors
 
 	# sanity check
 	assert len(actions) == len(agent_positions)
-	assert len(grid) == (grid_column_length * grid_row_length)
-	assert len(grid) == len(food_positions)
 	assert len(resources) == len(agent_positions)
 	assert len(previous_actions) == len(agent_positions)
 	assert len(dead_agents) == len(agent_positions)
 
 	new_dead_agents = [da for da in dead_agents]
 	new_agent_positions = [ap for ap in agent_positions]
-	new_food_positions = [f for f in food_positions] # whether there is food at position i of grid
+	free_cells = state.get('free_cells') # FreeCellIndex updated in place, if the state keeps one
+	cell_holders = state.get('cell_holders')
 
 	# generate new food
-	generated_food = food_generator_per_tick(turn_count)
-	for pos in generated_food:
-		new_food_positions[pos] = True
+	# a spawn may hold a cell twice, or a cell already holding food: free_cells counts every food cell once
+	for cell in food_generator_per_tick(turn_count):
+		if cell not in food_cells:
+			food_cells.add(cell)
+			if free_cells is not None:
+				free_cells.occupy(cell)
+	if profiler is not None:
+		phase_end = perf_counter()
+		profiler.record('snake.spawn', phase_end - phase_start)
+		phase_start = phase_end
 
 	# apply every agent's action if it is still alive
 	for agent_id in range(len(agent_positions)):
+		agent_position = agent_positions[agent_id]
 		if dead_agents[agent_id]:
+			if free_cells is not None and cell_holders[agent_id]:
+				# killed by the engine since the last tick, e.g. on a fatal instruction
+				free_cells.release(agent_position)
+				cell_holders[agent_id] = False
 			continue
 
-		agent_position = agent_positions[agent_id]
 		chosen_action = actions[agent_id]
 
 		if chosen_action not in ACTION_SET:
@@ -127,63 +95,182 @@ def snake_iteration(
 				chosen_action = ord("→") # if during first round agent didn't chose an action, there's a default
 			else:
 				chosen_action = previous_actions[agent_id]
-			print(f"chose no action this round, defaulted to <{chr(chosen_action)}>")
+			if is_action_logged:
+				instrumentation.emit('snake.action', LEVEL_DEBUG, f"snake #{agent_id} chose no action this round, defaulted to <{chr(chosen_action)}>")
 		else: 
-			print(f"chosen action is <{chr(chosen_action)}>")
+			if is_action_logged:
+				instrumentation.emit('snake.action', LEVEL_DEBUG, f"snake #{agent_id} chosen action is <{chr(chosen_action)}>")
 
 		if chosen_action not in ACTION_SET:
 			continue
 
-		new_position = ACTION_SET[chosen_action](agent_position, len(grid), grid_column_length, grid_row_length)
-		if new_position is None:
+		new_position = neighbors[chosen_action][agent_position]
+		if free_cells is not None:
+			free_cells.release(agent_position)
+		if new_position == OFF_GRID:
 			new_dead_agents[agent_id] = True
+			nb_deaths += 1
+			if free_cells is not None:
+				cell_holders[agent_id] = False
+			if is_death_logged:
+				instrumentation.emit('snake.death', LEVEL_INFO, f"snake #{agent_id} left the grid")
 			continue
+		if free_cells is not None:
+			free_cells.occupy(new_position)
 		new_agent_positions[agent_id] = new_position
+		nb_moves += 1
+	if profiler is not None:
+		phase_end = perf_counter()
+		profiler.record('snake.move', phase_end - phase_start)
+		phase_start = phase_end
 
 	# resources
 	new_resources = [resources[agent_id] for agent_id in range(len(agent_positions))]
-	print(f"->new_resources: {new_resources}")
+	if instrumentation.is_enabled('snake.resources', LEVEL_DEBUG):
+		instrumentation.emit('snake.resources', LEVEL_DEBUG, f"new_resources: {new_resources}")
 
 	# feed agents
 	for agent_id in range(len(actions)):
 		agent_position = new_agent_positions[agent_id]
-		if not new_dead_agents[agent_id] and new_food_positions[new_agent_positions[agent_id]]:
-			print(f"--> snake #{agent_id} has just eaten")
+		if not new_dead_agents[agent_id] and agent_position in food_cells:
+			if is_meal_logged:
+				instrumentation.emit('snake.meal', LEVEL_INFO, f"snake #{agent_id} has just eaten")
+			nb_meals += 1
 			new_resources[agent_id]['food'] += 1
-			new_food_positions[new_agent_positions[agent_id]] = False
+			food_cells.discard(agent_position)
+			if free_cells is not None:
+				free_cells.release(agent_position)
 
-	# fill the new grid
-	new_grid = [False for _ in grid]
-
-	# mark food positions on the grid
-	for index in range(len(grid)):
-		if new_food_positions[index]:
-			new_grid[index] = 2
-
-	# mark agent positions on the grid
-	for agent_id in range(len(actions)):
-		agent_position = new_agent_positions[agent_id]
-		if not new_dead_agents[agent_id]:
-			new_grid[agent_position] = 1
+	instrumentation.count('snake.moves', nb_moves)
+	instrumentation.count('snake.deaths', nb_deaths)
+	instrumentation.count('snake.meals', nb_meals)
+	if profiler is not None:
+		phase_end = perf_counter()
+		profiler.record('snake.feed', phase_end - phase_start)
+		phase_start = phase_end
 
 	# generate_new_state
 	new_state = dict()
 	new_state['agent_positions'] = new_agent_positions
 	new_state['dead_agents'] = new_dead_agents
-	new_state['grid'] = new_grid
 	new_state['grid_column_length'] = grid_column_length
 	new_state['grid_row_length'] = grid_row_length
+	new_state['topology'] = topology
 	new_state['turn_count'] = turn_count + 1
 	new_state['previous_actions'] = [
 		actions[agent_id] if actions[agent_id] not in ACTION_SET else previous_actions[agent_id]
 		for agent_id in range(len(actions))
 	]
-	new_state['food_positions'] = new_food_positions
+	new_state['food_cells'] = food_cells
 	new_state['resources'] = new_resources
+	if free_cells is not None:
+		new_state['free_cells'] = free_cells
+		new_state['cell_holders'] = cell_holders
+	if profiler is not None:
+		profiler.record('snake.state', perf_counter() - phase_start)
 
 	return new_state
 
 def snake_game_generator(
-	food_generator_per_tick: Callable[int, [List[int]]]
+	food_generator_per_tick: Callable[int, [List[int]]],
+	instrumentation: Instrumentation = NULL_INSTRUMENTATION
 ):
-	return lambda actions, state, food_generator_per_tick=food_generator_per_tick: snake_iteration(actions, state, food_generator_per_tick)
+	return lambda actions, state, food_generator_per_tick=food_generator_per_tick, instrumentation=instrumentation: snake_iteration(actions, state, food_generator_per_tick, instrumentation)
+
+def generate_food_spawner(
+	stream: RandomStream,
+	grid_size: int,
+	every_nth: int = 1,
+	nb_per_spawn: int = 1,
+	batch_size: int = 1024
+) -> Callable[int, [List[int]]]:
+	'''
+		food_generator_per_tick spawning nb_per_spawn food at random cells every every_nth tick
+
+		food k of spawn s is draw s * nb_per_spawn + k of stream, whatever ticks were played before, so replays
+		and worlds simulated in other processes get the same food; draws are computed batch_size spawns at a time
+	'''
+	batch = dict()
+	batch['index'] = None
+	batch['positions'] = None
+
+	def spawn_food(turn_count: int) -> List[int]:
+		if turn_count % every_nth != 0:
+			return []
+		spawn_index = turn_count // every_nth
+		batch_index = spawn_index // batch_size
+		if batch_index != batch['index']:
+			first_draw = batch_index * batch_size * nb_per_spawn
+			batch['index'] = batch_index
+			batch['positions'] = stream.integers_at(np.arange(first_draw, first_draw + batch_size * nb_per_spawn), 0, grid_size).tolist()
+		start = (spawn_index % batch_size) * nb_per_spawn
+		return batch['positions'][start:start + nb_per_spawn]
+	return spawn_food
+
+def generate_free_cell_food_spawner(
+	free_cells: FreeCellIndex,
+	stream: RandomStream,
+	every_nth: int = 1,
+	nb_per_spawn: int = 1,
+	batch_size: int = 1024
+) -> Callable[int, [List[int]]]:
+	'''
+		food_generator_per_tick spawning nb_per_spawn food on distinct cells drawn uniformly among free_cells every every_nth tick,
+		fewer once the grid is full; free_cells is the 'free_cells' index of the state the game is played from
+
+		as for generate_food_spawner, spawn s reads draws s * nb_per_spawn on of stream, computed batch_size spawns at a time
+	'''
+	batch = dict()
+	batch['index'] = None
+	batch['uniforms'] = None
+
+	def spawn_food(turn_count: int) -> List[int]:
+		if turn_count % every_nth != 0:
+			return []
+		spawn_index = turn_count // every_nth
+		batch_index = spawn_index // batch_size
+		if batch_index != batch['index']:
+			first_draw = batch_index * batch_size * nb_per_spawn
+			batch['index'] = batch_index
+			batch['uniforms'] = stream.random_at(np.arange(first_draw, first_draw + batch_size * nb_per_spawn)).tolist()
+		start = (spawn_index % batch_size) * nb_per_spawn
+		return free_cells.sample(batch['uniforms'][start:start + nb_per_spawn])
+	return spawn_food
+
+def build_snake_grid(state: Dict) -> List[int]:
+	'''
+		dense view of the grid, 0 for empty cells, 1 for snakes and 2 for food, for renderers
+		array-backed states keeping their own grid (see snake_numpy_game_engine) return it as is
+	'''
+	if 'grid' in state:
+		return state['grid']
+
+	grid = [0 for _ in range(state['grid_column_length'] * state['grid_row_length'])]
+	for cell in state['food_cells']:
+		grid[cell] = 2
+	for agent_id, agent_position in enumerate(state['agent_positions']):
+		if not state['dead_agents'][agent_id]:
+			grid[agent_position] = 1
+	return grid
+
+def generate_snake_game_state(
+	grid_column_length: int,
+	grid_row_length: int,
+	agent_positions: List[int],
+	is_torus: bool = False,
+	has_free_cells: bool = False
+) -> Dict:
+	game_state = dict()
+	game_state['dead_agents'] = [False for _ in agent_positions]
+	game_state['grid_column_length'] = grid_column_length
+	game_state['grid_row_length'] = grid_row_length
+	game_state['topology'] = get_grid_topology(grid_column_length, grid_row_length, is_torus)
+	game_state['agent_positions'] = [p for p in agent_positions]
+	game_state['previous_actions'] = [None for _ in agent_positions]
+	game_state['turn_count'] = 0
+	game_state['food_cells'] = set()
+	game_state['resources'] = [{"food": 0} for _ in agent_positions]
+	if has_free_cells:
+		game_state['free_cells'] = FreeCellIndex(grid_column_length * grid_row_length, agent_positions)
+		game_state['cell_holders'] = bytearray([True for _ in agent_positions])
+	return game_state
@@ -0,0 +1,265 @@
+# snake game state as a fixed set of array fields instead of a dict of lists rebuilt every tick
+# snake_iteration_into writes the next tick into a second state, and double_buffered_snake_game_generator swaps two states
+# tick after tick, so that once both exist a tick only overwrites array cells
+# the state is also a read only Mapping with the keys of generate_snake_game_state, for instruction functions, engines
+# and renderers written against dict states; state['dead_agents'] is the bytearray itself, so engines can still kill agents
+
+from array import array
+from collections.abc import Mapping
+from typing import Callable, Dict, List, Optional
+
+from games.snake.snake_game_engine import ACTION_SET, generate_snake_game_state
+from utils.free_cell_index import FreeCellIndex
+from utils.grid_topology import OFF_GRID, GridTopology, get_state_topology
+from utils.instrumentation import Instrumentation, NULL_INSTRUMENTATION, LEVEL_INFO
+
+NO_ACTION = -1 # previous action of an agent that has none, None in the mapping view
+DEFAULT_ACTION = ord("→") # move of an agent that never chose one, as in snake_iteration
+
+DIRECT_KEYS = ('grid_column_length', 'grid_row_length', 'topology', 'turn_count', 'agent_positions', 'dead_agents', 'food_cells')
+CONVERTED_KEYS = ('previous_actions', 'resources')
+FREE_CELL_KEYS = ('free_cells', 'cell_holders') # keys of states made with has_free_cells
+
+
+class SnakeGameState(Mapping):
+	"""
+		agent_positions, previous_actions and food (the food eaten by every agent) are array('i'), dead_agents a bytearray
+		food_cells, free_cells, cell_holders and topology are shared by the states made with empty_like, as ticks update them in place;
+		copy makes a state sharing nothing, e.g. to keep the history of a game
+
+		the mapping view builds 'previous_actions' and 'resources' on access, hot paths should read the fields instead
+	"""
+	__slots__ = (
+		'grid_column_length',
+		'grid_row_length',
+		'topology',
+		'turn_count',
+		'agent_positions',
+		'dead_agents',
+		'previous_actions',
+		'food',
+		'food_cells',
+		'free_cells',
+		'cell_holders',
+	)
+
+	def __init__(
+		self,
+		grid_column_length: int,
+		grid_row_length: int,
+		topology: GridTopology,
+		turn_count: int,
+		agent_positions: array,
+		dead_agents: bytearray,
+		previous_actions: array,
+		food: array,
+		food_cells: set,
+		free_cells: Optional[FreeCellIndex] = None,
+		cell_holders: Optional[bytearray] = None # with free_cells, the snakes still holding their cell in it
+	):
+		self.grid_column_length = grid_column_length
+		self.grid_row_length = grid_row_length
+		self.topology = topology
+		self.turn_count = turn_count
+		self.agent_positions = agent_positions
+		self.dead_agents = dead_agents
+		self.previous_actions = previous_actions
+		self.food = food
+		self.food_cells = food_cells
+		self.free_cells = free_cells
+		self.cell_holders = cell_holders
+
+	@classmethod
+	def from_state(cls, state: Dict) -> 'SnakeGameState':
+		''' the SnakeGameState of a dict state as generate_snake_game_state or snake_iteration make them '''
+		return cls(
+			state['grid_column_length'],
+			state['grid_row_length'],
+			get_state_topology(state),
+			state['turn_count'],
+			array('i', state['agent_positions']),
+			bytearray(bool(dead) for dead in state['dead_agents']),
+			array('i', [NO_ACTION if action is None else action for action in state['previous_actions']]),
+			array('i', [resources['food'] for resources in state['resources']]),
+			set(state['food_cells']),
+			state.get('free_cells'),
+			state.get('cell_holders'),
+		)
+
+	def empty_like(self) -> 'SnakeGameState':
+		''' a state of the same size to write ticks into, sharing food_cells, free_cells, cell_holders and topology '''
+		nb_agents = len(self.agent_positions)
+		return SnakeGameState(
+			self.grid_column_length,
+			self.grid_row_length,
+			self.topology,
+			0,
+			array('i', bytes(4 * nb_agents)),
+			bytearray(nb_agents),
+			array('i', bytes(4 * nb_agents)),
+			array('i', bytes(4 * nb_agents)),
+			self.food_cells,
+			self.free_cells,
+			self.cell_holders,
+		)
+
+	def copy(self) -> 'SnakeGameState':
+		return SnakeGameState(
+			self.grid_column_length,
+			self.grid_row_length,
+			self.topology,
+			self.turn_count,
+			array('i', self.agent_positions),
+			bytearray(self.dead_agents),
+			array('i', self.previous_actions),
+			array('i', self.food),
+			set(self.food_cells),
+			None,
+			None,
+		)
+
+	def keys_present(self) -> List[str]:
+		return list(DIRECT_KEYS + CONVERTED_KEYS) + (list(FREE_CELL_KEYS) if self.free_cells is not None else [])
+
+	def __getitem__(self, key: str):
+		if key in DIRECT_KEYS or (key in FREE_CELL_KEYS and self.free_cells is not None):
+			return getattr(self, key)
+		if key == 'previous_actions':
+			return [None if action == NO_ACTION else action for action in self.previous_actions]
+		if key == 'resources':
+			return [{'food': food} for food in self.food]
+		raise KeyError(key)
+
+	def __contains__(self, key) -> bool:
+		return key in DIRECT_KEYS or key in CONVERTED_KEYS or (key in FREE_CELL_KEYS and self.free_cells is not None)
+
+	def __iter__(self):
+		return iter(self.keys_present())
+
+	def __len__(self) -> int:
+		return len(self.keys_present())
+
+
+def generate_snake_game_state_object(
+	grid_column_length: int,
+	grid_row_length: int,
+	agent_positions: List[int],
+	is_torus: bool = False,
+	has_free_cells: bool = False
+) -> SnakeGameState:
+	return SnakeGameState.from_state(generate_snake_game_state(grid_column_length, grid_row_length, agent_positions, is_torus, has_free_cells))
+
+
+def snake_iteration_into(
+	actions: List[int],
+	state: SnakeGameState,
+	new_state: SnakeGameState, # overwritten, made by state.empty_like()
+	food_generator_per_tick: Callable[int, [List[int]]],
+	instrumentation: Instrumentation = NULL_INSTRUMENTATION
+) -> SnakeGameState:
+	'''
+		same tick as snake_iteration, written into new_state instead of a new dict
+
+		emits 'snake.meal' and 'snake.death' info events, counts 'snake.moves', 'snake.deaths' and 'snake.meals'
+	'''
+	is_death_logged = instrumentation.is_enabled('snake.death', LEVEL_INFO)
+	is_meal_logged = instrumentation.is_enabled('snake.meal', LEVEL_INFO)
+	nb_moves = 0
+	nb_deaths = 0
+	nb_meals = 0
+
+	agent_positions = state.agent_positions
+	dead_agents = state.dead_agents
+	previous_actions = state.previous_actions
+	new_agent_positions = new_state.agent_positions
+	new_dead_agents = new_state.dead_agents
+	new_previous_actions = new_state.previous_actions
+	new_food = new_state.food
+	food_cells = state.food_cells # shared with new_state
+	free_cells = state.free_cells
+	cell_holders = state.cell_holders
+	neighbors = state.topology.neighbors
+	assert len(actions) == len(agent_positions)
+
+	new_agent_positions[:] = agent_positions
+	new_dead_agents[:] = dead_agents
+	new_food[:] = state.food
+
+	# generate new food
+	for cell in food_generator_per_tick(state.turn_count):
+		if cell not in food_cells:
+			food_cells.add(cell)
+			if free_cells is not None:
+				free_cells.occupy(cell)
+
+	# apply every agent's action if it is still alive, and feed it: moves never change food, so feeding agents in the
+	# same loop gives the meals snake_iteration gives once every agent has moved
+	for agent_id in range(len(agent_positions)):
+		action = actions[agent_id]
+		previous_action = previous_actions[agent_id]
+		if action in ACTION_SET:
+			new_previous_actions[agent_id] = previous_action
+		else:
+			new_previous_actions[agent_id] = NO_ACTION if action is None else action
+			action = previous_action if previous_action in ACTION_SET else DEFAULT_ACTION
+		if dead_agents[agent_id]:
+			if free_cells is not None and cell_holders[agent_id]:
+				# killed by the engine since the last tick, as in snake_iteration
+				free_cells.release(agent_positions[agent_id])
+				cell_holders[agent_id] = False
+			continue
+
+		agent_position = agent_positions[agent_id]
+		new_position = neighbors[action][agent_position]
+		if free_cells is not None:
+			free_cells.release(agent_position)
+		if new_position == OFF_GRID:
+			new_dead_agents[agent_id] = True
+			nb_deaths += 1
+			if free_cells is not None:
+				cell_holders[agent_id] = False
+			if is_death_logged:
+				instrumentation.emit('snake.death', LEVEL_INFO, f"snake #{agent_id} left the grid")
+			continue
+		if free_cells is not None:
+			free_cells.occupy(new_position)
+		new_agent_positions[agent_id] = new_position
+		nb_moves += 1
+
+		if new_position in food_cells:
+			if is_meal_logged:
+				instrumentation.emit('snake.meal', LEVEL_INFO, f"snake #{agent_id} has just eaten")
+			nb_meals += 1
+			new_food[agent_id] += 1
+			food_cells.discard(new_position)
+			if free_cells is not None:
+				free_cells.release(new_position)
+
+	instrumentation.count('snake.moves', nb_moves)
+	instrumentation.count('snake.deaths', nb_deaths)
+	instrumentation.count('snake.meals', nb_meals)
+
+	new_state.turn_count = state.turn_count + 1
+	return new_state
+
+
+def double_buffered_snake_game_generator(
+	food_generator_per_tick: Callable[int, [List[int]]],
+	instrumentation: Instrumentation = NULL_INSTRUMENTATION
+):
+	'''
+		game_iterate writing every tick into the state the previous tick was read from
+		a state returned by game_iterate is overwritten two ticks later, callbacks keeping states should keep state.copy()
+	'''
+	buffers = dict() # id of a state -> the state ticks read from it are written into
+
+	def game_iterate(actions: List[int], state: SnakeGameState) -> SnakeGameState:
+		new_state = buffers.get(id(state))
+		if new_state is None:
+			new_state = state.empty_like()
+			buffers.clear()
+			buffers[id(state)] = new_state
+			buffers[id(new_state)] = state
+		return snake_iteration_into(actions, state, new_state, food_generator_per_tick, instrumentation)
+
+	return game_iterate
@@ -0,0 +1,62 @@
+from random import Random
+
+from .snake_game_state import SnakeGameState, generate_snake_game_state_object, snake_iteration_into, double_buffered_snake_game_generator
+from engine.compiled_engine import perform_n_iterations_compiled
+from engine.engine import perform_n_iterations
+from games.snake.snake_agents import generate_spiral_agent
+from games.snake.snake_game_engine import snake_iteration, snake_game_generator, generate_snake_game_state, build_snake_grid
+from games.snake.snake_instructions import generate_snake_instruction_set, generate_snake_instruction_costs
+
+ACTIONS = [ord('↑'), ord('→'), ord('↓'), ord('←'), None, 0]
+
+def as_dict(state):
+	return {key: (list(value) if key in ('agent_positions', 'dead_agents') else value) for key, value in state.items() if key != 'free_cells'}
+
+def test_double_buffered_ticks_match_snake_iteration():
+	for is_torus in [False, True]:
+		rng = Random(0)
+		foods = [[rng.randrange(64) for _ in range(rng.randrange(3))] for _ in range(60)]
+		state = generate_snake_game_state(8, 8, [rng.randrange(64) for _ in range(6)], is_torus, has_free_cells=True)
+		state_object = generate_snake_game_state_object(8, 8, list(state['agent_positions']), is_torus, has_free_cells=True)
+		game_iterate = double_buffered_snake_game_generator(lambda turn_count: foods[turn_count])
+		buffers = []
+		for turn_count in range(60):
+			actions = [rng.choice(ACTIONS) for _ in range(6)]
+			state = snake_iteration(actions, state, lambda turn_count: foods[turn_count])
+			state_object = game_iterate(actions, state_object)
+			buffers.append(state_object)
+			assert as_dict(state) == {**as_dict(state_object), 'dead_agents': [bool(d) for d in state_object.dead_agents]}
+			assert build_snake_grid(state) == build_snake_grid(state_object)
+			assert state['free_cells'].to_set() == state_object.free_cells.to_set()
+		assert buffers[0] is buffers[2] and buffers[1] is buffers[3] and buffers[0] is not buffers[1]
+
+def test_engines_run_on_state_objects():
+	for perform in [perform_n_iterations, perform_n_iterations_compiled]:
+		histories = []
+		for game_state, generator in [
+			(generate_snake_game_state(10, 10, [0, 55]), snake_game_generator),
+			(generate_snake_game_state_object(10, 10, [0, 55]), double_buffered_snake_game_generator),
+		]:
+			history = []
+			perform(
+				n=30,
+				post_iteration_callback=lambda result: history.append((list(result['game_state']['agent_positions']), [dict(r) for r in result['game_state']['resources']], list(result['pointers']))),
+				game_iterate=generator(lambda turn_count: [turn_count * 7 % 100]),
+				instruction_set=generate_snake_instruction_set(),
+				instruction_costs=generate_snake_instruction_costs(),
+				instruction_ticks_per_game_ticks=20,
+				agents=[generate_spiral_agent(), generate_spiral_agent()],
+				game_state=game_state,
+				pointers=[0, 0],
+				agents_freeze_values=[0, 0],
+			)
+			histories.append(history)
+		assert histories[0] == histories[1]
+
+def test_copy_shares_nothing():
+	state = generate_snake_game_state_object(4, 4, [0])
+	snapshot = state.copy()
+	new_state = snake_iteration_into([ord('→')], state, state.empty_like(), lambda turn_count: [1, 2])
+	assert list(snapshot.agent_positions) == [0] and snapshot.food_cells == set()
+	assert list(new_state.agent_positions) == [1] and new_state['resources'] == [{'food': 1}]
+	assert isinstance(SnakeGameState.from_state(generate_snake_game_state(4, 4, [3])), SnakeGameState)
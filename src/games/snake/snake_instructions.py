@@ -1,6 +1,7 @@
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Optional, List
 
-from utils.grid_utils import convert_1d_position_to_2d
+from engine.agent_memory import AgentMemory
+from utils.grid_topology import OFF_GRID, GridTopology, get_grid_topology, get_state_topology
 
 def conditionally_jumps_to_position_if_next_is_0(
 	agent_id: int,
@@ -33,29 +34,16 @@ def conditionally_jumps_to_position_if_next_is_0(
 
 
 def is_neighbor_cell_in_grid(
-	grid: List[int],
+	grid: List[int], # unused, moves and observations read the topology
 	grid_column_length: int,
 	grid_row_length: int,
 	position: int,
-	neighbor_symbol: int
+	neighbor_symbol: int,
+	topology: Optional[GridTopology] = None # the 'topology' of the game state, a bounded grid by default
 ) -> bool:
-	NEIGHBOR_POSITION_CALCULATORS = dict()
-	NEIGHBOR_POSITION_CALCULATORS[ord('↑')] = lambda c, r: (c + 0, r - 1)
-	NEIGHBOR_POSITION_CALCULATORS[ord('→')] = lambda c, r: (c + 1, r + 0)
-	NEIGHBOR_POSITION_CALCULATORS[ord('↓')] = lambda c, r: (c + 0, r + 1)
-	NEIGHBOR_POSITION_CALCULATORS[ord('←')] = lambda c, r: (c - 1, r + 0)
-	NEIGHBOR_POSITION_CALCULATORS[ord('↱')] = lambda c, r: (c + 1, r - 1)
-	NEIGHBOR_POSITION_CALCULATORS[ord('↲')] = lambda c, r: (c - 1, r + 1)
-	NEIGHBOR_POSITION_CALCULATORS[ord('↳')] = lambda c, r: (c + 1, r + 1)
-	NEIGHBOR_POSITION_CALCULATORS[ord('↰')] = lambda c, r: (c - 1, r - 1)
-	
-	col_position, row_position = convert_1d_position_to_2d(position, grid_column_length)
-	(neighbor_col_pos, neighbor_row_pos) = NEIGHBOR_POSITION_CALCULATORS[neighbor_symbol](col_position, row_position)
-	return ( 
-		(0 <= neighbor_col_pos) and (neighbor_col_pos < grid_column_length)
-		and
-		(0 <= neighbor_row_pos) and (neighbor_row_pos < grid_row_length)
-	)
+	if topology is None:
+		topology = get_grid_topology(grid_column_length, grid_row_length)
+	return topology.neighbors[neighbor_symbol][position] != OFF_GRID
 
 
 def load_state_at_position(
@@ -66,6 +54,7 @@ def load_state_at_position(
 ) -> Optional[Dict[str, int]]:
 	'''
 		LXP writes symbol representing whether position X is valid on game grid to position P of agent memory
+		an AgentMemory agent is written in place, a list agent is copied
 
 		on success returns (order, new_agent, new_agent_pointer)
 		on failure returns None, meaning that the agent died due to wrongful execution
@@ -75,21 +64,18 @@ def load_state_at_position(
 	if not (new_pointer < len(agent)):
 		return None
 
-	value_symbol = int(
-		is_neighbor_cell_in_grid(
-			grid=game_state['grid'],
-			grid_column_length=game_state['grid_column_length'],
-			grid_row_length=game_state['grid_row_length'],
-			position = game_state['agent_positions'][agent_id],
-			neighbor_symbol = agent[pointer + 1]
-		)
-	)
+	neighbor = get_state_topology(game_state).neighbors[agent[pointer + 1]][game_state['agent_positions'][agent_id]]
+	value_symbol = int(neighbor != OFF_GRID)
 	position_symbol = agent[pointer + 2]
 
 	if not (0 <= position_symbol and position_symbol < len(agent)):
 		return None
 
-	new_agent = [agent[i] if i != position_symbol else value_symbol for i in range(len(agent))]
+	if isinstance(agent, AgentMemory):
+		agent[position_symbol] = value_symbol # in place, copy-on-write
+		new_agent = agent
+	else:
+		new_agent = [agent[i] if i != position_symbol else value_symbol for i in range(len(agent))]
 
 	output = dict()
 	output['order'] = None
@@ -185,3 +171,18 @@ def submit_instruction_left(
 		agent=agent,
 		pointer=pointer
 	)
+
+
+def generate_snake_instruction_set() -> Dict[int, Callable]:
+	instruction_set = dict()
+	instruction_set[ord('J')] = conditionally_jumps_to_position_if_next_is_0
+	instruction_set[ord('L')] = load_state_at_position
+	instruction_set[ord('↑')] = submit_instruction_up
+	instruction_set[ord('→')] = submit_instruction_right
+	instruction_set[ord('↓')] = submit_instruction_down
+	instruction_set[ord('←')] = submit_instruction_left
+	return instruction_set
+
+
+def generate_snake_instruction_costs(cost: int = 1) -> Dict[int, int]:
+	return {symbol: cost for symbol in generate_snake_instruction_set()}
@@ -0,0 +1,139 @@
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from utils.grid_topology import OFF_GRID, GridTopology, get_state_topology
+
+NO_ACTION = -1 # stands for None in the 'previous_actions' array
+
+# moves are indexed by symbol - ord('←'), as the four arrows are consecutive code points
+FIRST_MOVE_SYMBOL = ord('←')
+MOVE_SYMBOLS = np.array([ord('←'), ord('↑'), ord('→'), ord('↓')], dtype=np.int64)
+
+GRID_EMPTY = 0
+GRID_AGENT = 1
+GRID_FOOD = 2
+
+
+def generate_move_table(topology: GridTopology) -> np.ndarray:
+	''' move_table[move index, position] is the position reached by the move, or OFF_GRID '''
+	return np.array([topology.neighbors[symbol] for symbol in MOVE_SYMBOLS.tolist()], dtype=np.int64).reshape(len(MOVE_SYMBOLS), topology.grid_size)
+
+
+def to_snake_numpy_state(state: Dict) -> Dict:
+	'''
+		converts a snake_iteration state into the array-backed state of snake_numpy_iteration
+
+		the grid is painted from food and agent positions, so that it can be updated incrementally afterwards
+	'''
+	agent_positions = np.array(state['agent_positions'], dtype=np.int64)
+	dead_agents = np.array(state['dead_agents'], dtype=bool)
+	food_positions = np.zeros(state['grid_column_length'] * state['grid_row_length'], dtype=bool)
+	food_positions[list(state['food_cells'])] = True
+
+	grid = np.where(food_positions, GRID_FOOD, GRID_EMPTY).astype(np.int8)
+	grid[agent_positions[~dead_agents]] = GRID_AGENT
+	topology = get_state_topology(state)
+
+	new_state = dict()
+	new_state['agent_positions'] = agent_positions
+	new_state['dead_agents'] = dead_agents
+	new_state['grid'] = grid
+	new_state['grid_column_length'] = state['grid_column_length']
+	new_state['grid_row_length'] = state['grid_row_length']
+	new_state['topology'] = topology
+	new_state['move_table'] = generate_move_table(topology)
+	new_state['turn_count'] = state['turn_count']
+	new_state['previous_actions'] = np.array(
+		[NO_ACTION if a is None else a for a in state['previous_actions']],
+		dtype=np.int64
+	)
+	new_state['food_positions'] = food_positions
+	new_state['resources'] = state['resources']
+	return new_state
+
+
+def snake_numpy_iteration(
+	actions: List[int],
+	state: Dict,
+	food_generator_per_tick: Callable[int, [List[int]]] # takes turn count returns list of new food positions
+) -> Dict:
+	'''
+		same rules as snake_iteration, on the arrays of to_snake_numpy_state
+
+		all agents move at once, feeding goes through boolean masks and only the grid cells that changed are written
+		the arrays of the given state are updated in place and shared with the returned state
+	'''
+	agent_positions = state['agent_positions']
+	dead_agents = state['dead_agents']
+	grid = state['grid']
+	grid_column_length = state['grid_column_length']
+	grid_row_length = state['grid_row_length']
+	move_table = state['move_table']
+	previous_actions = state['previous_actions']
+	turn_count = state['turn_count']
+	food_positions = state['food_positions']
+	resources = state['resources']
+
+	# sanity check
+	assert len(actions) == len(agent_positions)
+	assert len(grid) == (grid_column_length * grid_row_length)
+	assert len(grid) == len(food_positions)
+	assert len(resources) == len(agent_positions)
+	assert len(previous_actions) == len(agent_positions)
+	assert len(dead_agents) == len(agent_positions)
+
+	# generate new food
+	generated_food = np.array(food_generator_per_tick(turn_count), dtype=np.int64)
+	food_positions[generated_food] = True
+
+	# choose every agent's move, defaulting to its previous move then to →
+	action_symbols = np.array([NO_ACTION if a is None else a for a in actions], dtype=np.int64)
+	is_move = np.isin(action_symbols, MOVE_SYMBOLS)
+	chosen_moves = np.where(
+		is_move,
+		action_symbols,
+		np.where(np.isin(previous_actions, MOVE_SYMBOLS), previous_actions, ord('→'))
+	) - FIRST_MOVE_SYMBOL
+
+	# apply every agent's move if it is still alive
+	alive_agents = ~dead_agents
+	previous_positions = agent_positions[alive_agents]
+	new_positions = move_table[chosen_moves, agent_positions]
+	is_valid_move = new_positions != OFF_GRID
+	dead_agents |= alive_agents & ~is_valid_move
+	alive_agents &= is_valid_move
+	agent_positions[alive_agents] = new_positions[alive_agents]
+
+	# feed agents, only the lowest agent id eats when several agents share a food cell
+	hungry_agents = np.flatnonzero(alive_agents & food_positions[agent_positions])
+	eaten_cells, first_eaters = np.unique(agent_positions[hungry_agents], return_index=True)
+	for agent_id in hungry_agents[first_eaters]:
+		resources[agent_id]['food'] += 1
+	food_positions[eaten_cells] = False
+
+	# update the grid cells that may have changed
+	touched_cells = np.concatenate((previous_positions, generated_food, eaten_cells))
+	grid[touched_cells] = np.where(food_positions[touched_cells], GRID_FOOD, GRID_EMPTY)
+	grid[agent_positions[alive_agents]] = GRID_AGENT
+
+	# generate_new_state
+	new_state = dict()
+	new_state['agent_positions'] = agent_positions
+	new_state['dead_agents'] = dead_agents
+	new_state['grid'] = grid
+	new_state['grid_column_length'] = grid_column_length
+	new_state['grid_row_length'] = grid_row_length
+	new_state['topology'] = state['topology']
+	new_state['move_table'] = move_table
+	new_state['turn_count'] = turn_count + 1
+	new_state['previous_actions'] = np.where(is_move, previous_actions, action_symbols)
+	new_state['food_positions'] = food_positions
+	new_state['resources'] = resources
+
+	return new_state
+
+def snake_numpy_game_generator(
+	food_generator_per_tick: Callable[int, [List[int]]]
+):
+	return lambda actions, state, food_generator_per_tick=food_generator_per_tick: snake_numpy_iteration(actions, state, food_generator_per_tick)
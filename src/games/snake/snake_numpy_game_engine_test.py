@@ -0,0 +1,36 @@
+from random import Random
+
+import numpy as np
+
+from .snake_game_engine import snake_iteration, generate_snake_game_state, build_snake_grid
+from .snake_numpy_game_engine import snake_numpy_iteration, to_snake_numpy_state, NO_ACTION
+
+ACTIONS = [None, ord('J'), ord('↑'), ord('→'), ord('↓'), ord('←')]
+
+def test_same_states_as_snake_iteration():
+	for seed in range(50):
+		rng = Random(seed)
+		grid_column_length = rng.randint(1, 8)
+		grid_row_length = rng.randint(1, 8)
+		grid_size = grid_column_length * grid_row_length
+		nb_agents = rng.randint(1, 10)
+		agent_positions = [rng.randint(0, grid_size - 1) for _ in range(nb_agents)]
+		food = [[rng.randint(0, grid_size - 1) for _ in range(rng.randint(0, 3))] for _ in range(20)]
+		food_generator_per_tick = lambda turn_count: food[turn_count]
+
+		is_torus = seed % 2 == 1
+
+		state = generate_snake_game_state(grid_column_length, grid_row_length, agent_positions, is_torus)
+		numpy_state = to_snake_numpy_state(generate_snake_game_state(grid_column_length, grid_row_length, agent_positions, is_torus))
+		for _ in range(20):
+			actions = [rng.choice(ACTIONS) for _ in range(nb_agents)]
+			state = snake_iteration(actions, state, food_generator_per_tick)
+			numpy_state = snake_numpy_iteration(actions, numpy_state, food_generator_per_tick)
+
+			assert list(numpy_state['agent_positions']) == state['agent_positions']
+			assert list(numpy_state['dead_agents']) == state['dead_agents']
+			assert list(numpy_state['grid']) == build_snake_grid(state)
+			assert set(np.flatnonzero(numpy_state['food_positions'])) == state['food_cells']
+			assert numpy_state['resources'] == state['resources']
+			assert numpy_state['turn_count'] == state['turn_count']
+			assert [None if a == NO_ACTION else a for a in numpy_state['previous_actions']] == state['previous_actions']
@@ -1,19 +1,24 @@
 from games.snake.snake_instructions import conditionally_jumps_to_position_if_next_is_0, load_state_at_position, submit_instruction_up, submit_instruction_right, submit_instruction_down, submit_instruction_left
-from games.snake.snake_game_engine import snake_game_generator
+from games.snake.snake_game_engine import snake_game_generator, generate_snake_game_state, generate_free_cell_food_spawner, build_snake_grid
+from games.snake.snake_agents import generate_spiral_agent
 from utils.grid_utils import convert_2d_position_to_1d
 from utils.print_utils import debug_post_iteration_callback
+from utils.instrumentation import Instrumentation, NULL_INSTRUMENTATION, LEVEL_DEBUG, LEVEL_INFO
+from utils.random_streams import RandomStreams
+from utils.profiler import Profiler
 from engine.engine import perform_n_iterations
 
-from random import randint
+import sys
+from typing import Callable, List
 
-def generate_random_position_every_nth(current_i: int, n: int, distribution_range: int):
-	if current_i % n == 0:
-		out = randint(0, distribution_range-1)
-		print(f"randint gave {out}")
-		return [out]
-	return []
+def spawn_food_with_events(current_i: int, spawn_food: Callable[[int], List[int]], instrumentation: Instrumentation = NULL_INSTRUMENTATION) -> List[int]:
+	out = spawn_food(current_i)
+	instrumentation.count('food.spawns', len(out))
+	if len(out) > 0 and instrumentation.is_enabled('food.spawn', LEVEL_DEBUG):
+		instrumentation.emit('food.spawn', LEVEL_DEBUG, f"food spawned at {out}")
+	return out
 
-def main():
+def main(is_profiling: bool = False):
 	instruction_set = dict()
 	instruction_set[ord('J')] = conditionally_jumps_to_position_if_next_is_0
 	instruction_set[ord('L')] = load_state_at_position 
@@ -33,59 +38,36 @@ def main():
 
 	grid_column_length = 10
 	grid_row_length = 10
-	grid_size = grid_column_length * grid_row_length
 
 	n = 100
+	random_streams = RandomStreams(seed=0)
+	food_stream = random_streams.world(0, 'food')
 
-	game_iterate=snake_game_generator(lambda turn_index, grid_size=grid_size: generate_random_position_every_nth(turn_index, 10, grid_size))
-	agents=[
-		[
-			# apply same principle as the following pseudo assembly:
-			# UP:
-			# 	LOAD STATE UP TO NEXT DATA
-			# 	IF 0 GOTO RIGHT 
-			# 	UP
-			# 	GOTO UP
-			# RIGHT:
-			# 	LOAD STATE RIGHT TO NEXT DATA
-			# 	IF 0 GOTO DOWN
-			# 	RIGHT
-			# 	GOTO RIGHT
-			# DOWN:
-			# 	LOAD STATE DOWN TO NEXT DATA
-			# 	IF 0 GOTO LEFT 
-			# 	DOWN
-			# 	GOTO DOWN
-			# LEFT:
-			# 	LOAD STATE LEFT TO NEXT DATA
-			# 	IF 0 GOTO UP 
-			# 	LEFT
-			# 	GOTO LEFT
-			ord('L'), ord('↑'),  4, ord('J'), ord('-'), 10, ord('↑'), ord('J'), 0,  0,
-			ord('L'), ord('→'), 14, ord('J'), ord('-'), 20, ord('→'), ord('J'), 0, 10,
-			ord('L'), ord('↓'), 24, ord('J'), ord('-'), 30, ord('↓'), ord('J'), 0, 20,
-			ord('L'), ord('←'), 34, ord('J'), ord('-'), 00, ord('←'), ord('J'), 0, 30
-		]
-	]
+	# meals and deaths are printed, raise 'snake.action' or 'food.spawn' to LEVEL_DEBUG for more
+	# with --profile, opcode and phase timings are printed and written as folded stacks to profile.folded
+	instrumentation = Instrumentation(default_level=LEVEL_INFO, is_counting=True, profiler=Profiler() if is_profiling else None)
+
+	agents=[generate_spiral_agent()]
 
 
 	pointers = [0 for _ in agents]
 	agents_freeze_values = [0 for _ in agents]
 
-	game_state = dict()
-	game_state['dead_agents'] = [False for _ in agents]
-	game_state['grid'] = [0 for _ in range(grid_column_length * grid_row_length)]
-	game_state['grid_column_length'] = grid_column_length
-	game_state['grid_row_length'] = grid_row_length
-	game_state['agent_positions'] = [
-		convert_2d_position_to_1d(0, 0, grid_column_length)
-	]
-	game_state['previous_actions'] = [None for _ in agents]
-	game_state['turn_count'] = 0
-	game_state['food_positions'] = [False for _ in range(grid_size)]
-	game_state['resources'] = [{"food": 0} for _ in agents]
-
-	post_iteration_callback = debug_post_iteration_callback
+	game_state = generate_snake_game_state(
+		grid_column_length,
+		grid_row_length,
+		[convert_2d_position_to_1d(0, 0, grid_column_length)],
+		has_free_cells=True
+	)
+
+	# food only spawns on cells holding neither food nor a snake
+	spawn_food = generate_free_cell_food_spawner(game_state['free_cells'], food_stream, every_nth=10)
+	game_iterate=snake_game_generator(
+		lambda turn_index: spawn_food_with_events(turn_index, spawn_food, instrumentation),
+		instrumentation
+	)
+
+	post_iteration_callback = lambda result: debug_post_iteration_callback(result, build_grid=build_snake_grid)
 
 	perform_n_iterations(
 		n=n,
@@ -101,9 +83,15 @@ def main():
 		agents=agents,
 		game_state=game_state,
 		pointers=pointers,
-		agents_freeze_values=agents_freeze_values
+		agents_freeze_values=agents_freeze_values,
+		instrumentation=instrumentation
 	)
 
+	print(f"counters: {instrumentation.counters}")
+	if instrumentation.profiler is not None:
+		print(instrumentation.profiler.summary_to_str())
+		instrumentation.profiler.write_folded_stacks('profile.folded')
+
 
 if __name__ == '__main__':
-	main()
\ No newline at end of file
+	main(is_profiling='--profile' in sys.argv[1:])
\ No newline at end of file
@@ -0,0 +1,88 @@
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Callable, List, Optional
+import shelve
+
+
+class FitnessCache(object):
+	"""
+		compute_fitness for apply_genetic_algorithm_iteration that serves already evaluated genomes from memory
+
+		genomes are keyed by a hash of their content and of config_key, which should describe everything else
+		the fitness depends on (game seed, grid size, number of ticks...)
+		at most max_size fitness values are kept in memory, least recently used ones being evicted first
+		if path is given, fitness values are also stored in a shelve file there, and read back by later runs
+	"""
+	def __init__(
+		self,
+		compute_fitness: Callable[[List[any]], List[float]],
+		max_size: int = 100 * 1000,
+		config_key: str = '',
+		path: Optional[str] = None
+	):
+		self.compute_fitness = compute_fitness
+		self.max_size = max_size
+		self.config_key = config_key
+		self.memory = OrderedDict()
+		self.disk = shelve.open(path) if path is not None else None
+		self.hits = 0
+		self.misses = 0
+
+	def genome_key(self, genome: List[any]) -> str:
+		return blake2b(repr((self.config_key, list(genome))).encode(), digest_size=16).hexdigest()
+
+	def remember(self, key: str, fitness: float):
+		self.memory[key] = fitness
+		self.memory.move_to_end(key)
+		if len(self.memory) > self.max_size:
+			self.memory.popitem(last=False)
+
+	def __call__(self, population: List[List[any]]) -> List[float]:
+		keys = [self.genome_key(genome) for genome in population]
+		fitness = [None for _ in population]
+
+		missing_indices = dict() # key -> indices of the population sharing it, evaluated once
+		for i, key in enumerate(keys):
+			if key in self.memory:
+				self.memory.move_to_end(key)
+				fitness[i] = self.memory[key]
+				self.hits += 1
+			elif self.disk is not None and key in self.disk:
+				fitness[i] = self.disk[key]
+				self.remember(key, fitness[i])
+				self.hits += 1
+			elif key in missing_indices:
+				missing_indices[key].append(i)
+				self.hits += 1
+			else:
+				missing_indices[key] = [i]
+				self.misses += 1
+
+		missing_keys = list(missing_indices)
+		if len(missing_keys) == 0:
+			return fitness
+
+		missing_fitness = self.compute_fitness([population[missing_indices[key][0]] for key in missing_keys])
+		for key, f in zip(missing_keys, missing_fitness):
+			for i in missing_indices[key]:
+				fitness[i] = f
+			self.remember(key, f)
+			if self.disk is not None:
+				self.disk[key] = f
+
+		return fitness
+
+	def hit_rate(self) -> float:
+		total = self.hits + self.misses
+		return self.hits / total if total > 0 else 0.0
+
+	def close(self):
+		if self.disk is not None:
+			self.disk.close()
+			self.disk = None
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
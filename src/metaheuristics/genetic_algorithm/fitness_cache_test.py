@@ -0,0 +1,31 @@
+import os
+import tempfile
+
+from .fitness_cache import FitnessCache
+
+def test_fitness_cache():
+	evaluated = []
+	def compute_fitness(population):
+		evaluated.extend(population)
+		return [sum(genome) for genome in population]
+
+	with tempfile.TemporaryDirectory() as directory:
+		path = os.path.join(directory, 'fitness')
+		with FitnessCache(compute_fitness, max_size=2, config_key='seed=0', path=path) as cache:
+			assert cache([[1, 2], [3], [1, 2]]) == [3, 3, 3]
+			assert evaluated == [[1, 2], [3]]
+			assert (cache.hits, cache.misses) == (1, 2)
+
+			assert cache([[3], [4]]) == [3, 4]
+			assert evaluated == [[1, 2], [3], [4]]
+			assert list(cache.memory) == [cache.genome_key([3]), cache.genome_key([4])] # [1, 2] was evicted
+
+		# a restarted run reads evaluations back from disk
+		with FitnessCache(compute_fitness, config_key='seed=0', path=path) as cache:
+			assert cache([[1, 2], [4]]) == [3, 4]
+			assert evaluated == [[1, 2], [3], [4]]
+
+		# a different configuration is evaluated again
+		with FitnessCache(compute_fitness, config_key='seed=1', path=path) as cache:
+			assert cache([[4]]) == [4]
+			assert evaluated == [[1, 2], [3], [4], [4]]
@@ -1,6 +1,10 @@
-from typing import Callable, List, Tuple
+from typing import Callable, List, Optional, Tuple
 from enum import Enum
 
+import numpy as np
+
+from .selection import SelectionOperator, truncation_selection
+
 def elitist_replacement(
 	sorted_population: List[any]
 ):
@@ -23,6 +27,7 @@ def winner_takes_it_all_replacement(
 	sorted_population = [
 		sorted_population[i] if sorted_population[i] is not None
 		else sorted_population[0]
+		for i in range(len(sorted_population))
 	]
 
 	return sorted_population
@@ -43,48 +48,42 @@ def apply_genetic_algorithm_iteration(
 	no_repeat_int_random_generator: Callable[(int, int, int), List[int]], # first is len(output), second is min included, third is max excluded
 	crossover: Callable[(List[any]), List[any]], # takes n agents and returns n agents
 	nb_parents_for_crossover: int,
-	# nb_crossovers: int, todo: out of laziness, for now, only one crossover per iteration. Sorry. Feel free to implement more.
 	mutation_rate: float,
 	mutate: Callable[(any), any],
-	verbose = False
+	verbose = False,
+	selection_operator: Optional[SelectionOperator] = None, # truncation_selection by default, see selection.py
+	nb_crossovers: int = 1 # groups of distinct parents, see genome_matrix.py to run many crossovers per generation efficiently
 ) -> List[any]:
 	# initialization
 	# fitness
-	fitness = compute_fitness(population)
-	population_by_fitness = list(
-		zip(
-			population,
-			fitness
-		)
-	)
-	population_by_fitness.sort(
-		key=lambda pf: pf[1], # order by fitness
-		reverse=True # make it in decreasing order
-	)
-
-	# selection
-	nb_survivors = int(len(population_by_fitness) * selection_rate)
+	fitness = np.asarray(compute_fitness(population), dtype=np.float64)
+
+	# selection, survivors and replacements are indices into population until the crossover
+	nb_survivors = int(len(population) * selection_rate)
+	survivors = (selection_operator if selection_operator is not None else truncation_selection)(fitness, nb_survivors).tolist()
 	surviving_population = [
-		population_by_fitness[i][0] if i < nb_survivors else None
-		for i in range(len(population_by_fitness))
+		survivors[i] if i < len(survivors) else None
+		for i in range(len(population))
 	]
-	replaced_population = population_replacement_strategy[0](surviving_population)
+	replaced_indices = population_replacement_strategy[0](surviving_population)
+	replaced_population = [population[i] if i is not None else None for i in replaced_indices]
 
 	# crossover
-	parents = no_repeat_int_random_generator(nb_parents_for_crossover, 0, len(replaced_population))
-	children = crossover([replaced_population[i] for i in parents])
-	
+	parents = no_repeat_int_random_generator(nb_parents_for_crossover * nb_crossovers, 0, len(replaced_population))
 	post_crossover_pop = [p for p in replaced_population]
-	for i, parent_index in enumerate(parents):
-		post_crossover_pop[parent_index] = children[i]
+	for first_parent in range(0, len(parents), nb_parents_for_crossover):
+		crossover_parents = parents[first_parent:first_parent + nb_parents_for_crossover]
+		children = crossover([replaced_population[i] for i in crossover_parents])
+		for i, parent_index in enumerate(crossover_parents):
+			post_crossover_pop[parent_index] = children[i]
 
 	# mutation
 	is_mutant = [roll < mutation_rate for roll in random_generator(len(post_crossover_pop))]
 	out = [mutate(post_crossover_pop[i]) if is_mutant[i] else post_crossover_pop[i] for i in range(len(post_crossover_pop))]
 
 	if verbose:
-		print(f"population_by_fitness: {population_by_fitness}")
-		print(f"surviving_population: {surviving_population}")
+		print(f"fitness: {fitness.tolist()}")
+		print(f"survivors: {survivors}")
 		print(f"replaced_population: {replaced_population}")
 		print(f"post_crossover_pop: {post_crossover_pop}")
 		print(f"out: {out}")
@@ -0,0 +1,135 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from random import Random
+from typing import Callable, Dict, List, Optional
+import os
+import pickle
+import random
+import zlib
+
+from .genetic_algorithm import apply_genetic_algorithm_iteration
+
+CHECKPOINT_MAGIC = b'MMGA'
+CHECKPOINT_VERSION = 1
+
+
+def write_checkpoint(path: str, checkpoint: Dict):
+	'''
+		writes MAGIC, version (u8) and the zlib compressed pickle of checkpoint
+		the file is written next to path then renamed, so that path always holds a complete checkpoint
+	'''
+	data = CHECKPOINT_MAGIC + bytes([CHECKPOINT_VERSION]) + zlib.compress(pickle.dumps(checkpoint, protocol=pickle.HIGHEST_PROTOCOL))
+	temporary_path = path + '.tmp'
+	with open(temporary_path, 'wb') as checkpoint_file:
+		checkpoint_file.write(data)
+		checkpoint_file.flush()
+		os.fsync(checkpoint_file.fileno())
+	os.replace(temporary_path, path)
+
+
+def read_checkpoint(path: str) -> Dict:
+	with open(path, 'rb') as checkpoint_file:
+		data = checkpoint_file.read()
+	assert data[:len(CHECKPOINT_MAGIC)] == CHECKPOINT_MAGIC, f"{path} is not a checkpoint file"
+	version = data[len(CHECKPOINT_MAGIC)]
+	assert version == CHECKPOINT_VERSION, f"unsupported checkpoint version <{version}>"
+	return pickle.loads(zlib.decompress(data[len(CHECKPOINT_MAGIC) + 1:]))
+
+
+class GeneticAlgorithmRun(object):
+	"""
+		applies apply_genetic_algorithm_iteration generation after generation, checkpointing the run every checkpoint_every generations
+
+		generate_iteration_arguments takes the random.Random of the run and returns every other argument of
+		apply_genetic_algorithm_iteration (selection_rate, crossover...); operators should draw from that Random
+		a checkpoint holds the population, the fitness of the last evaluated population, the generation counter,
+		the state of the Random of the run and the state of the random module, which fitness functions often use
+		resuming from it gives the same generations as a run that never stopped, as long as compute_fitness only depends
+		on the population and the random module
+
+		checkpoints are pickled and written by a background thread, so evaluation goes on during the write
+		genomes are not copied beforehand, operators must return new genomes instead of modifying them in place
+	"""
+	def __init__(
+		self,
+		population: List[any],
+		compute_fitness: Callable[[List[any]], List[float]],
+		generate_iteration_arguments: Callable[[Random], Dict],
+		checkpoint_path: Optional[str] = None,
+		checkpoint_every: int = 10,
+		seed: int = 0
+	):
+		self.population = population
+		self.compute_fitness = compute_fitness
+		self.generate_iteration_arguments = generate_iteration_arguments
+		self.checkpoint_path = checkpoint_path
+		self.checkpoint_every = checkpoint_every
+		self.random = Random(seed)
+		self.fitness: Optional[List[float]] = None
+		self.generation = 0
+		self.executor = None
+		self.pending_write: Optional[Future] = None
+
+	@classmethod
+	def resume(
+		cls,
+		checkpoint_path: str,
+		compute_fitness: Callable[[List[any]], List[float]],
+		generate_iteration_arguments: Callable[[Random], Dict],
+		checkpoint_every: int = 10
+	) -> 'GeneticAlgorithmRun':
+		''' the run as of its last checkpoint, which keeps checkpointing to the same path '''
+		checkpoint = read_checkpoint(checkpoint_path)
+		run = cls(checkpoint['population'], compute_fitness, generate_iteration_arguments, checkpoint_path, checkpoint_every)
+		run.fitness = checkpoint['fitness']
+		run.generation = checkpoint['generation']
+		run.random.setstate(checkpoint['random_state'])
+		random.setstate(checkpoint['global_random_state'])
+		return run
+
+	def record_fitness(self, population: List[any]) -> List[float]:
+		self.fitness = self.compute_fitness(population)
+		return self.fitness
+
+	def run(self, nb_generations: int) -> List[any]:
+		for _ in range(nb_generations):
+			self.population = apply_genetic_algorithm_iteration(
+				population=self.population,
+				compute_fitness=self.record_fitness,
+				**self.generate_iteration_arguments(self.random)
+			)
+			self.generation += 1
+			if self.checkpoint_path is not None and self.generation % self.checkpoint_every == 0:
+				self.checkpoint()
+		return self.population
+
+	def checkpoint(self):
+		''' hands a snapshot of the run to the writing thread, waiting only if the previous checkpoint is still being written '''
+		checkpoint = dict()
+		checkpoint['generation'] = self.generation
+		checkpoint['population'] = list(self.population)
+		checkpoint['fitness'] = list(self.fitness) if self.fitness is not None else None
+		checkpoint['random_state'] = self.random.getstate()
+		checkpoint['global_random_state'] = random.getstate()
+
+		self.wait()
+		if self.executor is None:
+			self.executor = ThreadPoolExecutor(max_workers=1)
+		self.pending_write = self.executor.submit(write_checkpoint, self.checkpoint_path, checkpoint)
+
+	def wait(self):
+		''' blocks until the last checkpoint is on disk, raising its error if writing it failed '''
+		if self.pending_write is not None:
+			self.pending_write.result()
+			self.pending_write = None
+
+	def close(self):
+		self.wait()
+		if self.executor is not None:
+			self.executor.shutdown()
+			self.executor = None
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
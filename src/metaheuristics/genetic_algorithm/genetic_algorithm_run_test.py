@@ -0,0 +1,49 @@
+import os
+import random
+import tempfile
+from random import Random
+from typing import Dict, List
+
+from .genetic_algorithm import PopulationReplacementStrategy
+from .genetic_algorithm_run import GeneticAlgorithmRun, read_checkpoint
+
+def noisy_fitness(population: List[List[int]]) -> List[float]:
+	return [sum(genome) + random.random() for genome in population] # draws from the random module, as game fitness functions do
+
+def generate_iteration_arguments(rng: Random) -> Dict:
+	def crossover(parents):
+		split_point = rng.randint(0, len(parents[0]))
+		return [
+			parents[0][:split_point] + parents[1][split_point:],
+			parents[1][:split_point] + parents[0][split_point:],
+		]
+
+	arguments = dict()
+	arguments['selection_rate'] = 0.5
+	arguments['population_replacement_strategy'] = PopulationReplacementStrategy.ELITIST
+	arguments['random_generator'] = lambda n: [rng.random() for _ in range(n)]
+	arguments['no_repeat_int_random_generator'] = lambda n, min_val, max_val: rng.sample(range(min_val, max_val), n)
+	arguments['crossover'] = crossover
+	arguments['nb_parents_for_crossover'] = 2
+	arguments['mutation_rate'] = 0.2
+	arguments['mutate'] = lambda genome: [rng.randint(0, 9) if rng.random() < 0.1 else g for g in genome]
+	return arguments
+
+def test_resumed_run_matches_uninterrupted_run():
+	population = [[i % 10 for i in range(j, j + 8)] for j in range(20)]
+	with tempfile.TemporaryDirectory() as directory:
+		random.seed(0)
+		with GeneticAlgorithmRun(population, noisy_fitness, generate_iteration_arguments, seed=1) as uninterrupted:
+			expected = uninterrupted.run(12)
+
+		path = os.path.join(directory, 'checkpoint')
+		random.seed(0)
+		with GeneticAlgorithmRun(population, noisy_fitness, generate_iteration_arguments, path, checkpoint_every=4, seed=1) as interrupted:
+			interrupted.run(10) # the process dies after generation 10, the last checkpoint is the one of generation 8
+
+		random.seed(42)
+		assert read_checkpoint(path)['generation'] == 8
+		with GeneticAlgorithmRun.resume(path, noisy_fitness, generate_iteration_arguments, checkpoint_every=4) as resumed:
+			assert resumed.generation == 8
+			assert resumed.run(4) == expected
+			assert resumed.fitness == uninterrupted.fitness
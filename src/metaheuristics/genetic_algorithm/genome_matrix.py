@@ -0,0 +1,119 @@
+# genetic algorithm over a population stored as a fixed-width integer matrix, one genome per row
+# crossovers and mutations of a whole generation are a handful of matrix operations instead of one Python call per genome
+
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from .selection import SelectionOperator, truncation_selection
+
+# takes (first parents, second parents, rng), one row per crossover, returns (first children, second children)
+MatrixCrossover = Callable[[np.ndarray, np.ndarray, np.random.Generator], Tuple[np.ndarray, np.ndarray]]
+
+
+def to_genome_matrix(
+	population: List[List[int]],
+	padding: int = 0,
+	dtype=np.int64
+) -> np.ndarray:
+	''' genomes shorter than the longest one are completed with padding '''
+	width = max((len(genome) for genome in population), default=0)
+	matrix = np.full((len(population), width), padding, dtype=dtype)
+	for i, genome in enumerate(population):
+		matrix[i, :len(genome)] = genome
+	return matrix
+
+
+def from_genome_matrix(matrix: np.ndarray) -> List[List[int]]:
+	return matrix.tolist()
+
+
+def swap_where(mask: np.ndarray, first: np.ndarray, second: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+	''' children taking the genes of the other parent where mask is set '''
+	return np.where(mask, second, first), np.where(mask, first, second)
+
+
+def one_point_crossover(first: np.ndarray, second: np.ndarray, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+	''' genes from the split point on are swapped, as the split point crossover of the list genetic algorithm '''
+	nb_crossovers, width = first.shape
+	split_points = rng.integers(0, width + 1, size=(nb_crossovers, 1))
+	return swap_where(np.arange(width) >= split_points, first, second)
+
+
+def two_point_crossover(first: np.ndarray, second: np.ndarray, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+	''' genes between two split points are swapped '''
+	nb_crossovers, width = first.shape
+	split_points = np.sort(rng.integers(0, width + 1, size=(nb_crossovers, 2)), axis=1)
+	genes = np.arange(width)
+	return swap_where((genes >= split_points[:, :1]) & (genes < split_points[:, 1:]), first, second)
+
+
+def uniform_crossover(first: np.ndarray, second: np.ndarray, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+	''' every gene is swapped with probability 1/2 '''
+	return swap_where(rng.random(first.shape) < 0.5, first, second)
+
+
+def mutate_genes(
+	matrix: np.ndarray,
+	gene_mutation_rate: float,
+	gene_values: np.ndarray, # values a mutated gene is drawn from, e.g. instruction symbols and memory positions
+	rng: np.random.Generator
+) -> np.ndarray:
+	'''
+		every gene is replaced by a random gene value with probability gene_mutation_rate, in place
+		the gaps between mutated genes are drawn from a geometric distribution, so that the cost follows the number of mutations
+	'''
+	if gene_mutation_rate <= 0 or matrix.size == 0:
+		return matrix
+	if gene_mutation_rate >= 1:
+		matrix[...] = rng.choice(gene_values, size=matrix.shape)
+		return matrix
+
+	batch_size = int(matrix.size * gene_mutation_rate * 1.1) + 16
+	positions = np.cumsum(rng.geometric(gene_mutation_rate, size=batch_size)) - 1
+	while positions[-1] < matrix.size:
+		positions = np.concatenate((positions, positions[-1] + np.cumsum(rng.geometric(gene_mutation_rate, size=batch_size))))
+	positions = positions[positions < matrix.size]
+	np.put(matrix, positions, rng.choice(gene_values, size=len(positions)))
+	return matrix
+
+
+def apply_matrix_genetic_algorithm_iteration(
+	population: np.ndarray, # one genome per row
+	compute_fitness: Callable[[np.ndarray], List[float]],
+	selection_rate: float,
+	population_replacement_strategy,
+	rng: np.random.Generator,
+	crossover: MatrixCrossover,
+	nb_crossovers: int, # pairs of distinct parents, each replaced by its two children
+	gene_mutation_rate: float,
+	gene_values: np.ndarray,
+	selection_operator: Optional[SelectionOperator] = None # truncation_selection by default
+) -> np.ndarray:
+	'''
+		same steps as apply_genetic_algorithm_iteration, with many crossovers per generation and per gene mutation
+
+		slots the replacement strategy leaves empty (ELITIST with a selection_rate below 1/2) are filled with survivors in turn
+	'''
+	n = len(population)
+	fitness = np.asarray(compute_fitness(population), dtype=np.float64)
+
+	# selection
+	survivors = (selection_operator if selection_operator is not None else truncation_selection)(fitness, int(n * selection_rate)).tolist()
+	if len(survivors) == 0:
+		survivors = truncation_selection(fitness, 1).tolist()
+	replaced_indices = population_replacement_strategy[0]([
+		survivors[i] if i < len(survivors) else None
+		for i in range(n)
+	])
+	replaced_indices = [i if i is not None else survivors[slot % len(survivors)] for slot, i in enumerate(replaced_indices)]
+	out = population[np.array(replaced_indices, dtype=np.int64)]
+
+	# crossover
+	nb_crossovers = min(nb_crossovers, n // 2)
+	if nb_crossovers > 0:
+		parents = rng.permutation(n)[:2 * nb_crossovers].reshape(nb_crossovers, 2)
+		out[parents[:, 0]], out[parents[:, 1]] = crossover(out[parents[:, 0]], out[parents[:, 1]], rng)
+
+	# mutation
+	return mutate_genes(out, gene_mutation_rate, gene_values, rng)
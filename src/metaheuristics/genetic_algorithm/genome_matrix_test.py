@@ -0,0 +1,52 @@
+import numpy as np
+
+from .genetic_algorithm import PopulationReplacementStrategy
+from .genome_matrix import (
+	to_genome_matrix, from_genome_matrix, one_point_crossover, two_point_crossover, uniform_crossover,
+	mutate_genes, apply_matrix_genetic_algorithm_iteration
+)
+
+def test_matrix_round_trip_pads_short_genomes():
+	matrix = to_genome_matrix([[1, 2, 3], [4]], padding=9)
+	assert from_genome_matrix(matrix) == [[1, 2, 3], [4, 9, 9]]
+
+def test_crossovers_swap_genes_between_parents():
+	rng = np.random.default_rng(0)
+	first = np.arange(0, 400).reshape(40, 10)
+	second = np.arange(1000, 1400).reshape(40, 10)
+	for crossover in [one_point_crossover, two_point_crossover, uniform_crossover]:
+		first_children, second_children = crossover(first, second, rng)
+		from_first = first_children == first
+		assert np.all(from_first | (first_children == second))
+		assert np.array_equal(second_children, np.where(from_first, second, first))
+
+	first_children, _ = one_point_crossover(first, second, rng)
+	from_first = first_children == first
+	assert np.all(from_first[:, :-1] >= from_first[:, 1:]) # a prefix of the first parent, then the second one
+
+def test_mutation_rate_bounds():
+	rng = np.random.default_rng(0)
+	gene_values = np.array([7, 8])
+	matrix = np.zeros((50, 40), dtype=np.int64)
+	assert np.all(mutate_genes(matrix.copy(), 0.0, gene_values, rng) == 0)
+	assert np.all(np.isin(mutate_genes(matrix.copy(), 1.0, gene_values, rng), gene_values))
+
+def test_generation_keeps_the_fittest():
+	rng = np.random.default_rng(0)
+	population = rng.integers(0, 10, size=(200, 40))
+	compute_fitness = lambda matrix: matrix.sum(axis=1)
+	initial_fitness = compute_fitness(population).mean()
+	for _ in range(20):
+		population = apply_matrix_genetic_algorithm_iteration(
+			population=population,
+			compute_fitness=compute_fitness,
+			selection_rate=0.3,
+			population_replacement_strategy=PopulationReplacementStrategy.ELITIST,
+			rng=rng,
+			crossover=two_point_crossover,
+			nb_crossovers=50,
+			gene_mutation_rate=0.01,
+			gene_values=np.arange(10),
+		)
+	assert population.shape == (200, 40)
+	assert compute_fitness(population).mean() > initial_fitness
@@ -0,0 +1,104 @@
+# population stored as one buffer of byte encoded genomes (see engine.genome_encoding) and the offsets of every genome in it
+# it pickles as two byte strings, and a saved population is read back through mmap, only the pages actually read being loaded
+
+from typing import Iterable, List, Optional
+import mmap
+import struct
+
+import numpy as np
+
+from engine.genome_encoding import GenomeEncoding
+
+POPULATION_MAGIC = b'MMGP'
+POPULATION_VERSION = 1
+HEADER_FORMAT = '<QQ' # nb genomes, nb symbols
+
+
+class GenomePopulation(object):
+	"""
+		read only sequence of genomes, decoded back to lists of ints when indexed
+
+		genome i is data[offsets[i]:offsets[i + 1]], data being bytes, a bytearray or a memory map
+	"""
+	def __init__(
+		self,
+		encoding: GenomeEncoding,
+		data,
+		offsets: np.ndarray # nb genomes + 1 uint64, starting at 0
+	):
+		assert len(offsets) > 0 and offsets[0] == 0 and offsets[-1] <= len(data)
+		self.encoding = encoding
+		self.data = data
+		self.offsets = offsets
+		self.file_map: Optional[mmap.mmap] = None
+
+	@classmethod
+	def from_genomes(cls, genomes: Iterable[Iterable[int]], encoding: GenomeEncoding) -> 'GenomePopulation':
+		encoded = [encoding.encode(genome) for genome in genomes]
+		offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+		np.cumsum([len(genome) for genome in encoded], out=offsets[1:])
+		return cls(encoding, b''.join(encoded), offsets)
+
+	def __len__(self) -> int:
+		return len(self.offsets) - 1
+
+	def genome_bytes(self, index: int) -> memoryview:
+		if not (-len(self) <= index < len(self)):
+			raise IndexError('genome index out of range')
+		index %= len(self)
+		return memoryview(self.data)[int(self.offsets[index]):int(self.offsets[index + 1])]
+
+	def __getitem__(self, index: int) -> List[int]:
+		return self.encoding.decode(self.genome_bytes(index))
+
+	def __iter__(self):
+		for index in range(len(self)):
+			yield self[index]
+
+	def to_genomes(self) -> List[List[int]]:
+		return [self[index] for index in range(len(self))]
+
+	def nbytes(self) -> int:
+		''' size of the genomes and their offsets '''
+		return int(self.offsets[-1]) + self.offsets.nbytes
+
+	def __reduce__(self):
+		size = int(self.offsets[-1])
+		return (GenomePopulation, (self.encoding, bytes(memoryview(self.data)[:size]), self.offsets))
+
+	def save(self, path: str):
+		'''
+			writes MAGIC, version (u8), nb genomes and nb symbols (u64 each), the symbols (i64 each),
+			the offsets (u64 each) then the genome bytes
+		'''
+		with open(path, 'wb') as population_file:
+			population_file.write(POPULATION_MAGIC + bytes([POPULATION_VERSION]))
+			population_file.write(struct.pack(HEADER_FORMAT, len(self), len(self.encoding.symbols)))
+			population_file.write(np.asarray(self.encoding.symbols, dtype='<i8').tobytes())
+			population_file.write(self.offsets.astype('<u8').tobytes())
+			population_file.write(memoryview(self.data)[:int(self.offsets[-1])])
+
+	@classmethod
+	def load(cls, path: str, use_mmap: bool = True) -> 'GenomePopulation':
+		''' with use_mmap, genomes are read from the file on demand and the population stays valid as long as it is referenced '''
+		with open(path, 'rb') as population_file:
+			if use_mmap:
+				content = mmap.mmap(population_file.fileno(), 0, access=mmap.ACCESS_READ)
+			else:
+				content = population_file.read()
+
+		assert content[:len(POPULATION_MAGIC)] == POPULATION_MAGIC, f"{path} is not a population file"
+		version = content[len(POPULATION_MAGIC)]
+		assert version == POPULATION_VERSION, f"unsupported population version <{version}>"
+		position = len(POPULATION_MAGIC) + 1
+		nb_genomes, nb_symbols = struct.unpack_from(HEADER_FORMAT, content, position)
+		position += struct.calcsize(HEADER_FORMAT)
+		symbols = np.frombuffer(content, dtype='<i8', count=nb_symbols, offset=position).tolist()
+		position += 8 * nb_symbols
+		offsets = np.frombuffer(content, dtype='<u8', count=nb_genomes + 1, offset=position)
+		position += 8 * (nb_genomes + 1)
+
+		population = cls(GenomeEncoding(symbols), memoryview(content)[position:], offsets)
+		if use_mmap:
+			population.file_map = content
+		return population
@@ -0,0 +1,27 @@
+import os
+import pickle
+import tempfile
+
+from .genome_population import GenomePopulation
+from engine.genome_encoding import generate_genome_encoding
+from games.snake.snake_agents import generate_spiral_agent
+from games.snake.snake_instructions import generate_snake_instruction_set
+
+def test_genome_population_round_trips():
+	encoding = generate_genome_encoding(generate_snake_instruction_set())
+	genomes = [generate_spiral_agent(), [], [ord('↑'), 0, 7]]
+	population = GenomePopulation.from_genomes(genomes, encoding)
+	assert len(population) == 3
+	assert population[0] == genomes[0] and population[-1] == genomes[2]
+	assert population.to_genomes() == genomes
+	assert population.nbytes() == sum(len(genome) for genome in genomes) + 4 * 8
+	assert pickle.loads(pickle.dumps(population)).to_genomes() == genomes
+
+	with tempfile.TemporaryDirectory() as directory:
+		path = os.path.join(directory, 'population')
+		population.save(path)
+		for use_mmap in [True, False]:
+			loaded = GenomePopulation.load(path, use_mmap=use_mmap)
+			assert list(loaded) == genomes
+			assert pickle.loads(pickle.dumps(loaded)).to_genomes() == genomes
+			del loaded
@@ -0,0 +1,245 @@
+# island model: K populations evolve each in its own process, and every migration_interval generations
+# the best genomes of every island migrate to its neighbors, replacing their worst genomes
+# migrants travel pickled through a multiprocessing.Queue per island (a pipe fed by a background thread, so sending never blocks)
+# an island raising, or killed, stops the whole model: the parent terminates the other islands and raises
+
+from multiprocessing import Process, Queue
+from queue import Empty
+from random import Random
+from time import perf_counter
+from typing import Callable, Dict, List
+import pickle
+import random
+import traceback
+
+from .genetic_algorithm_run import GeneticAlgorithmRun
+
+
+class MigrationTopology(object):
+	"""MigrationTopology lists the ways islands send their migrants"""
+	RING = 'ring' # island i sends to island i + 1
+	ALL_TO_ALL = 'all_to_all'
+
+
+def migration_targets(
+	island_id: int,
+	nb_islands: int,
+	topology: str
+) -> List[int]:
+	if nb_islands <= 1:
+		return []
+	if topology == MigrationTopology.RING:
+		return [(island_id + 1) % nb_islands]
+	if topology == MigrationTopology.ALL_TO_ALL:
+		return [other for other in range(nb_islands) if other != island_id]
+	raise ValueError(f"unknown migration topology <{topology}>")
+
+
+class IslandError(RuntimeError):
+	"""an island of run_island_model raised or died, with its traceback or exit code"""
+	pass
+
+
+def run_island(
+	island_id: int,
+	population: List[any],
+	compute_fitness: Callable[[List[any]], List[float]],
+	generate_iteration_arguments: Callable[[Random], Dict],
+	population_replacement_strategy,
+	nb_generations: int,
+	migration_interval: int,
+	nb_migrants: int,
+	nb_sources: int, # number of islands sending migrants to this one
+	targets: List[int],
+	inboxes: List[Queue],
+	results: Queue,
+	seed: int
+):
+	'''
+		evolves one island, puts (island id, population, fitness, statistics) in results once done,
+		or (island id, None, None, traceback) if it raised
+	'''
+	try:
+		evolve_island(island_id, population, compute_fitness, generate_iteration_arguments, population_replacement_strategy, nb_generations, migration_interval, nb_migrants, nb_sources, targets, inboxes, results, seed)
+	except BaseException:
+		results.put((island_id, None, None, traceback.format_exc()))
+
+
+def evolve_island(
+	island_id: int,
+	population: List[any],
+	compute_fitness: Callable[[List[any]], List[float]],
+	generate_iteration_arguments: Callable[[Random], Dict],
+	population_replacement_strategy,
+	nb_generations: int,
+	migration_interval: int,
+	nb_migrants: int,
+	nb_sources: int,
+	targets: List[int],
+	inboxes: List[Queue],
+	results: Queue,
+	seed: int
+):
+	random.seed(f"{seed}-{island_id}")
+	def generate_island_arguments(rng: Random) -> Dict:
+		arguments = generate_iteration_arguments(rng)
+		arguments['population_replacement_strategy'] = population_replacement_strategy
+		return arguments
+	run = GeneticAlgorithmRun(population, compute_fitness, generate_island_arguments, seed=f"{seed}-{island_id}")
+
+	statistics = dict()
+	statistics['sent_messages'] = 0
+	statistics['sent_bytes'] = 0
+	statistics['received_messages'] = 0
+	statistics['received_bytes'] = 0
+	statistics['migration_seconds'] = 0.0
+	pending = dict() # migration round -> [(source island, pickled migrants)] received ahead of time
+	migration_round = 0
+	start = perf_counter()
+
+	while run.generation < nb_generations:
+		run.run(min(migration_interval, nb_generations - run.generation))
+		if run.generation >= nb_generations or (nb_sources == 0 and len(targets) == 0):
+			continue
+
+		migration_start = perf_counter()
+		fitness = compute_fitness(run.population)
+		ranking = sorted(range(len(fitness)), key=lambda i: fitness[i], reverse=True)
+
+		message = pickle.dumps([run.population[i] for i in ranking[:nb_migrants]], protocol=pickle.HIGHEST_PROTOCOL)
+		for target in targets:
+			inboxes[target].put((migration_round, island_id, message))
+			statistics['sent_messages'] += 1
+			statistics['sent_bytes'] += len(message)
+
+		received = pending.pop(migration_round, [])
+		while len(received) < nb_sources:
+			message_round, source, message = inboxes[island_id].get()
+			if message_round == migration_round:
+				received.append((source, message))
+			else:
+				pending.setdefault(message_round, []).append((source, message))
+		statistics['received_messages'] += len(received)
+		statistics['received_bytes'] += sum(len(message) for (_, message) in received)
+
+		immigrants = [genome for (_, message) in sorted(received) for genome in pickle.loads(message)]
+		population = list(run.population)
+		for i, genome in zip(reversed(ranking), immigrants): # worst genomes first
+			population[i] = genome
+		run.population = population
+		migration_round += 1
+		statistics['migration_seconds'] += perf_counter() - migration_start
+
+	statistics['generations'] = run.generation
+	statistics['seconds'] = perf_counter() - start
+	results.put((island_id, run.population, compute_fitness(run.population), statistics))
+
+
+def run_island_model(
+	populations: List[List[any]], # one per island
+	compute_fitness: Callable[[List[any]], List[float]],
+	generate_iteration_arguments: Callable[[Random], Dict], # as for GeneticAlgorithmRun, population_replacement_strategy is set per island
+	population_replacement_strategies: List[any], # one PopulationReplacementStrategy per island
+	nb_generations: int,
+	migration_interval: int = 10,
+	nb_migrants: int = 2,
+	topology: str = MigrationTopology.RING,
+	seed: int = 0,
+	poll_interval: float = 1.0 # seconds between two checks that islands still running are alive
+) -> Dict:
+	'''
+		evolves every island for nb_generations in its own process, migrating nb_migrants genomes every migration_interval generations
+
+		compute_fitness and generate_iteration_arguments must be picklable (module level functions or functools.partial of ones)
+		every island draws from its own Random and its own random module seed, so runs are reproducible
+		migrants are chosen on a fresh evaluation of the island, which costs one extra evaluation per migration
+
+		returns the final 'populations' and 'fitness' of every island, per island 'statistics',
+		the total 'migration_messages' and 'migration_bytes', and the 'generations_per_second' of the whole model
+		raises IslandError once an island raised or died without results, after terminating the other islands
+	'''
+	assert len(populations) == len(population_replacement_strategies)
+	nb_islands = len(populations)
+	targets = [migration_targets(island_id, nb_islands, topology) for island_id in range(nb_islands)]
+	nb_sources = [sum(island_id in t for t in targets) for island_id in range(nb_islands)]
+
+	inboxes = [Queue() for _ in range(nb_islands)]
+	results = Queue()
+	start = perf_counter()
+	processes = [
+		Process(
+			target=run_island,
+			args=(
+				island_id,
+				populations[island_id],
+				compute_fitness,
+				generate_iteration_arguments,
+				population_replacement_strategies[island_id],
+				nb_generations,
+				migration_interval,
+				nb_migrants,
+				nb_sources[island_id],
+				targets[island_id],
+				inboxes,
+				results,
+				seed,
+			)
+		)
+		for island_id in range(nb_islands)
+	]
+	for process in processes:
+		process.start()
+
+	# results are read before joining, as processes exit once their results are flushed
+	outcomes = []
+	exited = set() # islands seen exited without results, whose results had a whole poll interval to arrive
+	try:
+		while len(outcomes) < nb_islands:
+			try:
+				outcome = results.get(timeout=poll_interval)
+			except Empty:
+				done = {island_id for (island_id, _, _, _) in outcomes}
+				for island_id, process in enumerate(processes):
+					if island_id in done or process.is_alive():
+						continue
+					if process.exitcode != 0:
+						raise IslandError(f"island {island_id} died with exit code {process.exitcode}")
+					if island_id in exited:
+						raise IslandError(f"island {island_id} exited without results")
+					exited.add(island_id)
+				continue
+			island_id, population, _, statistics = outcome
+			if population is None:
+				raise IslandError(f"island {island_id} raised:\n{statistics}")
+			outcomes.append(outcome)
+	except BaseException:
+		for process in processes:
+			if process.is_alive():
+				process.terminate()
+		for process in processes:
+			process.join()
+		raise
+	for process in processes:
+		process.join()
+	duration = perf_counter() - start
+	outcomes.sort(key=lambda outcome: outcome[0])
+
+	output = dict()
+	output['populations'] = [population for (_, population, _, _) in outcomes]
+	output['fitness'] = [fitness for (_, _, fitness, _) in outcomes]
+	output['statistics'] = [statistics for (_, _, _, statistics) in outcomes]
+	output['migration_messages'] = sum(statistics['sent_messages'] for statistics in output['statistics'])
+	output['migration_bytes'] = sum(statistics['sent_bytes'] for statistics in output['statistics'])
+	output['generations_per_second'] = nb_islands * nb_generations / duration if duration > 0 else float('inf')
+	return output
+
+
+def migration_traffic_to_str(output: Dict) -> str:
+	lines = [
+		f"island {island_id}: sent {statistics['sent_messages']} messages ({statistics['sent_bytes']} bytes),"
+		f" received {statistics['received_messages']} messages ({statistics['received_bytes']} bytes),"
+		f" {statistics['migration_seconds']:.3f}s of {statistics['seconds']:.3f}s migrating"
+		for island_id, statistics in enumerate(output['statistics'])
+	]
+	lines.append(f"total: {output['migration_messages']} messages, {output['migration_bytes']} bytes, {output['generations_per_second']:.1f} generations/s")
+	return "\n".join(lines)
@@ -0,0 +1,64 @@
+import os
+from random import Random
+from time import perf_counter
+from typing import Dict, List
+
+from .genetic_algorithm import PopulationReplacementStrategy, winner_takes_it_all_replacement
+from .island_model import run_island_model, migration_targets, MigrationTopology, IslandError
+
+def sum_fitness(population: List[List[int]]) -> List[float]:
+	return [float(sum(genome)) for genome in population]
+
+def generate_iteration_arguments(rng: Random) -> Dict:
+	arguments = dict()
+	arguments['selection_rate'] = 0.5
+	arguments['random_generator'] = lambda n: [rng.random() for _ in range(n)]
+	arguments['no_repeat_int_random_generator'] = lambda n, min_val, max_val: rng.sample(range(min_val, max_val), n)
+	arguments['crossover'] = lambda parents: [parents[1], parents[0]]
+	arguments['nb_parents_for_crossover'] = 2
+	arguments['mutation_rate'] = 0.3
+	arguments['mutate'] = lambda genome: [rng.randint(0, 9) if rng.random() < 0.2 else g for g in genome]
+	return arguments
+
+def test_winner_takes_it_all_replaces_every_unfit_agent():
+	assert winner_takes_it_all_replacement([3, 2, None, None]) == [3, 2, 3, 3]
+
+def test_migration_targets():
+	assert migration_targets(2, 3, MigrationTopology.RING) == [0]
+	assert migration_targets(1, 3, MigrationTopology.ALL_TO_ALL) == [0, 2]
+	assert migration_targets(0, 1, MigrationTopology.ALL_TO_ALL) == []
+
+def test_islands_are_reproducible_and_count_migrations():
+	rng = Random(0)
+	populations = [[[rng.randint(0, 9) for _ in range(6)] for _ in range(10)] for _ in range(3)]
+	strategies = [PopulationReplacementStrategy.ELITIST, PopulationReplacementStrategy.WINNER_TAKES_IT_ALL, PopulationReplacementStrategy.ELITIST]
+
+	for topology, nb_targets in [(MigrationTopology.RING, 1), (MigrationTopology.ALL_TO_ALL, 2)]:
+		outputs = [
+			run_island_model(populations, sum_fitness, generate_iteration_arguments, strategies, nb_generations=20, migration_interval=5, nb_migrants=2, topology=topology)
+			for _ in range(2)
+		]
+		assert outputs[0]['populations'] == outputs[1]['populations']
+		assert outputs[0]['fitness'] == [sum_fitness(population) for population in outputs[0]['populations']]
+		assert outputs[0]['migration_messages'] == 3 * 3 * nb_targets # migrations after generations 5, 10 and 15
+		assert all(statistics['received_messages'] == 3 * nb_targets for statistics in outputs[0]['statistics'])
+		assert outputs[0]['migration_bytes'] > 0
+
+def failing_sum_fitness(population: List[List[int]]) -> List[float]:
+	if any(-1 in genome for genome in population):
+		raise ValueError("negative gene")
+	if any(-2 in genome for genome in population):
+		os._exit(3) # as if killed
+	return sum_fitness(population)
+
+def test_a_failing_island_stops_the_model():
+	for gene, message in [(-1, "island 1 raised"), (-2, "island 1 died with exit code 3")]:
+		populations = [[[1, 2, 3] for _ in range(10)], [[gene, 2, 3] for _ in range(10)], [[1, 2, 3] for _ in range(10)]]
+		strategies = [PopulationReplacementStrategy.ELITIST for _ in populations]
+		start = perf_counter()
+		try:
+			run_island_model(populations, failing_sum_fitness, generate_iteration_arguments, strategies, nb_generations=20, migration_interval=5, poll_interval=0.1)
+			assert False, "the failing island went unnoticed"
+		except IslandError as error:
+			assert message in str(error)
+		assert perf_counter() - start < 10
@@ -0,0 +1,117 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from os import getpid
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple
+import random
+
+from utils.instrumentation import Instrumentation, LEVEL_INFO
+
+# set once per worker process by initialize_worker, so that it is not pickled along with every chunk
+worker_compute_individual_fitness = None
+worker_genome_typecode = None
+
+
+def initialize_worker(
+	compute_individual_fitness: Callable[[List[any]], float],
+	genome_typecode: str
+):
+	global worker_compute_individual_fitness, worker_genome_typecode
+	worker_compute_individual_fitness = compute_individual_fitness
+	worker_genome_typecode = genome_typecode
+
+
+def evaluate_chunk(
+	encoded_genomes: List[bytes],
+	seed: str
+) -> Tuple[int, List[float], float]:
+	''' returns (worker pid, fitness of every genome of the chunk, evaluation duration in seconds) '''
+	start = perf_counter()
+	random.seed(seed) # fitness functions drawing from random get the same draws whichever worker runs the chunk
+	fitness = [
+		worker_compute_individual_fitness(array(worker_genome_typecode, encoded_genome).tolist())
+		for encoded_genome in encoded_genomes
+	]
+	return (getpid(), fitness, perf_counter() - start)
+
+
+class ParallelFitnessEvaluator(object):
+	"""
+		compute_fitness for apply_genetic_algorithm_iteration that shards the population over a process pool
+
+		compute_individual_fitness must be picklable (a module level function or a functools.partial of one)
+		genomes are sent to workers as the bytes of an array of genome_typecode ('q' for instruction genomes, 'd' for real valued ones)
+		every call counts as one generation, and the random module of workers is seeded from (seed, generation, chunk index)
+		the throughput of every worker is reported at the end of every generation as a 'fitness.throughput' info event,
+		printed by default, pass an instrumentation to redirect or silence it
+	"""
+	def __init__(
+		self,
+		compute_individual_fitness: Callable[[List[any]], float],
+		nb_workers: Optional[int] = None, # defaults to the number of processors
+		chunk_size: int = 64,
+		seed: int = 0,
+		genome_typecode: str = 'q',
+		instrumentation: Optional[Instrumentation] = None
+	):
+		self.compute_individual_fitness = compute_individual_fitness
+		self.nb_workers = nb_workers
+		self.chunk_size = chunk_size
+		self.seed = seed
+		self.genome_typecode = genome_typecode
+		self.instrumentation = instrumentation if instrumentation is not None else Instrumentation(levels={'fitness.throughput': LEVEL_INFO})
+		self.generation = 0
+		self.worker_throughputs = dict() # worker pid -> genomes evaluated per second during the last generation
+		self.executor = None
+
+	def __call__(self, population: List[List[any]]) -> List[float]:
+		if self.executor is None:
+			self.executor = ProcessPoolExecutor(
+				max_workers=self.nb_workers,
+				initializer=initialize_worker,
+				initargs=(self.compute_individual_fitness, self.genome_typecode),
+			)
+
+		futures = []
+		for chunk_index, chunk_start in enumerate(range(0, len(population), self.chunk_size)):
+			encoded_genomes = [
+				array(self.genome_typecode, genome).tobytes()
+				for genome in population[chunk_start:chunk_start + self.chunk_size]
+			]
+			futures.append(self.executor.submit(evaluate_chunk, encoded_genomes, f"{self.seed}-{self.generation}-{chunk_index}"))
+
+		fitness = []
+		worker_genomes = dict()
+		worker_durations = dict()
+		for future in futures: # in submission order, hence in population order
+			pid, chunk_fitness, duration = future.result()
+			fitness += chunk_fitness
+			worker_genomes[pid] = worker_genomes.get(pid, 0) + len(chunk_fitness)
+			worker_durations[pid] = worker_durations.get(pid, 0.0) + duration
+
+		self.worker_throughputs = {
+			pid: worker_genomes[pid] / worker_durations[pid] if worker_durations[pid] > 0 else float('inf')
+			for pid in worker_genomes
+		}
+		if self.instrumentation.is_enabled('fitness.throughput', LEVEL_INFO):
+			self.instrumentation.emit('fitness.throughput', LEVEL_INFO, f"generation {self.generation}: {self.throughputs_to_str()}")
+
+		self.generation += 1
+		return fitness
+
+	def throughputs_to_str(self) -> str:
+		return ", ".join(
+			f"worker {pid} {throughput:.1f} genomes/s"
+			for pid, throughput in sorted(self.worker_throughputs.items())
+		)
+
+	def close(self):
+		if self.executor is not None:
+			self.executor.shutdown()
+			self.executor = None
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
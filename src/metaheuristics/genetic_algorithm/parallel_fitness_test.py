@@ -0,0 +1,32 @@
+from random import random, randint
+
+from .parallel_fitness import ParallelFitnessEvaluator
+from utils.instrumentation import Instrumentation, CollectingSink, LEVEL_INFO
+
+def noisy_sum(genome):
+	return sum(genome) + random()
+
+def test_parallel_fitness_is_ordered_and_reproducible():
+	population = [[randint(-100, 100) for _ in range(randint(0, 10))] for _ in range(50)]
+
+	runs = []
+	for nb_workers in [1, 3]:
+		with ParallelFitnessEvaluator(noisy_sum, nb_workers=nb_workers, chunk_size=7, seed=42) as compute_fitness:
+			runs.append([compute_fitness(population) for _ in range(2)])
+			assert len(compute_fitness.worker_throughputs) >= 1
+
+	assert runs[0] == runs[1]
+	assert runs[0][0] != runs[0][1] # every generation gets its own seeds
+	for fitness in runs[0]:
+		assert [int(f - s) for f, s in zip(fitness, map(sum, population))] == [0 for _ in population]
+
+def test_throughput_is_reported_every_generation():
+	assert ParallelFitnessEvaluator(noisy_sum).instrumentation.is_enabled('fitness.throughput', LEVEL_INFO)
+
+	sink = CollectingSink()
+	instrumentation = Instrumentation(levels={'fitness.throughput': LEVEL_INFO}, sinks=[sink])
+	with ParallelFitnessEvaluator(noisy_sum, nb_workers=2, chunk_size=4, instrumentation=instrumentation) as compute_fitness:
+		for _ in range(3):
+			compute_fitness([[1, 2, 3] for _ in range(10)])
+	assert [(category, level) for category, level, _ in sink.events] == [('fitness.throughput', LEVEL_INFO) for _ in range(3)]
+	assert sink.events[2][2].startswith("generation 2: worker ") and "genomes/s" in sink.events[2][2]
@@ -0,0 +1,74 @@
+# selection operators for apply_genetic_algorithm_iteration
+# an operator takes the fitness array of the population and a number of survivors, and returns the indices of the survivors
+# ordered by decreasing fitness, ties by increasing index, as a stable sort of the population would order them
+
+from typing import Callable
+
+import numpy as np
+
+SelectionOperator = Callable[[np.ndarray, int], np.ndarray]
+
+
+def order_by_fitness(fitness: np.ndarray, indices: np.ndarray) -> np.ndarray:
+	''' indices ordered by decreasing fitness, equal fitness keeping the order of indices '''
+	return indices[np.argsort(-fitness[indices], kind='stable')]
+
+
+def top_k_indices(fitness: np.ndarray, k: int) -> np.ndarray:
+	'''
+		indices of the k best genomes, in the order of sorted(..., reverse=True) on fitness
+		O(n + k log k): np.partition finds the k-th best fitness, only the genomes above it get sorted
+	'''
+	n = len(fitness)
+	if k <= 0:
+		return np.zeros(0, dtype=np.int64)
+	if k >= n:
+		return order_by_fitness(fitness, np.arange(n))
+
+	threshold = np.partition(fitness, n - k)[n - k]
+	above = np.flatnonzero(fitness > threshold)
+	tied = np.flatnonzero(fitness == threshold)[:k - len(above)] # lowest indices first, as a stable sort keeps them
+	return order_by_fitness(fitness, np.concatenate((above, tied)))
+
+
+def truncation_selection(fitness: np.ndarray, nb_survivors: int) -> np.ndarray:
+	''' the nb_survivors best genomes, the default selection of apply_genetic_algorithm_iteration '''
+	return top_k_indices(fitness, nb_survivors)
+
+
+def generate_tournament_selection(
+	tournament_size: int,
+	rng: np.random.Generator
+) -> SelectionOperator:
+	''' every survivor wins a tournament between tournament_size genomes drawn with replacement, a genome may survive several times '''
+	def tournament_selection(fitness: np.ndarray, nb_survivors: int) -> np.ndarray:
+		if nb_survivors <= 0 or len(fitness) == 0:
+			return np.zeros(0, dtype=np.int64)
+		contestants = rng.integers(0, len(fitness), size=(nb_survivors, tournament_size))
+		winners = contestants[np.arange(nb_survivors), np.argmax(fitness[contestants], axis=1)]
+		return order_by_fitness(fitness, np.sort(winners))
+	return tournament_selection
+
+
+def generate_rank_selection(
+	selection_pressure: float,
+	rng: np.random.Generator
+) -> SelectionOperator:
+	'''
+		linear ranking: survivors are drawn with replacement, with a probability growing linearly with their rank
+		selection_pressure in [1, 2] is the expected number of copies of the best genome, 1 being a uniform draw
+	'''
+	assert 1 <= selection_pressure <= 2
+	def rank_selection(fitness: np.ndarray, nb_survivors: int) -> np.ndarray:
+		n = len(fitness)
+		if nb_survivors <= 0 or n == 0:
+			return np.zeros(0, dtype=np.int64)
+		ranks = np.empty(n, dtype=np.float64)
+		ranks[np.argsort(fitness, kind='stable')] = np.arange(n) # 0 for the worst genome
+		if n == 1:
+			probabilities = np.ones(1)
+		else:
+			probabilities = (2 - selection_pressure) / n + 2 * ranks * (selection_pressure - 1) / (n * (n - 1))
+		drawn = rng.choice(n, size=nb_survivors, replace=True, p=probabilities / probabilities.sum())
+		return order_by_fitness(fitness, np.sort(drawn))
+	return rank_selection
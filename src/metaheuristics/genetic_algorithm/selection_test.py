@@ -0,0 +1,47 @@
+from random import Random
+
+import numpy as np
+
+from .genetic_algorithm import apply_genetic_algorithm_iteration, PopulationReplacementStrategy
+from .selection import top_k_indices, generate_tournament_selection, generate_rank_selection
+
+def test_top_k_matches_stable_sort():
+	rng = Random(0)
+	for _ in range(200):
+		fitness = [rng.randint(0, 5) for _ in range(rng.randint(0, 30))]
+		k = rng.randint(0, len(fitness) + 2)
+		expected = sorted(range(len(fitness)), key=lambda i: fitness[i], reverse=True)[:k]
+		assert top_k_indices(np.array(fitness, dtype=np.float64), k).tolist() == expected
+
+def test_same_generation_as_full_sort():
+	for seed in range(50):
+		rng = Random(seed)
+		population = [[rng.randint(0, 3) for _ in range(4)] for _ in range(rng.randint(2, 20))]
+		selection_rate = rng.random()
+		strategy = rng.choice([PopulationReplacementStrategy.ELITIST, PopulationReplacementStrategy.WINNER_TAKES_IT_ALL])
+
+		population_by_fitness = sorted(zip(population, [sum(g) for g in population]), key=lambda pf: pf[1], reverse=True)
+		nb_survivors = int(len(population) * selection_rate)
+		expected = strategy[0]([population_by_fitness[i][0] if i < nb_survivors else None for i in range(len(population))])
+
+		out = apply_genetic_algorithm_iteration(
+			population=population,
+			compute_fitness=lambda pop: [sum(g) for g in pop],
+			selection_rate=selection_rate,
+			population_replacement_strategy=strategy,
+			random_generator=lambda n: [1.0 for _ in range(n)], # no mutation
+			no_repeat_int_random_generator=lambda n, min_val, max_val: [0, 1],
+			crossover=lambda parents: parents, # no crossover
+			nb_parents_for_crossover=2,
+			mutation_rate=0.0,
+			mutate=lambda genome: genome,
+		)
+		assert out == expected
+
+def test_tournament_and_rank_selections_favor_the_fittest():
+	fitness = np.arange(1000, dtype=np.float64)
+	for selection_operator in [generate_tournament_selection(4, np.random.default_rng(0)), generate_rank_selection(2.0, np.random.default_rng(0))]:
+		survivors = selection_operator(fitness, 500)
+		assert len(survivors) == 500
+		assert np.all(np.diff(fitness[survivors]) <= 0) # best first
+		assert fitness[survivors].mean() > fitness.mean()
@@ -0,0 +1,69 @@
+from time import perf_counter
+from typing import Callable, Dict, List
+
+
+class VerifiedFitness(object):
+	"""
+		compute_fitness for apply_genetic_algorithm_iteration that does not simulate genomes a static check already settles
+
+		verify_genome returns a verdict per genome (see engine.genome_verifier), genomes whose verdict is a key of
+		verdict_fitness get that fitness, every other genome is evaluated by compute_fitness in one batch
+		the time saved is estimated from the mean time compute_fitness spent per genome
+	"""
+	def __init__(
+		self,
+		compute_fitness: Callable[[List[any]], List[float]],
+		verify_genome: Callable[[any], str],
+		verdict_fitness: Dict[str, float]
+	):
+		self.compute_fitness = compute_fitness
+		self.verify_genome = verify_genome
+		self.verdict_fitness = verdict_fitness
+		self.skipped = dict() # verdict -> number of genomes not simulated
+		self.simulated = 0
+		self.simulation_seconds = 0.0
+		self.verification_seconds = 0.0
+
+	def __call__(self, population: List[any]) -> List[float]:
+		fitness = [None for _ in population]
+		simulated_indices = []
+
+		start = perf_counter()
+		for i, genome in enumerate(population):
+			verdict = self.verify_genome(genome)
+			if verdict in self.verdict_fitness:
+				fitness[i] = self.verdict_fitness[verdict]
+				self.skipped[verdict] = self.skipped.get(verdict, 0) + 1
+			else:
+				simulated_indices.append(i)
+		self.verification_seconds += perf_counter() - start
+
+		if len(simulated_indices) == 0:
+			return fitness
+
+		start = perf_counter()
+		simulated_fitness = self.compute_fitness([population[i] for i in simulated_indices])
+		self.simulation_seconds += perf_counter() - start
+		self.simulated += len(simulated_indices)
+		for i, f in zip(simulated_indices, simulated_fitness):
+			fitness[i] = f
+		return fitness
+
+	def skip_rate(self) -> float:
+		nb_skipped = sum(self.skipped.values())
+		total = nb_skipped + self.simulated
+		return nb_skipped / total if total > 0 else 0.0
+
+	def time_saved(self) -> float:
+		''' seconds the skipped genomes would have taken to simulate, minus the time spent verifying every genome '''
+		if self.simulated == 0:
+			return 0.0
+		return sum(self.skipped.values()) * self.simulation_seconds / self.simulated - self.verification_seconds
+
+	def report_to_str(self) -> str:
+		skipped = ", ".join(f"{count} {verdict}" for verdict, count in sorted(self.skipped.items()))
+		return (
+			f"skipped {sum(self.skipped.values())} genomes ({100 * self.skip_rate():.1f}%{': ' + skipped if skipped else ''}),"
+			f" simulated {self.simulated} in {self.simulation_seconds:.3f}s,"
+			f" verification took {self.verification_seconds:.3f}s, about {self.time_saved():.3f}s saved"
+		)
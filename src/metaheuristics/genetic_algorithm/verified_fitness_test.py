@@ -0,0 +1,22 @@
+from .verified_fitness import VerifiedFitness
+
+def test_verified_fitness():
+	evaluated = []
+	def compute_fitness(population):
+		evaluated.extend(population)
+		return [sum(genome) for genome in population]
+
+	verified_fitness = VerifiedFitness(
+		compute_fitness,
+		lambda genome: 'empty' if len(genome) == 0 else 'unknown',
+		{'empty': -1.0}
+	)
+	assert verified_fitness([[1, 2], [], [3], []]) == [3, -1.0, 3, -1.0]
+	assert evaluated == [[1, 2], [3]]
+	assert verified_fitness.skipped == {'empty': 2}
+	assert verified_fitness.simulated == 2
+	assert verified_fitness.skip_rate() == 0.5
+
+	assert verified_fitness([[]]) == [-1.0]
+	assert evaluated == [[1, 2], [3]]
+	assert 'skipped 3 genomes (60.0%: 3 empty)' in verified_fitness.report_to_str()
@@ -0,0 +1,75 @@
+# cells of a grid holding nothing, indexed for O(1) uniform sampling, insertion and deletion
+# free cells are kept in an array in no particular order, with the index of every cell in that array: a cell is
+# removed by moving the last free cell into its slot, and a uniform cell is the slot of a uniform index
+
+from array import array
+from typing import Iterable, List, Sequence
+
+NOT_FREE = -1
+
+
+class FreeCellIndex(object):
+	"""
+		free cells of a grid of grid_size cells, a cell being free as long as nothing occupies it
+		occupy and release count occupants, so that several snakes, or a snake and food, may share a cell
+	"""
+	def __init__(self, grid_size: int, occupied_cells: Iterable[int] = ()):
+		self.cells = array('i', range(grid_size))
+		self.slots = array('i', range(grid_size)) # cell -> index in cells, NOT_FREE if occupied
+		self.occupants = array('i', [0 for _ in range(grid_size)])
+		self.size = grid_size # free cells are cells[:size]
+		for cell in occupied_cells:
+			self.occupy(cell)
+
+	def __len__(self) -> int:
+		return self.size
+
+	def __contains__(self, cell: int) -> bool:
+		return self.slots[cell] != NOT_FREE
+
+	def remove(self, cell: int):
+		slot = self.slots[cell]
+		last_cell = self.cells[self.size - 1]
+		self.cells[slot] = last_cell
+		self.slots[last_cell] = slot
+		self.cells[self.size - 1] = cell
+		self.slots[cell] = NOT_FREE
+		self.size -= 1
+
+	def insert(self, cell: int):
+		self.cells[self.size] = cell
+		self.slots[cell] = self.size
+		self.size += 1
+
+	def occupy(self, cell: int):
+		self.occupants[cell] += 1
+		if self.occupants[cell] == 1:
+			self.remove(cell)
+
+	def release(self, cell: int):
+		self.occupants[cell] -= 1
+		if self.occupants[cell] == 0:
+			self.insert(cell)
+
+	def sample(self, uniforms: Sequence[float]) -> List[int]:
+		'''
+			distinct free cells drawn uniformly without replacement, one per float of uniforms in [0, 1) while free cells remain
+			a partial Fisher-Yates shuffle of the free cells, undone afterwards, so that the index is left unchanged
+		'''
+		chosen = []
+		swaps = []
+		for uniform in uniforms:
+			remaining = self.size - len(chosen)
+			if remaining == 0:
+				break
+			slot = int(uniform * remaining)
+			last_slot = remaining - 1
+			swaps.append((slot, last_slot))
+			self.cells[slot], self.cells[last_slot] = self.cells[last_slot], self.cells[slot]
+			chosen.append(self.cells[last_slot])
+		for slot, last_slot in reversed(swaps):
+			self.cells[slot], self.cells[last_slot] = self.cells[last_slot], self.cells[slot]
+		return chosen
+
+	def to_set(self) -> set:
+		return set(self.cells[:self.size])
@@ -0,0 +1,102 @@
+from random import Random
+
+from .free_cell_index import FreeCellIndex
+from .random_streams import RandomStreams
+from games.snake.growing_snake_game_engine import growing_snake_iteration, generate_growing_snake_game_state, build_growing_snake_grid
+from games.snake.snake_game_engine import snake_iteration, snake_game_generator, generate_snake_game_state, generate_free_cell_food_spawner, build_snake_grid
+from games.snake.snake_game_state import double_buffered_snake_game_generator, generate_snake_game_state_object
+from games.snake.snake_instructions import generate_snake_instruction_set, generate_snake_instruction_costs
+from engine.engine import iterate
+
+def test_free_cell_index_follows_occupants():
+	rng = Random(0)
+	free_cells = FreeCellIndex(50, [3, 3, 7])
+	occupants = [0 for _ in range(50)]
+	occupants[3], occupants[7] = 2, 1
+	for _ in range(2000):
+		cell = rng.randrange(50)
+		if occupants[cell] > 0 and rng.random() < 0.5:
+			free_cells.release(cell)
+			occupants[cell] -= 1
+		else:
+			free_cells.occupy(cell)
+			occupants[cell] += 1
+		assert free_cells.to_set() == {c for c in range(50) if occupants[c] == 0}
+		assert len(free_cells) == sum(occupants[c] == 0 for c in range(50))
+
+def test_sample_draws_distinct_free_cells_uniformly():
+	free_cells = FreeCellIndex(10, [0, 1])
+	before = free_cells.cells.tolist()
+	assert sorted(free_cells.sample([0.99 for _ in range(20)])) == list(range(2, 10))
+	assert free_cells.cells.tolist() == before
+
+	counts = [0 for _ in range(10)]
+	uniforms = RandomStreams().stream('sample').random(3 * 20000).tolist()
+	for i in range(20000):
+		cells = free_cells.sample(uniforms[3 * i:3 * i + 3])
+		assert len(set(cells)) == 3
+		for cell in cells:
+			counts[cell] += 1
+	assert counts[:2] == [0, 0]
+	assert all(abs(count / 60000 - 1 / 8) < 0.01 for count in counts[2:])
+
+def test_food_only_spawns_on_free_cells():
+	stream = RandomStreams().world(0, 'food')
+	for is_growing in [False, True]:
+		if is_growing:
+			state = generate_growing_snake_game_state(6, 6, [2, 20], is_torus=True, agent_bodies=[[0, 1, 2], [20]], has_free_cells=True)
+			iteration, build_grid = growing_snake_iteration, build_growing_snake_grid
+		else:
+			state = generate_snake_game_state(6, 6, [0, 20], is_torus=True, has_free_cells=True)
+			iteration, build_grid = snake_iteration, build_snake_grid
+		spawn_food = generate_free_cell_food_spawner(state['free_cells'], stream, nb_per_spawn=3)
+		for turn_count in range(30):
+			grid = build_grid(state)
+			assert state['free_cells'].to_set() == {cell for cell in range(36) if grid[cell] == 0}
+			food = spawn_food(turn_count)
+			assert all(grid[cell] == 0 for cell in food) and len(set(food)) == len(food)
+			state = iteration([ord('↓'), ord('→')], state, lambda turn_count, food=food: food)
+		assert len(state['free_cells']) < 36 - 30
+
+def test_cells_of_snakes_killed_by_the_engine_are_freed():
+	# J 0 99 jumps out of the agent and dies before the game tick, the other snake loops on ↓
+	for is_state_object in [False, True]:
+		if is_state_object:
+			state = generate_snake_game_state_object(4, 4, [5, 0], has_free_cells=True)
+			game_iterate = double_buffered_snake_game_generator(lambda turn_count: [])
+		else:
+			state = generate_snake_game_state(4, 4, [5, 0], has_free_cells=True)
+			game_iterate = snake_game_generator(lambda turn_count: [])
+		agents, pointers, agents_freeze_values = [[ord('J'), 0, 99], [ord('↓'), ord('J'), 0, 0]], [0, 0], [0, 0]
+		for _ in range(2):
+			result = iterate(
+				game_iterate=game_iterate,
+				instruction_set=generate_snake_instruction_set(),
+				instruction_costs=generate_snake_instruction_costs(),
+				instruction_ticks_per_game_ticks=4,
+				agents=agents,
+				game_state=state,
+				pointers=pointers,
+				agents_freeze_values=agents_freeze_values,
+			)
+			agents, state, pointers = result['agents'], result['game_state'], result['pointers']
+		grid = build_snake_grid(state)
+		assert list(state['dead_agents']) == [True, False]
+		assert state['free_cells'].to_set() == {cell for cell in range(16) if grid[cell] == 0} == set(range(16)) - {8}
+
+def test_food_spawned_twice_in_a_tick_frees_its_cell_once_eaten():
+	for is_growing in [False, True]:
+		if is_growing:
+			state = generate_growing_snake_game_state(5, 5, [0], has_free_cells=True)
+			iteration = growing_snake_iteration
+		else:
+			state = generate_snake_game_state(5, 5, [0], has_free_cells=True)
+			iteration = snake_iteration
+		state = iteration([ord('↓')], state, lambda turn_count: [1, 1])
+		assert state['food_cells'] == {1} and 1 not in state['free_cells']
+		state = iteration([ord('↑')], state, lambda turn_count: [])
+		state = iteration([ord('→')], state, lambda turn_count: [])
+		assert state['agent_positions'] == [1] and state['food_cells'] == set()
+		for _ in range(2): # a growing snake holds the cell it ate on one more tick
+			state = iteration([ord('→')], state, lambda turn_count: [])
+		assert 1 in state['free_cells'] and state['free_cells'].occupants[1] == 0
@@ -0,0 +1,76 @@
+# neighbors of every cell of a grid, precomputed once per grid shape
+# a move or an observation in a direction is then a single array index instead of 1D <-> 2D conversions and bound checks
+
+from array import array
+from functools import lru_cache
+from typing import Dict
+
+import numpy as np
+
+OFF_GRID = -1 # neighbor of a cell on the border, outside of the grid
+
+DIRECTION_OFFSETS = dict() # (column offset, row offset) of every direction symbol
+DIRECTION_OFFSETS[ord('↑')] = (0, -1)
+DIRECTION_OFFSETS[ord('→')] = (1, 0)
+DIRECTION_OFFSETS[ord('↓')] = (0, 1)
+DIRECTION_OFFSETS[ord('←')] = (-1, 0)
+DIRECTION_OFFSETS[ord('↱')] = (1, -1)
+DIRECTION_OFFSETS[ord('↲')] = (-1, 1)
+DIRECTION_OFFSETS[ord('↳')] = (1, 1)
+DIRECTION_OFFSETS[ord('↰')] = (-1, -1)
+
+
+class GridTopology(object):
+	"""
+		neighbors[direction symbol][position] is the position of the neighbor of position in that direction, or OFF_GRID
+		on a torus, every neighbor wraps around the borders and OFF_GRID never appears
+
+		topologies are immutable and shared, get them through get_grid_topology
+	"""
+	def __init__(
+		self,
+		grid_column_length: int,
+		grid_row_length: int,
+		is_torus: bool = False
+	):
+		self.grid_column_length = grid_column_length
+		self.grid_row_length = grid_row_length
+		self.grid_size = grid_column_length * grid_row_length
+		self.is_torus = is_torus
+		self.neighbors: Dict[int, array] = {
+			symbol: self.compute_neighbors(offset_col, offset_row)
+			for symbol, (offset_col, offset_row) in DIRECTION_OFFSETS.items()
+		}
+
+	def compute_neighbors(self, offset_col: int, offset_row: int) -> array:
+		''' neighbor table of a direction, computed with numpy and stored as array('i'), whose items read back as python ints '''
+		positions = np.arange(self.grid_size, dtype=np.int64)
+		cols = positions % self.grid_column_length + offset_col
+		rows = positions // self.grid_column_length + offset_row
+		if self.is_torus:
+			cols %= self.grid_column_length
+			rows %= self.grid_row_length
+			neighbors = rows * self.grid_column_length + cols
+		else:
+			is_on_grid = (0 <= cols) & (cols < self.grid_column_length) & (0 <= rows) & (rows < self.grid_row_length)
+			neighbors = np.where(is_on_grid, rows * self.grid_column_length + cols, OFF_GRID)
+		return array('i', neighbors.astype(np.int32).tobytes())
+
+	def __repr__(self) -> str:
+		return f"GridTopology({self.grid_column_length}, {self.grid_row_length}, is_torus={self.is_torus})"
+
+
+@lru_cache(maxsize=None)
+def get_grid_topology(
+	grid_column_length: int,
+	grid_row_length: int,
+	is_torus: bool = False
+) -> GridTopology:
+	return GridTopology(grid_column_length, grid_row_length, is_torus)
+
+
+def get_state_topology(game_state: Dict) -> GridTopology:
+	''' the topology of a game state, states without a 'topology' are bounded grids '''
+	if 'topology' in game_state:
+		return game_state['topology']
+	return get_grid_topology(game_state['grid_column_length'], game_state['grid_row_length'])
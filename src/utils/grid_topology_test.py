@@ -0,0 +1,28 @@
+from .grid_topology import DIRECTION_OFFSETS, OFF_GRID, get_grid_topology
+from .grid_utils import convert_1d_position_to_2d
+from games.snake.snake_instructions import is_neighbor_cell_in_grid
+
+def test_neighbors_match_offsets():
+	for grid_column_length, grid_row_length in [(1, 1), (3, 5), (7, 2)]:
+		for is_torus in [False, True]:
+			topology = get_grid_topology(grid_column_length, grid_row_length, is_torus)
+			for symbol, (offset_col, offset_row) in DIRECTION_OFFSETS.items():
+				for position in range(grid_column_length * grid_row_length):
+					col, row = convert_1d_position_to_2d(position, grid_column_length)
+					col += offset_col
+					row += offset_row
+					if is_torus:
+						expected = (row % grid_row_length) * grid_column_length + (col % grid_column_length)
+					elif 0 <= col < grid_column_length and 0 <= row < grid_row_length:
+						expected = row * grid_column_length + col
+					else:
+						expected = OFF_GRID
+					assert topology.neighbors[symbol][position] == expected
+
+def test_topologies_are_shared_per_shape():
+	assert get_grid_topology(4, 3) is get_grid_topology(4, 3)
+	assert get_grid_topology(4, 3) is not get_grid_topology(4, 3, True)
+
+def test_is_neighbor_cell_in_grid_follows_the_topology():
+	assert not is_neighbor_cell_in_grid([0 for _ in range(12)], 4, 3, 3, ord('→'))
+	assert is_neighbor_cell_in_grid(None, 4, 3, 3, ord('→'), topology=get_grid_topology(4, 3, True))
@@ -0,0 +1,77 @@
+# events and counters for the engine and games, replacing unconditional prints
+# an event has a category (e.g. 'snake.meal'), a level and a message; it only reaches the sinks if its level is at least the level of its category
+# hot paths check is_enabled once per tick and skip formatting entirely when it is off
+# counters are aggregated in-process, callers add their per-tick totals with a single count call
+# timings are only taken when a Profiler is attached (see utils.profiler)
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.profiler import Profiler
+
+LEVEL_DEBUG = 10
+LEVEL_INFO = 20
+LEVEL_WARNING = 30
+LEVEL_OFF = 100
+
+LEVEL_NAMES = dict()
+LEVEL_NAMES[LEVEL_DEBUG] = 'DEBUG'
+LEVEL_NAMES[LEVEL_INFO] = 'INFO'
+LEVEL_NAMES[LEVEL_WARNING] = 'WARNING'
+
+# takes (category, level, message)
+Sink = Callable[[str, int, str], None]
+
+
+def print_sink(category: str, level: int, message: str):
+	print(f"[{LEVEL_NAMES.get(level, level)}] {category}: {message}")
+
+
+class CollectingSink(object):
+	""" keeps every event it receives, mostly for tests """
+	def __init__(self):
+		self.events: List[Tuple[str, int, str]] = []
+
+	def __call__(self, category: str, level: int, message: str):
+		self.events.append((category, level, message))
+
+
+class Instrumentation(object):
+	"""
+		levels maps categories to their minimum level, categories absent from it get default_level
+		counters are only aggregated if is_counting is set
+		profiler, when given, collects opcode histograms and phase timings of instrumented functions
+	"""
+	def __init__(
+		self,
+		levels: Optional[Dict[str, int]] = None,
+		default_level: int = LEVEL_OFF,
+		sinks: Optional[List[Sink]] = None,
+		is_counting: bool = False,
+		profiler: Optional[Profiler] = None
+	):
+		self.levels = dict(levels) if levels is not None else dict()
+		self.default_level = default_level
+		self.sinks = list(sinks) if sinks is not None else [print_sink]
+		self.is_counting = is_counting
+		self.counters: Dict[str, int] = dict()
+		self.profiler = profiler
+
+	def is_enabled(self, category: str, level: int) -> bool:
+		return level >= self.levels.get(category, self.default_level) and len(self.sinks) > 0
+
+	def emit(self, category: str, level: int, message: str):
+		if not self.is_enabled(category, level):
+			return
+		for sink in self.sinks:
+			sink(category, level, message)
+
+	def count(self, counter: str, increment: int = 1):
+		if self.is_counting:
+			self.counters[counter] = self.counters.get(counter, 0) + increment
+
+	def reset_counters(self):
+		self.counters = dict()
+
+
+# default of every instrumented function: no event is emitted and nothing is counted
+NULL_INSTRUMENTATION = Instrumentation(sinks=[])
@@ -0,0 +1,28 @@
+from .instrumentation import Instrumentation, CollectingSink, LEVEL_DEBUG, LEVEL_INFO
+from games.snake.snake_game_engine import snake_iteration, generate_snake_game_state
+
+def test_levels_filter_events_per_category():
+	sink = CollectingSink()
+	instrumentation = Instrumentation(levels={'snake.action': LEVEL_DEBUG}, default_level=LEVEL_INFO, sinks=[sink])
+
+	instrumentation.emit('snake.action', LEVEL_DEBUG, "kept")
+	instrumentation.emit('snake.resources', LEVEL_DEBUG, "dropped")
+	instrumentation.emit('snake.meal', LEVEL_INFO, "kept too")
+
+	assert sink.events == [('snake.action', LEVEL_DEBUG, "kept"), ('snake.meal', LEVEL_INFO, "kept too")]
+
+def test_snake_iteration_counts_moves_meals_and_deaths():
+	sink = CollectingSink()
+	instrumentation = Instrumentation(default_level=LEVEL_INFO, sinks=[sink], is_counting=True)
+
+	state = generate_snake_game_state(3, 3, [0, 2])
+	# snake #0 moves onto the food, snake #1 leaves the grid
+	snake_iteration([ord('→'), ord('→')], state, lambda turn_count: [1], instrumentation)
+
+	assert instrumentation.counters == {'snake.moves': 1, 'snake.deaths': 1, 'snake.meals': 1}
+	assert [category for (category, _, _) in sink.events] == ['snake.death', 'snake.meal']
+
+def test_nothing_is_counted_by_default():
+	instrumentation = Instrumentation(sinks=[])
+	instrumentation.count('snake.moves', 3)
+	assert instrumentation.counters == dict()
@@ -43,7 +43,11 @@ def print_agent(agent, pointer):
 	print(agent_to_str(agent, pointer))
 
 
-def debug_post_iteration_callback(result, grid_only=False, verbose=False):
+def debug_post_iteration_callback(result, grid_only=False, verbose=False, build_grid=None):
+	'''
+		build_grid makes the dense grid of the game state, e.g. games.snake.snake_game_engine.build_snake_grid,
+		states keeping their own 'grid' need none
+	'''
 	if verbose:
 		print(result)
 	if not grid_only:
@@ -52,6 +56,7 @@ def debug_post_iteration_callback(result, grid_only=False, verbose=False):
 		print_agent(result['agents'][0], result['pointers'][0])
 		print("grid:")
 	grid_column_length = result['game_state']['grid_column_length']
-	print_grid(result['game_state']['grid'], grid_column_length)
+	grid = build_grid(result['game_state']) if build_grid is not None else result['game_state']['grid']
+	print_grid(grid, grid_column_length)
 	for agent_id in range(len(result['agents'])):
 		print(f"snake #{agent_id} has <{result['game_state']['resources'][agent_id]['food']}> resources.")
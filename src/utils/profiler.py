@@ -0,0 +1,121 @@
+# opt-in profiling of the engine and games, attached to an Instrumentation as its profiler
+# hot paths read instrumentation.profiler once per tick and only time anything when it is set
+# times are kept per stack of phase names, e.g. ('engine.game_iterate', 'snake.move'), so that they export as folded stacks
+# for flamegraph.pl or speedscope, every line being the frames separated by ';' and the self time of the stack in microseconds
+
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Callable, Dict, List, Tuple
+
+Stack = Tuple[str, ...]
+
+
+class Profiler(object):
+	"""
+		opcode histograms and cumulative instruction times, agent ticks per kind and phase timings
+
+		agent_ticks counts, over every instruction tick of every agent, 'active' agents executing an instruction,
+		'frozen' agents paying the cost of an earlier one, and 'inactive' ones, dead or fast forwarded
+	"""
+	def __init__(self):
+		self.opcode_counts: Dict[int, int] = dict()
+		self.opcode_seconds: Dict[int, float] = dict()
+		self.agent_ticks: Dict[str, int] = dict(active=0, frozen=0, inactive=0)
+		self.stack_seconds: Dict[Stack, float] = dict() # inclusive of the stacks below
+		self.stack_counts: Dict[Stack, int] = dict()
+		self.current_stack: Stack = ()
+		self.opcode_stacks = set() # stacks of opcodes, which the summary shows in its opcode table
+
+	def record(self, name: str, seconds: float, count: int = 1):
+		''' adds seconds to the phase name below the current stack '''
+		stack = self.current_stack + (name,)
+		self.stack_seconds[stack] = self.stack_seconds.get(stack, 0.0) + seconds
+		self.stack_counts[stack] = self.stack_counts.get(stack, 0) + count
+
+	@contextmanager
+	def phase(self, name: str):
+		''' times the enclosed code as phase name, phases recorded inside it are nested below it '''
+		parent_stack = self.current_stack
+		self.current_stack = parent_stack + (name,)
+		start = perf_counter()
+		try:
+			yield
+		finally:
+			self.current_stack = parent_stack
+			self.record(name, perf_counter() - start)
+
+	def record_instructions(
+		self,
+		name: str,
+		seconds: float,
+		opcode_counts: Dict[int, int],
+		opcode_seconds: Dict[int, float],
+		nb_active: int,
+		nb_frozen: int,
+		nb_inactive: int,
+		symbol_name: Callable[[int], str] = chr
+	):
+		''' per game tick totals of an instruction loop timed as phase name, its opcodes being nested below it '''
+		self.record(name, seconds)
+		parent_stack = self.current_stack
+		self.current_stack = parent_stack + (name,)
+		for symbol, count in opcode_counts.items():
+			self.opcode_counts[symbol] = self.opcode_counts.get(symbol, 0) + count
+			self.opcode_seconds[symbol] = self.opcode_seconds.get(symbol, 0.0) + opcode_seconds[symbol]
+			self.record(symbol_name(symbol), opcode_seconds[symbol], count)
+			self.opcode_stacks.add(self.current_stack + (symbol_name(symbol),))
+		self.current_stack = parent_stack
+		self.agent_ticks['active'] += nb_active
+		self.agent_ticks['frozen'] += nb_frozen
+		self.agent_ticks['inactive'] += nb_inactive
+
+	def utilization(self) -> float:
+		''' share of agent ticks spent executing an instruction '''
+		total = sum(self.agent_ticks.values())
+		return self.agent_ticks['active'] / total if total > 0 else 0.0
+
+	def self_seconds(self) -> Dict[Stack, float]:
+		''' time of every stack outside of the stacks recorded below it '''
+		output = dict(self.stack_seconds)
+		for stack, seconds in self.stack_seconds.items():
+			parent = stack[:-1]
+			if parent in output:
+				output[parent] -= seconds
+		return output
+
+	def to_folded_stacks(self) -> List[str]:
+		lines = []
+		for stack, seconds in sorted(self.self_seconds().items()):
+			microseconds = int(round(seconds * 1e6))
+			if microseconds > 0:
+				lines.append(f"{';'.join(stack)} {microseconds}")
+		return lines
+
+	def write_folded_stacks(self, path: str):
+		with open(path, 'w') as folded_file:
+			folded_file.write("\n".join(self.to_folded_stacks()) + "\n")
+
+	def summary_to_str(self, symbol_name: Callable[[int], str] = chr) -> str:
+		lines = []
+		total_instructions = sum(self.opcode_counts.values())
+		if total_instructions > 0:
+			lines.append(f"{'opcode':<10}{'count':>12}{'share':>8}{'seconds':>12}{'ns/op':>10}")
+			for symbol in sorted(self.opcode_counts, key=lambda s: self.opcode_seconds[s], reverse=True):
+				count, seconds = self.opcode_counts[symbol], self.opcode_seconds[symbol]
+				lines.append(f"{symbol_name(symbol):<10}{count:>12}{100 * count / total_instructions:>7.1f}%{seconds:>12.6f}{1e9 * seconds / count:>10.0f}")
+
+		total_agent_ticks = sum(self.agent_ticks.values())
+		if total_agent_ticks > 0:
+			lines.append(
+				f"agent ticks: {total_agent_ticks}, "
+				+ ", ".join(f"{kind} {100 * count / total_agent_ticks:.1f}%" for kind, count in self.agent_ticks.items())
+			)
+
+		if len(self.stack_seconds) > 0:
+			lines.append(f"{'phase':<48}{'calls':>10}{'seconds':>12}")
+			for stack in sorted(self.stack_seconds):
+				if stack in self.opcode_stacks:
+					continue
+				name = '  ' * (len(stack) - 1) + stack[-1]
+				lines.append(f"{name:<48}{self.stack_counts[stack]:>10}{self.stack_seconds[stack]:>12.6f}")
+		return "\n".join(lines)
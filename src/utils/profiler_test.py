@@ -0,0 +1,49 @@
+from .instrumentation import Instrumentation
+from .profiler import Profiler
+from engine.engine import perform_n_iterations
+from games.snake.snake_agents import generate_spiral_agent
+from games.snake.snake_game_engine import snake_game_generator, generate_snake_game_state
+from games.snake.snake_instructions import generate_snake_instruction_set, generate_snake_instruction_costs
+
+def play(instrumentation):
+	results = []
+	perform_n_iterations(
+		n=20,
+		post_iteration_callback=lambda result: results.append((result['pointers'], result['game_state']['agent_positions'])),
+		game_iterate=snake_game_generator(lambda turn_count: [turn_count % 100], instrumentation),
+		instruction_set=generate_snake_instruction_set(),
+		instruction_costs=generate_snake_instruction_costs(cost=2),
+		instruction_ticks_per_game_ticks=10,
+		agents=[generate_spiral_agent()],
+		game_state=generate_snake_game_state(10, 10, [0]),
+		pointers=[0],
+		agents_freeze_values=[0],
+		instrumentation=instrumentation,
+	)
+	return results
+
+def test_profiler_collects_opcodes_agent_ticks_and_phases():
+	profiler = Profiler()
+	instrumentation = Instrumentation(is_counting=True, sinks=[], profiler=profiler)
+	assert play(instrumentation) == play(Instrumentation(sinks=[]))
+
+	assert sum(profiler.opcode_counts.values()) == instrumentation.counters['engine.instructions']
+	assert set(profiler.opcode_counts) <= set(generate_snake_instruction_set())
+	assert profiler.agent_ticks == dict(active=50, frozen=50, inactive=100) # every instruction costs 2 ticks, the snake leaves the grid on game tick 10
+	assert profiler.utilization() == 0.25
+	assert profiler.stack_counts[('engine.game_iterate', 'snake.move')] == 20
+
+	folded = profiler.to_folded_stacks()
+	assert all(int(line.rsplit(' ', 1)[1]) > 0 for line in folded)
+	assert any(line.startswith('engine.instructions;J ') for line in folded)
+	summary = profiler.summary_to_str()
+	assert 'agent ticks: 200, active 25.0%, frozen 25.0%, inactive 50.0%' in summary
+	assert '  snake.feed' in summary
+
+def test_folded_stacks_hold_self_times():
+	profiler = Profiler()
+	profiler.record('outer', 3.0)
+	profiler.current_stack = ('outer',)
+	profiler.record('inner', 1.0)
+	profiler.current_stack = ()
+	assert profiler.to_folded_stacks() == ['outer 2000000', 'outer;inner 1000000']
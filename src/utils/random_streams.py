@@ -0,0 +1,101 @@
+# counter based random streams: draw i of a stream is a hash of (stream key, i), with no state carried from draw to draw
+# any draw of any stream is recomputed in O(1), batches of draws are one vectorized hash, and streams split across
+# threads or processes give the same draws whichever worker computes them
+# keys are derived from a seed and a path such as ('world', 3, 'agent', 1), the hash is the splitmix64 finalizer
+
+from hashlib import blake2b
+from typing import List, Optional, Union
+
+import numpy as np
+
+GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+FLOAT_SCALE = 2.0 ** -53
+
+IndexArray = Union[int, np.ndarray]
+
+
+def derive_key(key: int, *path) -> int:
+	''' 64 bit key of the stream at path below the stream of key, stable across processes and Python versions '''
+	return int.from_bytes(blake2b(repr((key, path)).encode(), digest_size=8).digest(), 'little')
+
+
+def mix64(values: np.ndarray) -> np.ndarray:
+	''' splitmix64 finalizer on an uint64 array, wrapping on overflow '''
+	values = values ^ (values >> np.uint64(30))
+	values = values * np.uint64(0xBF58476D1CE4E5B9)
+	values = values ^ (values >> np.uint64(27))
+	values = values * np.uint64(0x94D049BB133111EB)
+	return values ^ (values >> np.uint64(31))
+
+
+class RandomStream(object):
+	"""
+		stream of 64 bit draws, draw i being mix64(key + (i + 1) * GOLDEN_GAMMA) as splitmix64 would give it
+
+		the *_at methods read draws by index without moving the stream, the others read the next draws and advance counter
+		random and sample fit the random_generator and no_repeat_int_random_generator of apply_genetic_algorithm_iteration
+	"""
+	def __init__(self, key: int, counter: int = 0):
+		self.key = key
+		self.counter = counter
+
+	def child(self, *path) -> 'RandomStream':
+		return RandomStream(derive_key(self.key, *path))
+
+	def uint64_at(self, indices: IndexArray) -> np.ndarray:
+		indices = np.asarray(indices, dtype=np.uint64)
+		values = np.atleast_1d(indices) # numpy scalars warn when they wrap, arrays do not
+		return mix64(np.uint64(self.key) + (values + np.uint64(1)) * GOLDEN_GAMMA).reshape(indices.shape)
+
+	def random_at(self, indices: IndexArray) -> np.ndarray:
+		''' floats in [0, 1) '''
+		return (self.uint64_at(indices) >> np.uint64(11)) * FLOAT_SCALE
+
+	def integers_at(self, indices: IndexArray, low: int, high: int) -> np.ndarray:
+		''' integers in [low, high), with a bias below 2^-53 * (high - low) '''
+		return low + (self.random_at(indices) * (high - low)).astype(np.int64)
+
+	def next_indices(self, n: int) -> np.ndarray:
+		indices = np.arange(self.counter, self.counter + n, dtype=np.uint64)
+		self.counter += n
+		return indices
+
+	def random(self, n: int) -> np.ndarray:
+		return self.random_at(self.next_indices(n))
+
+	def integers(self, low: int, high: int, n: int) -> np.ndarray:
+		return self.integers_at(self.next_indices(n), low, high)
+
+	def sample(self, n: int, low: int, high: int) -> List[int]:
+		''' n distinct integers in [low, high), in random order '''
+		assert 0 <= n <= high - low
+		return (low + np.argsort(self.random(high - low), kind='stable')[:n]).tolist()
+
+	def generator(self) -> np.random.Generator:
+		''' numpy generator on the counter based Philox bit generator keyed by this stream, for operators taking an rng '''
+		return np.random.Generator(np.random.Philox(key=self.key))
+
+
+class RandomStreams(object):
+	"""
+		hands out the independent streams of a run, all derived from seed
+
+		a stream only depends on seed and its path, so a world, an agent or a genetic algorithm operator gets the
+		same draws whatever the order streams are created in and whichever process creates them
+	"""
+	def __init__(self, seed: int = 0):
+		self.seed = seed
+		self.root = RandomStream(derive_key(seed))
+
+	def stream(self, *path) -> RandomStream:
+		return self.root.child(*path)
+
+	def world(self, world_id: int, purpose: Optional[str] = None) -> RandomStream:
+		return self.stream('world', world_id, purpose)
+
+	def agent(self, world_id: int, agent_id: int, purpose: Optional[str] = None) -> RandomStream:
+		return self.stream('world', world_id, 'agent', agent_id, purpose)
+
+	def operator(self, generation: int, operator: str) -> RandomStream:
+		''' stream of a genetic algorithm operator (selection, crossover, mutation...) at generation '''
+		return self.stream('generation', generation, operator)
@@ -0,0 +1,39 @@
+import numpy as np
+
+from .random_streams import RandomStreams
+from games.snake.snake_agents import generate_spiral_agent
+from games.snake.snake_fitness import compute_snake_genome_fitness
+from games.snake.snake_game_engine import generate_food_spawner
+
+def test_streams_only_depend_on_seed_and_path():
+	first = RandomStreams(seed=7)
+	second = RandomStreams(seed=7)
+	mutation = first.operator(3, 'mutation').random(5)
+	second.world(0).random(100) # other streams drawn from in between
+	assert np.array_equal(second.operator(3, 'mutation').random(5), mutation)
+	assert not np.array_equal(first.operator(4, 'mutation').random(5), mutation)
+	assert not np.array_equal(RandomStreams(seed=8).operator(3, 'mutation').random(5), mutation)
+	assert first.agent(0, 1).key != first.agent(1, 0).key
+
+def test_draws_are_regenerated_by_index():
+	stream = RandomStreams().world(2, 'food')
+	sequential = np.concatenate([stream.random(1) for _ in range(50)] + [stream.random(50)])
+	assert np.array_equal(stream.random_at(np.arange(100)), sequential)
+	assert stream.random_at(73) == sequential[73]
+	assert stream.counter == 100
+
+	draws = stream.integers(0, 10, 100 * 1000)
+	assert draws.min() == 0 and draws.max() == 9
+	assert np.all(np.abs(np.bincount(draws) / len(draws) - 0.1) < 0.01)
+	assert sorted(stream.sample(10, 5, 15)) == list(range(5, 15))
+
+def test_food_spawner_batches_match_draws():
+	stream = RandomStreams().world(0, 'food')
+	spawn_food = generate_food_spawner(stream, 100, every_nth=3, nb_per_spawn=2, batch_size=4)
+	spawns = [spawn_food(turn_count) for turn_count in range(30)]
+	assert spawns[1] == [] and spawns[2] == []
+	assert [position for spawn in spawns for position in spawn] == stream.integers_at(np.arange(20), 0, 100).tolist()
+
+def test_seeded_fitness_is_reproducible():
+	genome = generate_spiral_agent()
+	assert compute_snake_genome_fitness(genome, seed=1) == compute_snake_genome_fitness(genome, seed=1)
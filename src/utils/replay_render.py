@@ -0,0 +1,25 @@
+# renders a replay written by utils.replay_utils.ReplayRecorder in the text format of debug_post_iteration_callback
+# usage, from src: python3 -m utils.replay_render <replay file>
+
+import sys
+
+from utils.print_utils import grid_to_str
+from utils.replay_utils import replay_ticks
+
+def render_replay(path: str) -> str:
+	out = ""
+	for tick in replay_ticks(path):
+		out += f"turn #{tick['turn_count']}\n"
+		out += grid_to_str(tick['grid'], tick['grid_column_length']) + "\n"
+		for agent_id in range(len(tick['food'])):
+			out += f"snake #{agent_id} has <{tick['food'][agent_id]}> resources.\n"
+	return out
+
+def main():
+	if len(sys.argv) != 2:
+		print("usage: python3 -m utils.replay_render <replay file>")
+		sys.exit(1)
+	print(render_replay(sys.argv[1]), end="")
+
+if __name__ == '__main__':
+	main()
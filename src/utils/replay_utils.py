@@ -0,0 +1,200 @@
+# binary replay of a snake game, written as a post_iteration_callback
+# the file starts with a header, then every game tick appends only what changed since the previous one:
+#	header:	MAGIC, version (u8), grid column length (u32), grid row length (u32), number of agents (u32)
+#	record:	kind (u8) followed by its fields, see RECORD_FORMATS
+# all integers are little endian
+# only heads are recorded: bodies of growing snakes (growing_snake_game_engine) cannot be replayed, replays show them as their head
+
+from struct import Struct
+from typing import Dict, Iterator, Tuple
+
+MAGIC = b'MMGR'
+VERSION = 2 # memory writes hold 64 bit values since version 2
+HEADER = Struct('<4sBIII')
+
+RECORD_TICK = 1 # turn count
+RECORD_AGENT_MOVE = 2 # agent id, new position
+RECORD_FOOD_SPAWN = 3 # position
+RECORD_FOOD_EATEN = 4 # position
+RECORD_DEATH = 5 # agent id
+RECORD_MEMORY_WRITE = 6 # agent id, position in memory, new value (signed 64 bit)
+RECORD_RESOURCES = 7 # agent id, food
+
+KIND = Struct('<B')
+RECORD_FORMATS = dict()
+RECORD_FORMATS[RECORD_TICK] = Struct('<I')
+RECORD_FORMATS[RECORD_AGENT_MOVE] = Struct('<II')
+RECORD_FORMATS[RECORD_FOOD_SPAWN] = Struct('<I')
+RECORD_FORMATS[RECORD_FOOD_EATEN] = Struct('<I')
+RECORD_FORMATS[RECORD_DEATH] = Struct('<I')
+RECORD_FORMATS[RECORD_MEMORY_WRITE] = Struct('<IIq')
+RECORD_FORMATS[RECORD_RESOURCES] = Struct('<II')
+
+
+class ReplayRecorder(object):
+	"""
+		post_iteration_callback streaming the deltas of every game tick to an append-only replay file
+
+		records of a tick are packed in memory and handed to a buffered file in a single write
+		the first tick records the whole state, as deltas from an empty game
+	"""
+	def __init__(
+		self,
+		path: str,
+		buffer_size: int = 1 << 16
+	):
+		self.file = open(path, 'wb', buffering=buffer_size)
+		self.is_header_written = False
+		self.agent_positions = []
+		self.dead_agents = []
+		self.food_cells = set()
+		self.food = []
+		self.agents = [] # (agent object, version if any, copy of its values) as of the previous tick
+
+	def write_header(self, game_state: Dict, nb_agents: int):
+		self.file.write(HEADER.pack(MAGIC, VERSION, game_state['grid_column_length'], game_state['grid_row_length'], nb_agents))
+		self.agent_positions = [None for _ in range(nb_agents)]
+		self.dead_agents = [False for _ in range(nb_agents)]
+		self.food = [0 for _ in range(nb_agents)]
+		self.agents = [(None, None, []) for _ in range(nb_agents)]
+		self.is_header_written = True
+
+	def __call__(self, result: Dict):
+		game_state = result['game_state']
+		agents = result['agents']
+		if not self.is_header_written:
+			self.write_header(game_state, len(agents))
+
+		records = bytearray()
+		def append(kind: int, *fields):
+			records.extend(KIND.pack(kind))
+			records.extend(RECORD_FORMATS[kind].pack(*fields))
+
+		append(RECORD_TICK, game_state['turn_count'])
+
+		for agent_id, position in enumerate(game_state['agent_positions']):
+			if position != self.agent_positions[agent_id]:
+				append(RECORD_AGENT_MOVE, agent_id, int(position))
+				self.agent_positions[agent_id] = position
+
+		if 'food_cells' in game_state:
+			food_cells = set(game_state['food_cells'])
+		else: # array-backed states
+			food_cells = {cell for cell, is_food in enumerate(game_state['food_positions']) if is_food}
+		for cell in sorted(food_cells - self.food_cells):
+			append(RECORD_FOOD_SPAWN, cell)
+		for cell in sorted(self.food_cells - food_cells):
+			append(RECORD_FOOD_EATEN, cell)
+		self.food_cells = food_cells
+
+		for agent_id, is_dead in enumerate(game_state['dead_agents']):
+			if is_dead and not self.dead_agents[agent_id]:
+				append(RECORD_DEATH, agent_id)
+				self.dead_agents[agent_id] = True
+
+		for agent_id, resources in enumerate(game_state['resources']):
+			if resources['food'] != self.food[agent_id]:
+				append(RECORD_RESOURCES, agent_id, resources['food'])
+				self.food[agent_id] = resources['food']
+
+		for agent_id, agent in enumerate(agents):
+			previous_agent, previous_version, previous_values = self.agents[agent_id]
+			version = getattr(agent, 'version', None)
+			# list agents are never modified in place, AgentMemory counts its writes
+			if agent is previous_agent and version == previous_version:
+				continue
+			values = list(agent)
+			for position, value in enumerate(values):
+				if position >= len(previous_values) or previous_values[position] != value:
+					append(RECORD_MEMORY_WRITE, agent_id, position, value)
+			self.agents[agent_id] = (agent, version, values)
+
+		self.file.write(records)
+
+	def close(self):
+		self.file.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+
+def read_replay(path: str) -> Tuple[Tuple[int, int, int], Iterator[Tuple[int, tuple]]]:
+	'''
+		returns ((grid column length, grid row length, number of agents), iterator over (kind, fields) records)
+	'''
+	with open(path, 'rb') as replay_file:
+		data = replay_file.read()
+
+	magic, version, grid_column_length, grid_row_length, nb_agents = HEADER.unpack_from(data, 0)
+	assert magic == MAGIC, f"{path} is not a replay file"
+	assert version == VERSION, f"unsupported replay version <{version}>"
+
+	def records():
+		offset = HEADER.size
+		while offset < len(data):
+			(kind,) = KIND.unpack_from(data, offset)
+			offset += KIND.size
+			record_format = RECORD_FORMATS[kind]
+			yield (kind, record_format.unpack_from(data, offset))
+			offset += record_format.size
+
+	return (grid_column_length, grid_row_length, nb_agents), records()
+
+
+def replay_ticks(path: str) -> Iterator[Dict]:
+	'''
+		rebuilds the game after every recorded tick, as a dict with the keys read by print_utils:
+		'turn_count', 'grid', 'grid_column_length', 'agent_positions', 'dead_agents', 'food' and 'agents'
+	'''
+	(grid_column_length, grid_row_length, nb_agents), records = read_replay(path)
+
+	turn_count = None
+	agent_positions = [0 for _ in range(nb_agents)]
+	dead_agents = [False for _ in range(nb_agents)]
+	food = [0 for _ in range(nb_agents)]
+	agents = [[] for _ in range(nb_agents)]
+	food_cells = set()
+
+	def current_tick() -> Dict:
+		grid = [0 for _ in range(grid_column_length * grid_row_length)]
+		for cell in food_cells:
+			grid[cell] = 2
+		for agent_id in range(nb_agents):
+			if not dead_agents[agent_id]:
+				grid[agent_positions[agent_id]] = 1
+
+		tick = dict()
+		tick['turn_count'] = turn_count
+		tick['grid'] = grid
+		tick['grid_column_length'] = grid_column_length
+		tick['agent_positions'] = list(agent_positions)
+		tick['dead_agents'] = list(dead_agents)
+		tick['food'] = list(food)
+		tick['agents'] = [list(agent) for agent in agents]
+		return tick
+
+	for kind, fields in records:
+		if kind == RECORD_TICK:
+			if turn_count is not None:
+				yield current_tick()
+			turn_count = fields[0]
+		elif kind == RECORD_AGENT_MOVE:
+			agent_positions[fields[0]] = fields[1]
+		elif kind == RECORD_FOOD_SPAWN:
+			food_cells.add(fields[0])
+		elif kind == RECORD_FOOD_EATEN:
+			food_cells.discard(fields[0])
+		elif kind == RECORD_DEATH:
+			dead_agents[fields[0]] = True
+		elif kind == RECORD_MEMORY_WRITE:
+			agent_id, position, value = fields
+			agents[agent_id].extend(0 for _ in range(position + 1 - len(agents[agent_id])))
+			agents[agent_id][position] = value
+		elif kind == RECORD_RESOURCES:
+			food[fields[0]] = fields[1]
+
+	if turn_count is not None:
+		yield current_tick()
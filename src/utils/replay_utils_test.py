@@ -0,0 +1,46 @@
+import os
+import tempfile
+
+from .replay_utils import ReplayRecorder, replay_ticks
+from engine.agent_memory import to_agent_memories
+from engine.engine import perform_n_iterations
+from games.snake.snake_agents import generate_spiral_agent
+from games.snake.snake_game_engine import snake_game_generator, generate_snake_game_state, build_snake_grid
+from games.snake.snake_instructions import generate_snake_instruction_set, generate_snake_instruction_costs
+
+def test_replay_matches_recorded_game():
+	for agents in [[generate_spiral_agent(), generate_spiral_agent()], to_agent_memories([generate_spiral_agent(), generate_spiral_agent()])]:
+		with tempfile.TemporaryDirectory() as directory:
+			path = os.path.join(directory, 'replay')
+			expected = []
+			with ReplayRecorder(path) as recorder:
+				def record(result):
+					recorder(result)
+					game_state = result['game_state']
+					expected.append((game_state['turn_count'], build_snake_grid(game_state), [r['food'] for r in game_state['resources']], [list(a) for a in result['agents']]))
+
+				perform_n_iterations(
+					n=30,
+					post_iteration_callback=record,
+					game_iterate=snake_game_generator(lambda turn_count: [(7 * turn_count) % 25]),
+					instruction_set=generate_snake_instruction_set(),
+					instruction_costs=generate_snake_instruction_costs(),
+					instruction_ticks_per_game_ticks=100,
+					agents=agents,
+					game_state=generate_snake_game_state(5, 5, [0, 12]),
+					pointers=[0, 0],
+					agents_freeze_values=[0, 0],
+				)
+
+			replayed = [(tick['turn_count'], tick['grid'], tick['food'], tick['agents']) for tick in replay_ticks(path)]
+			assert replayed == expected
+
+def test_memory_values_beyond_32_bits():
+	with tempfile.TemporaryDirectory() as directory:
+		path = os.path.join(directory, 'replay')
+		with ReplayRecorder(path) as recorder:
+			result = dict()
+			result['agents'] = [[ord('↑'), 2 ** 40, -2 ** 40]]
+			result['game_state'] = generate_snake_game_state(3, 3, [0])
+			recorder(result)
+		assert [tick['agents'] for tick in replay_ticks(path)] == [[[ord('↑'), 2 ** 40, -2 ** 40]]]